@@ -6,6 +6,12 @@ from wagtailmedia.settings import wagtailmedia_settings
 if wagtailmedia_settings.MEDIA_MODEL == "wagtailmedia.Media":
     # Only expose the package-provided media class in the Django admin if the installation
     # does not provide its own custom media class in order to avoid confusion.
-    from wagtailmedia.models import Media
+    from wagtailmedia.models import Media, MediaRendition
 
-    admin.site.register(Media)
+    class MediaRenditionInline(admin.TabularInline):
+        model = MediaRendition
+        extra = 0
+
+    @admin.register(Media)
+    class MediaAdmin(admin.ModelAdmin):
+        inlines = [MediaRenditionInline]
@@ -1,11 +1,16 @@
 from django.urls import path, re_path
 
-from wagtailmedia.views import chooser, media
+from wagtailmedia.views import chooser, media, uploads
 
 
 urlpatterns = [
     path("", media.index, name="index"),
     re_path(r"^(?P<media_type>audio|video|media)/add/$", media.add, name="add"),
+    re_path(
+        r"^(?P<media_type>audio|video)/add/multiple/$",
+        media.add_multiple,
+        name="add_multiple",
+    ),
     path("edit/<int:media_id>/", media.edit, name="edit"),
     path("delete/<int:media_id>/", media.delete, name="delete"),
     path("chooser/", chooser.chooser, name="chooser"),
@@ -19,4 +24,20 @@ urlpatterns = [
         name="chooser_upload",
     ),
     path("usage/<int:media_id>/", media.usage, name="media_usage"),
+    re_path(
+        r"^(?P<media_type>audio|video)/upload/$",
+        uploads.start,
+        name="chunked_upload_start",
+    ),
+    path("upload/<str:upload_id>/", uploads.upload_status, name="chunked_upload"),
+    path(
+        "upload/<str:upload_id>/parts/<int:part>/",
+        uploads.upload_part,
+        name="chunked_upload_part",
+    ),
+    path(
+        "upload/<str:upload_id>/complete/",
+        uploads.complete,
+        name="chunked_upload_complete",
+    ),
 ]
@@ -14,6 +14,8 @@ class MediaAPIViewSet(BaseAPIViewSet):
         "height",
         "media_type",
         "collection",
+        "file_size",
+        "mime_type",
     ]
     meta_fields = BaseAPIViewSet.meta_fields + [
         "tags",
@@ -1,3 +1,5 @@
+import copy
+
 from typing import TYPE_CHECKING
 
 from django.forms import ModelChoiceField
@@ -6,6 +8,7 @@ from django.utils.functional import cached_property
 from wagtail.admin.compare import BlockComparison
 from wagtail.blocks import ChooserBlock
 
+from . import render_cache
 from .utils import format_audio_html, format_video_html
 
 
@@ -28,19 +31,56 @@ class AbstractMediaChooserBlock(ChooserBlock):
 
         return get_media_model()
 
+    def get_queryset(self):
+        queryset = self.target_model.objects.all()
+        if self.media_type:
+            queryset = queryset.filter(type=self.media_type)
+        return queryset
+
     @cached_property
     def field(self):
         if not self.media_type:
             return super().field
 
         return ModelChoiceField(
-            queryset=self.target_model.objects.filter(type=self.media_type),
+            queryset=self.get_queryset(),
             widget=self.widget,
             required=self._required,
             validators=self._validators,
             help_text=self._help_text,
         )
 
+    def to_python(self, value):
+        # the incoming serialised value should be None or an ID
+        if value is None:
+            return None
+        # The renditions are only prefetched for many media items, in bulk_to_python
+        return self.get_queryset().filter(pk=value).first()
+
+    def bulk_to_python(self, values):
+        """
+        Loads the media items of all the blocks of this type in a stream in one query,
+        along with their collections and renditions, so that rendering the players
+        makes no further queries. Items that are missing or not of the block's media
+        type are returned as None.
+        """
+        objects = (
+            self.get_queryset()
+            .select_related("collection")
+            .prefetch_renditions()
+            .in_bulk(values)
+        )
+        seen_ids = set()
+        result = []
+        for id_ in values:
+            obj = objects.get(id_)
+            if obj is not None and id_ in seen_ids:
+                # each block gets its own instance, as in ChooserBlock.bulk_to_python
+                obj = copy.copy(obj)
+            result.append(obj)
+            seen_ids.add(id_)
+        return result
+
     @cached_property
     def widget(self):
         from wagtailmedia.widgets import AdminMediaChooser
@@ -57,22 +97,23 @@ class AbstractMediaChooserBlock(ChooserBlock):
 
 
 class MediaChooserBlockComparison(BlockComparison):
-    def htmlvalue(self, value) -> str:
+    def render_comparison(self, media_item_a: str, media_item_b: str) -> str:
         return render_to_string(
             "wagtailmedia/widgets/compare.html",
-            {
-                "media_item_a": self.block.render_basic(value),
-                "media_item_b": self.block.render_basic(value),
-            },
+            {"media_item_a": media_item_a, "media_item_b": media_item_b},
         )
 
+    def htmlvalue(self, value) -> str:
+        rendered = self.block.render_basic(value)
+        return self.render_comparison(rendered, rendered)
+
     def htmldiff(self) -> str:
-        return render_to_string(
-            "wagtailmedia/widgets/compare.html",
-            {
-                "media_item_a": self.block.render_basic(self.val_a),
-                "media_item_b": self.block.render_basic(self.val_b),
-            },
+        if not self.has_changed():
+            # The same media item is rendered once for both sides
+            return self.htmlvalue(self.val_a)
+
+        return self.render_comparison(
+            self.block.render_basic(self.val_a), self.block.render_basic(self.val_b)
         )
 
 
@@ -99,7 +140,7 @@ class AudioChooserBlock(AbstractMediaChooserBlock):
         if value.type != self.media_type:
             return ""
 
-        return format_audio_html(value)
+        return render_cache.render(value, "audio", format_audio_html)
 
     class Meta:
         icon = "wagtailmedia-audio"
@@ -128,7 +169,7 @@ class VideoChooserBlock(AbstractMediaChooserBlock):
         if value.type != self.media_type:
             return ""
 
-        return format_video_html(value)
+        return render_cache.render(value, "video", format_video_html)
 
     class Meta:
         icon = "wagtailmedia-video"
@@ -0,0 +1,138 @@
+"""
+Counting all media items is slow for large media libraries, so the counts shown in the
+admin are kept in the Django cache, as are the most used media tags. The counts of each
+collection and media type are computed in a single query, and cleared whenever a media
+item is saved or deleted, or its tags are changed.
+Within a request, they are also kept in memory, so that describing many collections
+reads them once.
+Collections holding media items cannot be deleted, so the media counts of collections
+are always read from the database, once per request, and never from the cache.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Count
+from wagtail.admin.models import popular_tags_for_model
+
+from wagtailmedia.models import get_media_model
+from wagtailmedia.permissions import permission_policy
+from wagtailmedia.request_memo import get_request_memo
+from wagtailmedia.settings import wagtailmedia_settings
+
+
+CACHE_KEY_PREFIX = "wagtailmedia:counts"
+GENERATION_CACHE_KEY = f"{CACHE_KEY_PREFIX}:generation"
+
+
+def get_generation() -> str:
+    """
+    Returns the token that all cached counts are keyed on, so they can all be
+    invalidated at once by replacing it.
+    """
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(GENERATION_CACHE_KEY, generation, None)
+    return generation
+
+
+def clear_media_counts():
+    if (memo := get_request_memo()) is not None:
+        memo.pop("media_counts", None)
+        memo.pop("collection_media_counts", None)
+    cache.delete(GENERATION_CACHE_KEY)
+
+
+def query_media_counts() -> dict[int, dict[str, int]]:
+    counts = {}
+    rows = (
+        get_media_model()
+        .objects.order_by()
+        .values_list("collection_id", "type")
+        .annotate(count=Count("pk"))
+    )
+    for collection_id, media_type, count in rows:
+        counts.setdefault(collection_id, {})[media_type] = count
+    return counts
+
+
+def get_media_counts() -> dict[int, dict[str, int]]:
+    """
+    Returns the number of media items of each type, by collection id.
+    """
+    memo = get_request_memo()
+    if memo is not None and "media_counts" in memo:
+        return memo["media_counts"]
+
+    key = f"{CACHE_KEY_PREFIX}:{get_generation()}"
+    counts = cache.get(key)
+    if counts is None:
+        counts = query_media_counts()
+        cache.set(key, counts, wagtailmedia_settings.COUNTS_CACHE_TIMEOUT)
+
+    if memo is not None:
+        memo["media_counts"] = counts
+    return counts
+
+
+def count_media(collection_id: int | None = None, media_type: str | None = None) -> int:
+    """
+    Returns the number of media items, optionally of a given collection and type.
+    """
+    counts = get_media_counts()
+    if collection_id is not None:
+        counts = {collection_id: counts.get(collection_id, {})}
+    return sum(
+        count
+        for type_counts in counts.values()
+        for type_, count in type_counts.items()
+        if media_type is None or type_ == media_type
+    )
+
+
+def count_collection_media(collection_id: int) -> int:
+    """
+    Returns the number of media items in a collection, as currently stored in the
+    database. Within a request, the counts of all collections are queried at once.
+    """
+    memo = get_request_memo()
+    if memo is None:
+        return get_media_model().objects.filter(collection_id=collection_id).count()
+
+    if "collection_media_counts" not in memo:
+        memo["collection_media_counts"] = query_media_counts()
+    return sum(memo["collection_media_counts"].get(collection_id, {}).values())
+
+
+def count_media_for_user(user, actions) -> int:
+    """
+    Returns the number of media items the user has any of the given permissions for.
+    Superusers can access all media items, so they share the per-collection counts,
+    while the permission-filtered count of other users is cached for each of them.
+    """
+    if user.is_active and user.is_superuser:
+        return count_media()
+
+    key = f"{CACHE_KEY_PREFIX}:{get_generation()}:user:{user.pk}:{','.join(sorted(actions))}"
+    count = cache.get(key)
+    if count is None:
+        count = permission_policy.instances_user_has_any_permission_for(
+            user, actions
+        ).count()
+        cache.set(key, count, wagtailmedia_settings.COUNTS_CACHE_TIMEOUT)
+    return count
+
+
+def get_popular_tags(count: int = 10) -> list:
+    """
+    Returns the most used media tags, with their number of media items as ``item_count``.
+    """
+    key = f"{CACHE_KEY_PREFIX}:{get_generation()}:popular_tags:{count}"
+    tags = cache.get(key)
+    if tags is None:
+        tags = list(popular_tags_for_model(get_media_model(), count))
+        cache.set(key, tags, wagtailmedia_settings.COUNTS_CACHE_TIMEOUT)
+    return tags
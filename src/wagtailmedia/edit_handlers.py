@@ -6,7 +6,8 @@ from django.template.loader import render_to_string
 from wagtail.admin.compare import ForeignObjectComparison
 from wagtail.admin.panels import FieldPanel
 
-from .models import MediaType
+from .models import MediaType, prefetch_renditions
+from .request_memo import get_request_memo
 from .utils import format_audio_html, format_video_html
 from .widgets import AdminAudioChooser, AdminMediaChooser, AdminVideoChooser
 
@@ -47,17 +48,61 @@ class MediaChooserPanel(FieldPanel):
 
 
 class MediaFieldComparison(ForeignObjectComparison):
+    """
+    Wagtail looks up the two media items of each comparison separately. Within a
+    request, the ids of all the media comparisons built so far, including those of
+    inline child objects, are collected instead, and the first comparison to be
+    rendered loads them all in one go.
+    """
+
+    def __init__(self, field, obj_a, obj_b):
+        super().__init__(field, obj_a, obj_b)
+
+        memo = get_request_memo()
+        if memo is not None:
+            media_items = memo.setdefault("compared_media_items", {})
+            memo.setdefault("compared_media_ids", set()).update(
+                pk for pk in self.get_ids() if pk not in media_items
+            )
+
+    def get_ids(self) -> set:
+        return {pk for pk in (self.val_a, self.val_b) if pk is not None}
+
+    def load_media_items(self, ids) -> dict:
+        media_items = self.field.related_model.objects.in_bulk(ids)
+        prefetch_renditions(media_items.values())
+        return media_items
+
+    def get_objects(self):
+        ids = self.get_ids()
+        memo = get_request_memo()
+        if memo is None:
+            media_items = self.load_media_items(ids)
+        else:
+            media_items = memo.setdefault("compared_media_items", {})
+            if not ids <= media_items.keys():
+                # Load the media items of all the comparisons made so far at once
+                ids = (ids | memo.pop("compared_media_ids", set())) - media_items.keys()
+                # Remember deleted media items too, so they are not looked up again
+                media_items.update(dict.fromkeys(ids))
+                media_items.update(self.load_media_items(ids))
+
+        return media_items.get(self.val_a), media_items.get(self.val_b)
+
     def htmldiff(self) -> str:
         media_item_a, media_item_b = self.get_objects()
         if not all([media_item_a, media_item_b]):
             return ""
 
+        rendered_a = self.render_media_item(media_item_a)
+        if media_item_a.pk == media_item_b.pk:
+            rendered_b = rendered_a
+        else:
+            rendered_b = self.render_media_item(media_item_b)
+
         return render_to_string(
             "wagtailmedia/widgets/compare.html",
-            {
-                "media_item_a": self.render_media_item(media_item_a),
-                "media_item_b": self.render_media_item(media_item_b),
-            },
+            {"media_item_a": rendered_a, "media_item_b": rendered_b},
         )
 
     @staticmethod
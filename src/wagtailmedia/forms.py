@@ -12,7 +12,9 @@ from wagtail.models import Collection
 
 from wagtailmedia.models import Media, MediaType
 from wagtailmedia.permissions import permission_policy as media_permission_policy
+from wagtailmedia.probe import probe
 from wagtailmedia.settings import wagtailmedia_settings
+from wagtailmedia.utils import HashingFile, hash_filelike
 
 
 # Callback to allow us to override the default form field for the collection field
@@ -47,6 +49,9 @@ class BaseMediaForm(BaseCollectionMemberForm):
 
     permission_policy = media_permission_policy
 
+    # Set once the uploaded file has been probed and hashed, see read_file()
+    file_read = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -85,6 +90,73 @@ class BaseMediaForm(BaseCollectionMemberForm):
 
         return None
 
+    def save(self, commit=True):
+        if "file" in self.changed_data:
+            if not self.file_read:
+                self.read_file()
+            if not self.instance.file_hash:
+                self.store_file()
+            if wagtailmedia_settings.DEDUPLICATE:
+                self.deduplicate_file()
+        return super().save(commit=commit)
+
+    def read_file(self):
+        """Probe the uploaded file, and take its hash from the upload handler.
+        This only reads the upload and does not touch the database, so it is safe
+        to run for several forms concurrently.
+        """
+        self.set_metadata_from_file()
+        # Before deduplication, which replaces the upload with the stored duplicate
+        self.instance.set_file_info()
+        # Uploads received by the hashing upload handlers are hashed as they arrive,
+        # so that duplicates are found before they are stored
+        self.instance.file_hash = getattr(self.cleaned_data["file"], "sha256", "")
+        self.file_read = True
+
+    def store_file(self):
+        """Store an upload that was not hashed as it was received, such as a chunked
+        upload, hashing it as the storage writes it rather than reading it twice.
+        """
+        upload = self.cleaned_data["file"]
+        file = HashingFile(upload)
+        self.instance.file.save(upload.name, file, save=False)
+        self.instance.file_hash = file.sha256 or hash_filelike(upload)
+
+    def deduplicate_file(self):
+        """Point the media item at an existing stored file with the same content
+        as the upload, if there is one, instead of storing another copy. If the
+        upload has already been stored, that copy is removed.
+        """
+        duplicate = (
+            type(self.instance)
+            .objects.filter(file_hash=self.instance.file_hash)
+            .exclude(pk=self.instance.pk)
+            .only("file")
+            .first()
+        )
+        if duplicate is None or not duplicate.file.storage.exists(duplicate.file.name):
+            return
+
+        if self.instance.file._committed:
+            self.instance.file.storage.delete(self.instance.file.name)
+        self.instance.file = duplicate.file.name
+
+    def set_metadata_from_file(self):
+        """Fill the duration and dimensions from the headers of the uploaded file,
+        unless they were entered along with it. Blank fields and a zero duration
+        are treated as not entered.
+        """
+        metadata = probe(self.cleaned_data["file"])
+        if metadata is None:
+            return
+
+        for name in ("duration", "width", "height"):
+            value = getattr(metadata, name)
+            if value is None:
+                continue
+            if name not in self.changed_data or not self.cleaned_data.get(name):
+                setattr(self.instance, name, value)
+
 
 def get_media_base_form():
     base_form_override = wagtailmedia_settings.MEDIA_FORM_BASE
@@ -95,6 +167,14 @@ def get_media_base_form():
     return base_form
 
 
+# Form classes built by get_media_form, by model, base form setting and fields
+_media_form_cache = {}
+
+
+def clear_media_form_cache():
+    _media_form_cache.clear()
+
+
 def get_media_form(model):
     fields = model.admin_form_fields
     if "collection" not in fields:
@@ -104,12 +184,16 @@ def get_media_form(model):
         # and when only one collection exists, it will get hidden anyway.
         fields = list(fields) + ["collection"]
 
-    return modelform_factory(
-        model,
-        form=get_media_base_form(),
-        fields=fields,
-        formfield_callback=formfield_for_dbfield,
-    )
+    # Building the form class is costly, and it only changes with the settings
+    key = (model, wagtailmedia_settings.MEDIA_FORM_BASE, tuple(fields))
+    if key not in _media_form_cache:
+        _media_form_cache[key] = modelform_factory(
+            model,
+            form=get_media_base_form(),
+            fields=fields,
+            formfield_callback=formfield_for_dbfield,
+        )
+    return _media_form_cache[key]
 
 
 GroupMediaPermissionFormSet = collection_member_permission_formset_factory(
@@ -0,0 +1,188 @@
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+
+from wagtailmedia.models import get_media_model
+from wagtailmedia.probe import probe
+from wagtailmedia.probe.base import get_file_size
+
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 8
+
+
+class CountingFile:
+    """
+    Wraps a binary file object to count the bytes read from it.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset, whence=0):
+        return self.file.seek(offset, whence)
+
+    def tell(self):
+        return self.file.tell()
+
+
+def probe_stored_file(pk, name):
+    """
+    Probes a stored media file. Returns a ``(pk, metadata, bytes_read, size)`` tuple,
+    where metadata is None if the file is missing or could not be parsed, and size
+    is None if the file is missing.
+
+    Only primitive values are passed in and out, so this can run in a worker process.
+    """
+    storage = get_media_model()._meta.get_field("file").storage
+    try:
+        with storage.open(name, "rb") as f:
+            counting_file = CountingFile(f)
+            metadata = probe(counting_file)
+            return pk, metadata, counting_file.bytes_read, get_file_size(f)
+    except OSError:
+        return pk, None, 0, None
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in the duration, width and height of media items from the headers "
+        "of their files, along with their file size and MIME type. By default, only "
+        "media items with no duration or no recorded file size are probed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of media items fetched and updated at once",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help="Number of files probed concurrently",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help=(
+                "Probe files in threads (best for remote storages, where probing "
+                "waits on the network) or in processes"
+            ),
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="Resume from the media item after this id",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="probe_all",
+            help="Probe all media items, overwriting any existing metadata",
+        )
+
+    def write(self, *args, **kwargs):
+        if self.verbosity != 0:
+            self.stdout.write(*args, **kwargs)
+
+    def handle(self, **options):
+        self.verbosity = options["verbosity"]
+        batch_size = options["batch_size"]
+
+        Media = get_media_model()
+        fields = ["duration", "width", "height", "file_size", "mime_type"]
+        queryset = Media.objects.only("pk", "file", *fields)
+        if not options["probe_all"]:
+            queryset = queryset.filter(Q(duration=0) | Q(file_size__isnull=True))
+
+        if options["pool"] == "process":
+            # Forked workers must not share the parent's database connections
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=django.setup
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=options["workers"])
+
+        probed = updated = bytes_read = 0
+        last_pk = options["start_after"]
+        start_time = time.perf_counter()
+
+        with executor:
+            while True:
+                # Keyset pagination keeps each batch query fast, however far in we are
+                batch = list(
+                    queryset.filter(pk__gt=last_pk).order_by("pk")[:batch_size]
+                )
+                if not batch:
+                    break
+
+                media_by_pk = {media.pk: media for media in batch}
+                results = executor.map(
+                    probe_stored_file,
+                    [media.pk for media in batch],
+                    [media.file.name for media in batch],
+                )
+
+                to_update = []
+                for pk, metadata, file_bytes_read, size in results:
+                    bytes_read += file_bytes_read
+                    if size is None:
+                        continue
+
+                    media = media_by_pk[pk]
+                    values = {
+                        "file_size": size,
+                        "mime_type": media.mime_type or media.guess_mime_type(),
+                    }
+                    # Metadata entered for the media item is kept, unless asked otherwise
+                    if metadata is not None and (
+                        options["probe_all"] or not media.duration
+                    ):
+                        for name in ("duration", "width", "height"):
+                            value = getattr(metadata, name)
+                            if value is not None:
+                                values[name] = value
+
+                    if any(
+                        getattr(media, name) != value for name, value in values.items()
+                    ):
+                        for name, value in values.items():
+                            setattr(media, name, value)
+                        to_update.append(media)
+
+                Media.objects.bulk_update(to_update, fields, batch_size=batch_size)
+
+                probed += len(batch)
+                updated += len(to_update)
+                last_pk = batch[-1].pk
+                self.write(
+                    f"Probed {probed} media items, last id {last_pk} "
+                    f"(resume with --start-after={last_pk})"
+                )
+
+        elapsed = time.perf_counter() - start_time
+        files_per_second = probed / elapsed if elapsed else 0
+        self.write(
+            self.style.SUCCESS(
+                f"Updated {updated} of {probed} media items in {elapsed:.1f}s "
+                f"({files_per_second:.1f} files/s, {bytes_read} bytes read)"
+            )
+        )
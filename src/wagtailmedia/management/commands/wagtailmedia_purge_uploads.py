@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from wagtailmedia.uploads import purge_expired_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove the stored parts of chunked uploads that have expired without "
+        "being completed, see the CHUNKED_UPLOAD_MAX_AGE setting."
+    )
+
+    def handle(self, **options):
+        removed = purge_expired_uploads()
+        if options["verbosity"] != 0:
+            self.stdout.write(
+                self.style.SUCCESS(f"Removed {removed} expired upload parts")
+            )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtailmedia", "0005_alter_media_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="media",
+            name="file_hash",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=64
+            ),
+        ),
+    ]
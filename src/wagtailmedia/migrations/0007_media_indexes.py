@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtailmedia", "0006_media_file_hash"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(
+                fields=["-created_at"], name="wagtailmedi_created_4ad28a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(
+                fields=["type", "-created_at"], name="wagtailmedi_type_c04b5a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(
+                fields=["collection", "-created_at"],
+                name="wagtailmedi_collect_6db69d_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(fields=["title"], name="wagtailmedi_title_dd5c67_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(
+                fields=["uploaded_by_user", "-created_at"],
+                name="wagtailmedi_uploade_ffd448_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:46
+
+import django.db.models.deletion
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtailmedia", "0007_media_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaRendition",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(upload_to="media_renditions", verbose_name="file"),
+                ),
+                (
+                    "mime_type",
+                    models.CharField(
+                        blank=True,
+                        help_text="Guessed from the file name if left blank",
+                        max_length=255,
+                        verbose_name="MIME type",
+                    ),
+                ),
+                (
+                    "bitrate",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Bits per second",
+                        null=True,
+                        verbose_name="bitrate",
+                    ),
+                ),
+                (
+                    "width",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="width"
+                    ),
+                ),
+                (
+                    "height",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="height"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created at"),
+                ),
+                (
+                    "media",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="renditions",
+                        to="wagtailmedia.media",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "media rendition",
+                "verbose_name_plural": "media renditions",
+                "ordering": ["id"],
+                "abstract": False,
+            },
+        ),
+    ]
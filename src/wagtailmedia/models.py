@@ -14,6 +14,7 @@ from wagtail.search import index
 from wagtail.search.queryset import SearchableQuerySetMixin
 
 from wagtailmedia.settings import wagtailmedia_settings
+from wagtailmedia.utils import hash_filelike
 
 
 ALLOWED_EXTENSIONS_THUMBNAIL = ["gif", "jpg", "jpeg", "png", "webp"]
@@ -25,7 +26,22 @@ class MediaType(models.TextChoices):
 
 
 class MediaQuerySet(SearchableQuerySetMixin, models.QuerySet):
-    pass
+    def for_listing(self):
+        """
+        Loads the collection of each media item along with it, and only the columns
+        named in the model's ``listing_fields``, for the admin listings.
+        """
+        fields = self.model.listing_fields
+        related_fields = ["collection__name"] if "collection" in fields else []
+        return self.select_related("collection").only(*fields, *related_fields)
+
+    def prefetch_renditions(self):
+        """
+        Loads the renditions of all media items in one query, for ``sources``.
+        """
+        if self.model.get_rendition_model() is None:
+            return self
+        return self.prefetch_related("renditions")
 
 
 class AbstractMedia(CollectionMember, index.Indexed, models.Model):
@@ -49,6 +65,12 @@ class AbstractMedia(CollectionMember, index.Indexed, models.Model):
     thumbnail = models.FileField(
         upload_to="media_thumbnails", blank=True, verbose_name=_("thumbnail")
     )
+    file_hash = models.CharField(
+        max_length=64, blank=True, editable=False, db_index=True
+    )
+    # Recorded on upload, so that showing them never reads the stored file
+    file_size = models.PositiveBigIntegerField(null=True, editable=False)
+    mime_type = models.CharField(max_length=255, blank=True, editable=False)
 
     created_at = models.DateTimeField(verbose_name=_("created at"), auto_now_add=True)
     uploaded_by_user = models.ForeignKey(
@@ -64,6 +86,10 @@ class AbstractMedia(CollectionMember, index.Indexed, models.Model):
 
     objects = MediaQuerySet.as_manager()
 
+    # Media items are indexed once saved changes are committed, by the signal
+    # handlers of wagtailmedia rather than those of Wagtail, see index_on_commit
+    search_auto_update = False
+
     search_fields = CollectionMember.search_fields + [
         index.SearchField("title", boost=10),
         index.AutocompleteField("title", boost=10),
@@ -90,6 +116,10 @@ class AbstractMedia(CollectionMember, index.Indexed, models.Model):
         "tags",
     )
 
+    # Columns loaded by the admin index and chooser listings. Any other field used
+    # in customised listing templates must be added here, to avoid a query per row.
+    listing_fields = ("title", "file", "type", "collection", "created_at")
+
     def __str__(self):
         return self.title
 
@@ -111,17 +141,103 @@ class AbstractMedia(CollectionMember, index.Indexed, models.Model):
 
     @property
     def url(self):
-        return self.file.url
+        if wagtailmedia_settings.SERVE_METHOD == "direct":
+            return self.file.url
+        return reverse("wagtailmedia_serve", args=(self.id, self.filename))
+
+    @property
+    def thumbnail_url(self) -> str:
+        if not self.thumbnail:
+            return ""
+        if wagtailmedia_settings.SERVE_METHOD == "direct":
+            return self.thumbnail.url
+        return reverse(
+            "wagtailmedia_serve_thumbnail", args=(self.id, self.thumbnail_filename)
+        )
 
     @property
     def sources(self):
-        return [
-            {
-                "src": self.url,
-                "type": mimetypes.guess_type(self.filename)[0]
-                or "application/octet-stream",
-            }
-        ]
+        """
+        The media file followed by its renditions, as ``src`` and ``type`` pairs
+        for ``<source>`` elements. Use ``prefetch_renditions`` when listing the
+        sources of many media items, to avoid a query for each of them.
+        """
+        sources = [{"src": self.url, "type": self.mime_type or self.guess_mime_type()}]
+        if self.pk is not None and self.get_rendition_model() is not None:
+            sources += [rendition.source for rendition in self.renditions.all()]
+        return sources
+
+    @classmethod
+    def get_rendition_model(cls):
+        """
+        Returns the rendition model of this media model, or None if it has none.
+        """
+        try:
+            return cls.renditions.rel.related_model
+        except AttributeError:
+            return None
+
+    def guess_mime_type(self) -> str:
+        return mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+
+    def set_file_info(self):
+        """
+        Records the size and MIME type of the file. For a new upload, these are known
+        without reading the stored file.
+        """
+        self.file_size = self.file.size
+        self.mime_type = self.guess_mime_type()
+
+    def get_file_size(self) -> int | None:
+        """
+        Returns the recorded file size, reading and recording it from the storage
+        for media items uploaded before it was recorded. Returns None if the file
+        cannot be found.
+        """
+        if self.file_size is None:
+            try:
+                self.file_size = self.file.size
+            except (OSError, ValueError):
+                return None
+            # Not saved, as this is called on GET requests, and nothing else changed
+            type(self).objects.filter(pk=self.pk).update(file_size=self.file_size)
+
+        return self.file_size
+
+    def save(self, *args, **kwargs):
+        if self.file and not self.file._committed:
+            self.set_file_info()
+            # The hash of the previous file must not be kept. Uploads received by
+            # the hashing upload handlers were hashed as they arrived
+            self.file_hash = getattr(self.file.file, "sha256", "") or hash_filelike(
+                self.file.file
+            )
+        super().save(*args, **kwargs)
+
+    def _set_file_hash(self):
+        with self.file.open("rb") as f:
+            self.file_hash = hash_filelike(f)
+
+    def get_file_hash(self):
+        if self.file_hash == "":
+            self._set_file_hash()
+            # Not saved, as nothing else changed
+            type(self).objects.filter(pk=self.pk).update(file_hash=self.file_hash)
+
+        return self.file_hash
+
+    def is_file_shared(self, name: str | None = None) -> bool:
+        """
+        Returns whether other media items use the stored file with the given name,
+        which defaults to this item's file. Files are shared between media items
+        when identical uploads are deduplicated.
+        """
+        return (
+            type(self)
+            .objects.filter(file=name or self.file.name)
+            .exclude(pk=self.pk)
+            .exists()
+        )
 
     def get_usage(self):
         return ReferenceIndex.get_references_to(self).group_by_source_object()
@@ -155,12 +271,85 @@ class AbstractMedia(CollectionMember, index.Indexed, models.Model):
         abstract = True
         verbose_name = _("media")
         verbose_name_plural = _("media items")
+        # Match the filters and orderings of the admin listings
+        indexes = [
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["type", "-created_at"]),
+            models.Index(fields=["collection", "-created_at"]),
+            models.Index(fields=["title"]),
+            models.Index(fields=["uploaded_by_user", "-created_at"]),
+        ]
 
 
 class Media(AbstractMedia):
     pass
 
 
+class AbstractMediaRendition(models.Model):
+    """
+    An alternative encoding or container of a media item's file, offered to players
+    alongside it. Concrete models must define a ``media`` foreign key to the media
+    model, with ``related_name="renditions"``.
+    """
+
+    file = models.FileField(upload_to="media_renditions", verbose_name=_("file"))
+    mime_type = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_("MIME type"),
+        help_text=_("Guessed from the file name if left blank"),
+    )
+    bitrate = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("bitrate"),
+        help_text=_("Bits per second"),
+    )
+    width = models.PositiveIntegerField(null=True, blank=True, verbose_name=_("width"))
+    height = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name=_("height")
+    )
+    created_at = models.DateTimeField(verbose_name=_("created at"), auto_now_add=True)
+
+    def __str__(self):
+        return self.filename
+
+    @property
+    def filename(self):
+        return os.path.basename(self.file.name)
+
+    @property
+    def url(self):
+        if wagtailmedia_settings.SERVE_METHOD == "direct":
+            return self.file.url
+        return reverse(
+            "wagtailmedia_serve_rendition",
+            args=(self.media_id, self.id, self.filename),
+        )
+
+    @property
+    def source(self):
+        return {"src": self.url, "type": self.mime_type or "application/octet-stream"}
+
+    def save(self, *args, **kwargs):
+        # Guess the type once, rather than on every access of the media sources
+        if not self.mime_type:
+            self.mime_type = mimetypes.guess_type(self.filename)[0] or ""
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+        ordering = ["id"]
+        verbose_name = _("media rendition")
+        verbose_name_plural = _("media renditions")
+
+
+class MediaRendition(AbstractMediaRendition):
+    media = models.ForeignKey(
+        Media, related_name="renditions", on_delete=models.CASCADE
+    )
+
+
 def get_media_model():
     from django.apps import apps
 
@@ -184,5 +373,20 @@ def get_media_model():
     return media_model
 
 
+def prefetch_renditions(media_items):
+    """
+    Loads the renditions of already fetched media items, such as those chosen in
+    the blocks of a page, in one query per media model. Empty items are skipped.
+    """
+    items_by_model = {}
+    for item in media_items:
+        if item is not None:
+            items_by_model.setdefault(type(item), []).append(item)
+
+    for model, items in items_by_model.items():
+        if model.get_rendition_model() is not None:
+            models.prefetch_related_objects(items, "renditions")
+
+
 # Provides `request` as an argument
 media_served = Signal()
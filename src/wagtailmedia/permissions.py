@@ -3,6 +3,28 @@ from wagtail.permission_policies.collections import CollectionOwnershipPermissio
 from wagtailmedia.models import Media, get_media_model
 
 
-permission_policy = CollectionOwnershipPermissionPolicy(
+class MediaPermissionPolicy(CollectionOwnershipPermissionPolicy):
+    """
+    Wagtail caches the user's collection permissions on the user object, but not the
+    collections they grant, which every media form and listing looks up again. These
+    are cached on the user object too, so they are queried once per request.
+    """
+
+    collections_cache_name = "_wagtailmedia_collections_cache"
+
+    def collections_user_has_any_permission_for(self, user, actions):
+        if not hasattr(user, self.collections_cache_name):
+            setattr(user, self.collections_cache_name, {})
+        collections_cache = getattr(user, self.collections_cache_name)
+
+        key = frozenset(actions)
+        if key not in collections_cache:
+            collections_cache[key] = super().collections_user_has_any_permission_for(
+                user, actions
+            )
+        return collections_cache[key]
+
+
+permission_policy = MediaPermissionPolicy(
     get_media_model(), auth_model=Media, owner_field_name="uploaded_by_user"
 )
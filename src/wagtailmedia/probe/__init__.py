@@ -0,0 +1,68 @@
+"""
+Reads the duration, and the dimensions for video files, from the headers of audio and
+video files. Parsers only read the few headers they need and seek over everything else,
+so probing a multi-gigabyte file reads a few kilobytes.
+"""
+
+import struct
+
+from .base import MediaMetadata, ProbeError, get_file_size, skip_id3v2
+from .flac import is_flac, probe_flac
+from .iff import is_aiff, is_avi, is_wav, probe_aiff, probe_avi, probe_wav
+from .matroska import is_matroska, probe_matroska
+from .mp4 import is_mp4, probe_mp4
+from .mpeg_audio import is_mpeg_audio, probe_mpeg_audio
+from .ogg import is_ogg, probe_ogg
+
+
+__all__ = ["MediaMetadata", "ProbeError", "probe"]
+
+
+PARSERS = [
+    (is_mp4, probe_mp4),
+    (is_matroska, probe_matroska),
+    (is_flac, probe_flac),
+    (is_ogg, probe_ogg),
+    (is_wav, probe_wav),
+    (is_aiff, probe_aiff),
+    (is_avi, probe_avi),
+    (is_mpeg_audio, probe_mpeg_audio),
+]
+
+
+def get_parser(f):
+    f.seek(0)
+    head = f.read(12)
+
+    if head[:3] == b"ID3":
+        # ID3v2 tags are mostly found in MP3 files, but some encoders add them to FLAC
+        f.seek(skip_id3v2(f))
+        if is_flac(f.read(4)):
+            return probe_flac
+
+    for matches, parser in PARSERS:
+        if matches(head):
+            return parser
+    return None
+
+
+def probe(f) -> MediaMetadata | None:
+    """
+    Returns the metadata of the given binary file object, or None if the file format
+    is not supported or its headers cannot be parsed. The file position is preserved.
+    """
+    try:
+        position = f.tell()
+    except (AttributeError, OSError):
+        position = 0
+
+    try:
+        size = get_file_size(f)
+        parser = get_parser(f)
+        if parser is None:
+            return None
+        return parser(f, size)
+    except (ProbeError, OSError, ValueError, IndexError, ArithmeticError, struct.error):
+        return None
+    finally:
+        f.seek(position)
@@ -0,0 +1,46 @@
+import os
+
+from dataclasses import dataclass
+
+
+@dataclass
+class MediaMetadata:
+    duration: float | None = None
+    width: int | None = None
+    height: int | None = None
+
+
+class ProbeError(Exception):
+    """
+    Raised when a file does not match the structure expected by a parser.
+    """
+
+
+def read_exactly(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ProbeError("Unexpected end of file")
+    return data
+
+
+def get_file_size(f) -> int:
+    f.seek(0, os.SEEK_END)
+    return f.tell()
+
+
+def skip_id3v2(f) -> int:
+    """
+    Returns the offset of the first byte after any ID3v2 tag at the start of the file.
+    """
+    f.seek(0)
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+
+    # the tag size is a 28-bit "syncsafe" integer, i.e. 7 bits per byte
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+
+    has_footer = header[5] & 0x10
+    return 10 + size + (10 if has_footer else 0)
@@ -0,0 +1,41 @@
+"""
+FLAC files start with a STREAMINFO metadata block holding the sample rate and the
+total number of samples.
+"""
+
+from .base import MediaMetadata, ProbeError, read_exactly, skip_id3v2
+
+
+STREAMINFO = 0
+
+
+def is_flac(head: bytes) -> bool:
+    return head[:4] == b"fLaC"
+
+
+def parse_streaminfo(data: bytes) -> MediaMetadata:
+    # 20 bits sample rate, 3 bits channels, 5 bits bits per sample, 36 bits total samples
+    packed = int.from_bytes(data[10:18], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & 0xFFFFFFFFF
+    if not sample_rate:
+        raise ProbeError("Invalid FLAC sample rate")
+
+    # the total number of samples is 0 when unknown
+    return MediaMetadata(
+        duration=total_samples / sample_rate if total_samples else None
+    )
+
+
+def probe_flac(f, size: int) -> MediaMetadata:
+    # some encoders prepend an ID3v2 tag
+    start = skip_id3v2(f)
+    f.seek(start)
+    if read_exactly(f, 4) != b"fLaC":
+        raise ProbeError("Not a FLAC file")
+
+    block_header = read_exactly(f, 4)
+    if block_header[0] & 0x7F != STREAMINFO:
+        raise ProbeError("The first FLAC metadata block must be STREAMINFO")
+
+    return parse_streaminfo(read_exactly(f, 34))
@@ -0,0 +1,101 @@
+"""
+WAV and AVI files are RIFF containers (little-endian chunks), AIFF files are IFF
+containers (big-endian chunks). The format chunk is read and the sample data chunk
+is only measured, never read.
+"""
+
+import struct
+
+from .base import MediaMetadata, ProbeError, read_exactly
+
+
+def is_wav(head: bytes) -> bool:
+    return head[:4] == b"RIFF" and head[8:12] == b"WAVE"
+
+
+def is_avi(head: bytes) -> bool:
+    return head[:4] == b"RIFF" and head[8:12] == b"AVI "
+
+
+def is_aiff(head: bytes) -> bool:
+    return head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC")
+
+
+def iter_chunks(f, start: int, end: int, byte_order: str):
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        chunk_id, chunk_size = struct.unpack(f"{byte_order}4sI", read_exactly(f, 8))
+        yield chunk_id, offset + 8, chunk_size
+        # chunks are padded to an even size
+        offset += 8 + chunk_size + (chunk_size & 1)
+
+
+def probe_wav(f, size: int) -> MediaMetadata:
+    byte_rate = None
+    for chunk_id, start, chunk_size in iter_chunks(f, 12, size, "<"):
+        if chunk_id == b"fmt ":
+            f.seek(start + 8)
+            (byte_rate,) = struct.unpack("<I", read_exactly(f, 4))
+        elif chunk_id == b"data":
+            if not byte_rate:
+                raise ProbeError("No fmt chunk before the data chunk")
+            if chunk_size == 0xFFFFFFFF or start + chunk_size > size:
+                # streamed or truncated files do not have an accurate data size
+                chunk_size = size - start
+            return MediaMetadata(duration=chunk_size / byte_rate)
+
+    raise ProbeError("No data chunk found")
+
+
+def probe_avi(f, size: int) -> MediaMetadata:
+    for chunk_id, start, chunk_size in iter_chunks(f, 12, size, "<"):
+        if chunk_id != b"LIST":
+            continue
+        f.seek(start)
+        if read_exactly(f, 4) != b"hdrl":
+            continue
+
+        for child_id, child_start, _child_size in iter_chunks(
+            f, start + 4, start + chunk_size, "<"
+        ):
+            if child_id == b"avih":
+                f.seek(child_start)
+                values = struct.unpack("<10I", read_exactly(f, 40))
+                microseconds_per_frame, total_frames = values[0], values[4]
+                width, height = values[8], values[9]
+                return MediaMetadata(
+                    duration=total_frames * microseconds_per_frame / 1_000_000,
+                    width=width or None,
+                    height=height or None,
+                )
+
+    raise ProbeError("No AVI main header found")
+
+
+def read_extended_float(data: bytes) -> float:
+    """
+    Decodes the 80-bit IEEE 754 extended precision number AIFF uses for sample rates.
+    """
+    exponent, mantissa = struct.unpack(">HQ", data)
+    sign = -1 if exponent & 0x8000 else 1
+    exponent &= 0x7FFF
+    if exponent == 0 and mantissa == 0:
+        return 0.0
+    # Far above any sample rate, and too large for a float past 2 ** 1024
+    if exponent > 16383 + 63:
+        raise ProbeError("Invalid extended float exponent")
+    return sign * mantissa * 2.0 ** (exponent - 16383 - 63)
+
+
+def probe_aiff(f, size: int) -> MediaMetadata:
+    for chunk_id, start, _chunk_size in iter_chunks(f, 12, size, ">"):
+        if chunk_id == b"COMM":
+            f.seek(start)
+            _channels, frames, _sample_size = struct.unpack(">HIH", read_exactly(f, 8))
+            sample_rate = read_extended_float(read_exactly(f, 10))
+            if not sample_rate:
+                raise ProbeError("Invalid AIFF sample rate")
+            return MediaMetadata(duration=frames / sample_rate)
+
+    raise ProbeError("No COMM chunk found")
@@ -0,0 +1,199 @@
+"""
+Matroska (MKV) and WebM files are EBML documents. The duration is in the Segment
+Info element and the dimensions in the Video element of the first video TrackEntry.
+Both normally come before the first Cluster; when they do not, the SeekHead tells
+us where to find them. Clusters, which hold the actual media, are never read.
+"""
+
+import struct
+
+from .base import MediaMetadata, ProbeError, read_exactly
+
+
+EBML = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+CLUSTER = 0x1F43B675
+
+TRACK_TYPE_VIDEO = 1
+DEFAULT_TIMECODE_SCALE = 1_000_000  # nanoseconds
+
+
+def is_matroska(head: bytes) -> bool:
+    return head[:4] == EBML.to_bytes(4, "big")
+
+
+def read_vint(f) -> tuple[int, int, bool]:
+    """
+    Reads an EBML variable-length integer. Returns its raw value (marker bit included),
+    its value without the marker bit and whether all value bits are set, which is how
+    elements of unknown size are encoded.
+    """
+    first = read_exactly(f, 1)[0]
+    if not first:
+        raise ProbeError("Invalid EBML variable-length integer")
+
+    length = 9 - first.bit_length()
+    rest = read_exactly(f, length - 1)
+    raw = int.from_bytes(bytes([first]) + rest, "big")
+
+    value_bits = 7 * length
+    value = raw & ((1 << value_bits) - 1)
+    return raw, value, value == (1 << value_bits) - 1
+
+
+def iter_elements(f, start: int, end: int):
+    """
+    Yields (element id, data offset, data size) for the elements between start and end.
+    The size is None for elements of unknown size, after which iteration stops as there
+    is no way of telling where they end without reading them.
+    """
+    offset = start
+    while offset < end:
+        f.seek(offset)
+        element_id, _value, _unknown = read_vint(f)
+        _raw, size, unknown_size = read_vint(f)
+        data_start = f.tell()
+        if unknown_size:
+            yield element_id, data_start, None
+            return
+
+        yield element_id, data_start, size
+        offset = data_start + size
+
+
+def read_uint(f, start: int, size: int) -> int:
+    # Checked before reading, as the size of corrupt elements can be the whole file
+    if size is None or size > 8:
+        raise ProbeError("Invalid EBML unsigned integer size")
+    f.seek(start)
+    return int.from_bytes(read_exactly(f, size), "big")
+
+
+def read_float(f, start: int, size: int) -> float:
+    f.seek(start)
+    if size == 4:
+        return struct.unpack(">f", read_exactly(f, 4))[0]
+    if size == 8:
+        return struct.unpack(">d", read_exactly(f, 8))[0]
+    raise ProbeError("Invalid EBML float size")
+
+
+def parse_info(f, start: int, end: int, metadata: MediaMetadata):
+    timecode_scale = DEFAULT_TIMECODE_SCALE
+    duration = None
+    for element_id, data_start, size in iter_elements(f, start, end):
+        if element_id == TIMECODE_SCALE:
+            timecode_scale = read_uint(f, data_start, size)
+        elif element_id == DURATION:
+            duration = read_float(f, data_start, size)
+
+    if duration is not None:
+        metadata.duration = duration * timecode_scale / 1_000_000_000
+
+
+def parse_tracks(f, start: int, end: int, metadata: MediaMetadata):
+    for element_id, entry_start, entry_size in iter_elements(f, start, end):
+        if element_id != TRACK_ENTRY or entry_size is None:
+            continue
+
+        track_type = None
+        width = height = None
+        for child_id, child_start, child_size in iter_elements(
+            f, entry_start, entry_start + entry_size
+        ):
+            if child_id == TRACK_TYPE:
+                track_type = read_uint(f, child_start, child_size)
+            elif child_id == VIDEO and child_size is not None:
+                for video_id, video_start, video_size in iter_elements(
+                    f, child_start, child_start + child_size
+                ):
+                    if video_id == PIXEL_WIDTH:
+                        width = read_uint(f, video_start, video_size)
+                    elif video_id == PIXEL_HEIGHT:
+                        height = read_uint(f, video_start, video_size)
+
+        if track_type == TRACK_TYPE_VIDEO and width and height:
+            metadata.width = width
+            metadata.height = height
+            return
+
+
+def parse_seek_head(f, start: int, end: int) -> dict[int, int]:
+    """
+    Returns the positions, relative to the Segment data, of the top-level elements
+    listed in a SeekHead.
+    """
+    positions = {}
+    for element_id, seek_start, seek_size in iter_elements(f, start, end):
+        if element_id != SEEK or seek_size is None:
+            continue
+
+        seek_id = position = None
+        for child_id, child_start, child_size in iter_elements(
+            f, seek_start, seek_start + seek_size
+        ):
+            if child_id == SEEK_ID:
+                seek_id = read_uint(f, child_start, child_size)
+            elif child_id == SEEK_POSITION:
+                position = read_uint(f, child_start, child_size)
+
+        if seek_id is not None and position is not None:
+            positions[seek_id] = position
+    return positions
+
+
+def probe_matroska(f, size: int) -> MediaMetadata:
+    metadata = MediaMetadata()
+
+    for element_id, segment_start, segment_size in iter_elements(f, 0, size):
+        if element_id != SEGMENT:
+            continue
+
+        segment_end = size if segment_size is None else segment_start + segment_size
+        parsers = {INFO: parse_info, TRACKS: parse_tracks}
+        seek_positions = {}
+
+        for child_id, child_start, child_size in iter_elements(
+            f, segment_start, segment_end
+        ):
+            if child_id in parsers and child_size is not None:
+                parsers.pop(child_id)(
+                    f, child_start, child_start + child_size, metadata
+                )
+            elif child_id == SEEK_HEAD and child_size is not None:
+                seek_positions = parse_seek_head(
+                    f, child_start, child_start + child_size
+                )
+            elif child_id == CLUSTER:
+                break
+
+            if not parsers:
+                return metadata
+
+        # Info or Tracks come after the clusters, jump straight to them.
+        for element_id, parser in parsers.items():
+            if element_id not in seek_positions:
+                continue
+            for child_id, child_start, child_size in iter_elements(
+                f, segment_start + seek_positions[element_id], segment_end
+            ):
+                if child_id == element_id and child_size is not None:
+                    parser(f, child_start, child_start + child_size, metadata)
+                break
+
+        return metadata
+
+    raise ProbeError("No Segment element found")
@@ -0,0 +1,88 @@
+"""
+MP4, M4A and QuickTime (MOV) files are made of nested boxes. The duration is in the
+movie header (moov/mvhd) and the dimensions in the header of the first video track
+(moov/trak/tkhd). The media data (mdat) is skipped over, so files with their moov box
+at the end cost a handful of seeks rather than a full read.
+"""
+
+import struct
+
+from .base import MediaMetadata, ProbeError, read_exactly
+
+
+SIGNATURES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+
+
+def is_mp4(head: bytes) -> bool:
+    return head[4:8] in SIGNATURES
+
+
+def iter_boxes(f, start: int, end: int):
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, box_type = struct.unpack(">I4s", read_exactly(f, 8))
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", read_exactly(f, 8))
+            header_size = 16
+        elif size == 0:
+            # the box extends to the end of the file
+            size = end - offset
+
+        if size < header_size:
+            raise ProbeError(f"Invalid size for the {box_type!r} box")
+
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+
+def parse_mvhd(f, start: int, metadata: MediaMetadata):
+    f.seek(start)
+    version = read_exactly(f, 4)[0]
+    if version == 1:
+        f.seek(start + 20)
+        timescale, duration = struct.unpack(">IQ", read_exactly(f, 12))
+        unknown = 0xFFFFFFFFFFFFFFFF
+    else:
+        f.seek(start + 12)
+        timescale, duration = struct.unpack(">II", read_exactly(f, 8))
+        unknown = 0xFFFFFFFF
+
+    if timescale and duration != unknown:
+        metadata.duration = duration / timescale
+
+
+def parse_tkhd(f, start: int, metadata: MediaMetadata):
+    f.seek(start)
+    version = read_exactly(f, 4)[0]
+    # skip the times, track id and duration, the layer, volume and the matrix
+    f.seek(start + 4 + (32 if version == 1 else 20) + 52)
+    width, height = struct.unpack(">II", read_exactly(f, 8))
+
+    # dimensions are 16.16 fixed-point numbers, and zero for audio tracks
+    if width and height:
+        metadata.width = width >> 16
+        metadata.height = height >> 16
+
+
+def probe_mp4(f, size: int) -> MediaMetadata:
+    metadata = MediaMetadata()
+
+    for box_type, start, end in iter_boxes(f, 0, size):
+        if box_type != b"moov":
+            continue
+
+        for child_type, child_start, child_end in iter_boxes(f, start, end):
+            if child_type == b"mvhd":
+                parse_mvhd(f, child_start, metadata)
+            elif child_type == b"trak" and metadata.width is None:
+                for track_box_type, track_box_start, _end in iter_boxes(
+                    f, child_start, child_end
+                ):
+                    if track_box_type == b"tkhd":
+                        parse_tkhd(f, track_box_start, metadata)
+                        break
+        return metadata
+
+    raise ProbeError("No moov box found")
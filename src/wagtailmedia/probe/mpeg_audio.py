@@ -0,0 +1,206 @@
+"""
+MP3 (and MPEG-1/2 Layer I/II) files are a sequence of frames, optionally preceded
+by an ID3v2 tag. Variable bitrate files announce their frame count in a Xing/Info or
+VBRI header inside the first frame. Otherwise, the duration is derived from the size
+of the audio data and the bitrate of the first frame, as in constant bitrate files.
+"""
+
+from .base import MediaMetadata, ProbeError, skip_id3v2
+
+
+# the number of bytes scanned for the first frame after any ID3v2 tag
+SCAN_SIZE = 16 * 1024
+
+MPEG_1 = 3
+MPEG_2 = 2
+MPEG_2_5 = 0
+
+LAYER_1 = 3
+LAYER_2 = 2
+LAYER_3 = 1
+
+# kbps, by (MPEG version 1 or not, layer)
+BITRATES = {
+    (True, LAYER_1): (
+        0,
+        32,
+        64,
+        96,
+        128,
+        160,
+        192,
+        224,
+        256,
+        288,
+        320,
+        352,
+        384,
+        416,
+        448,
+    ),
+    (True, LAYER_2): (
+        0,
+        32,
+        48,
+        56,
+        64,
+        80,
+        96,
+        112,
+        128,
+        160,
+        192,
+        224,
+        256,
+        320,
+        384,
+    ),
+    (True, LAYER_3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, LAYER_1): (
+        0,
+        32,
+        48,
+        56,
+        64,
+        80,
+        96,
+        112,
+        128,
+        144,
+        160,
+        176,
+        192,
+        224,
+        256,
+    ),
+    (False, LAYER_2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, LAYER_3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+SAMPLE_RATES = {
+    MPEG_1: (44100, 48000, 32000),
+    MPEG_2: (22050, 24000, 16000),
+    MPEG_2_5: (11025, 12000, 8000),
+}
+
+
+def is_mpeg_audio(head: bytes) -> bool:
+    return head[:3] == b"ID3" or (
+        len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0
+    )
+
+
+def parse_frame_header(data: bytes, offset: int) -> dict | None:
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        # reserved values, or "free" bitrate which we cannot compute a duration from
+        return None
+
+    is_mpeg_1 = version == MPEG_1
+    bitrate = BITRATES[(is_mpeg_1, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == LAYER_1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == LAYER_3 and not is_mpeg_1:
+        samples_per_frame = 576
+        frame_length = 72 * bitrate // sample_rate + padding
+    else:
+        samples_per_frame = 1152
+        frame_length = 144 * bitrate // sample_rate + padding
+
+    return {
+        "is_mpeg_1": is_mpeg_1,
+        "mono": b3 >> 6 == 3,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "samples_per_frame": samples_per_frame,
+        "frame_length": frame_length,
+    }
+
+
+def find_first_frame(data: bytes) -> tuple[int, dict]:
+    offset = data.find(b"\xff")
+    while offset != -1:
+        header = parse_frame_header(data, offset)
+        if header is not None:
+            # guard against false syncs by checking the following frame, when we have it
+            next_offset = offset + header["frame_length"]
+            if (
+                next_offset + 4 > len(data)
+                or parse_frame_header(data, next_offset) is not None
+            ):
+                return offset, header
+        offset = data.find(b"\xff", offset + 1)
+    raise ProbeError("No MPEG audio frame found")
+
+
+def get_sample_count(frame: bytes, header: dict) -> int | None:
+    """
+    Returns the number of samples from a Xing/Info or VBRI header, if present, less
+    the encoder delay and padding recorded in LAME headers.
+    """
+    if header["is_mpeg_1"]:
+        side_info_size = 17 if header["mono"] else 32
+    else:
+        side_info_size = 9 if header["mono"] else 17
+
+    offset = 4 + side_info_size
+    if frame[offset : offset + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(frame[offset + 4 : offset + 8], "big")
+        if not flags & 0x01:
+            return None
+        frames = int.from_bytes(frame[offset + 8 : offset + 12], "big")
+        samples = frames * header["samples_per_frame"]
+
+        # skip the frame count, then the byte count, table of contents and quality
+        # indicator when present, to reach the optional LAME extension
+        offset += 12
+        for flag, size in ((0x02, 4), (0x04, 100), (0x08, 4)):
+            if flags & flag:
+                offset += size
+        if frame[offset : offset + 4] == b"LAME" and frame[offset + 9] >> 4 == 0:
+            gapless = int.from_bytes(frame[offset + 21 : offset + 24], "big")
+            samples -= (gapless >> 12) + (gapless & 0xFFF)
+
+        return max(samples, 0)
+
+    if frame[36:40] == b"VBRI":
+        frames = int.from_bytes(frame[50:54], "big")
+        return frames * header["samples_per_frame"]
+
+    return None
+
+
+def probe_mpeg_audio(f, size: int) -> MediaMetadata:
+    audio_start = skip_id3v2(f)
+    f.seek(audio_start)
+    data = f.read(SCAN_SIZE)
+
+    offset, header = find_first_frame(data)
+    frame_start = audio_start + offset
+
+    samples = get_sample_count(data[offset : offset + 192], header)
+    if samples is not None:
+        return MediaMetadata(duration=samples / header["sample_rate"])
+
+    # Constant bitrate: everything between the first frame and the ID3v1 tag, if any,
+    # is audio data.
+    audio_end = size
+    if size >= 128:
+        f.seek(size - 128)
+        if f.read(3) == b"TAG":
+            audio_end -= 128
+
+    return MediaMetadata(duration=(audio_end - frame_start) * 8 / header["bitrate"])
@@ -0,0 +1,126 @@
+"""
+Ogg files (Vorbis, Opus, FLAC or Theora) are a sequence of pages. The first page of
+a stream carries the codec identification header, and the granule position of the
+last page of that stream gives its length in samples (or frames, for Theora). Only
+the first pages and the tail of the file are read.
+"""
+
+import struct
+
+from .base import MediaMetadata, ProbeError, read_exactly
+
+
+# Ogg pages are at most 65307 bytes long, so the last page starts within this window.
+TAIL_SIZE = 65536 + 27
+
+PAGE_HEADER = struct.Struct("<4sBBqII")
+BEGINNING_OF_STREAM = 0x02
+
+
+def is_ogg(head: bytes) -> bool:
+    return head[:4] == b"OggS"
+
+
+def iter_first_packets(f):
+    """
+    Yields the serial number and first packet of each logical stream. Streams all
+    start with a "beginning of stream" page, grouped at the start of the file.
+    """
+    offset = 0
+    while True:
+        f.seek(offset)
+        capture, _version, flags, _granule, serial, _sequence = PAGE_HEADER.unpack(
+            read_exactly(f, PAGE_HEADER.size)
+        )
+        if capture != b"OggS":
+            raise ProbeError("Not an Ogg page")
+        if not flags & BEGINNING_OF_STREAM:
+            return
+
+        f.seek(4, 1)  # CRC
+        segment_count = read_exactly(f, 1)[0]
+        packet_size = sum(read_exactly(f, segment_count))
+        yield serial, read_exactly(f, packet_size)
+
+        offset = f.tell()
+
+
+def parse_identification(packet: bytes) -> tuple[int, int, MediaMetadata]:
+    """
+    Returns the granule rate, the number of granules to discount at the start of the
+    stream and the dimensions, for video streams.
+    """
+    if packet[:7] == b"\x01vorbis":
+        (sample_rate,) = struct.unpack("<I", packet[12:16])
+        return sample_rate, 0, MediaMetadata()
+
+    if packet[:8] == b"OpusHead":
+        # Opus granule positions always count 48 kHz samples, less the pre-skip
+        (pre_skip,) = struct.unpack("<H", packet[10:12])
+        return 48000, pre_skip, MediaMetadata()
+
+    if packet[:5] == b"\x7fFLAC":
+        # the mapping header is followed by a native FLAC STREAMINFO block
+        packed = int.from_bytes(packet[27:35], "big")
+        return packed >> 44, 0, MediaMetadata()
+
+    if packet[:7] == b"\x80theora":
+        width = int.from_bytes(packet[14:17], "big")
+        height = int.from_bytes(packet[17:20], "big")
+        frame_rate_numerator, frame_rate_denominator = struct.unpack(
+            ">II", packet[22:30]
+        )
+        if not frame_rate_denominator:
+            raise ProbeError("Invalid Theora frame rate")
+        return (
+            frame_rate_numerator / frame_rate_denominator,
+            0,
+            MediaMetadata(width=width, height=height),
+        )
+
+    raise ProbeError("Unsupported Ogg codec")
+
+
+def theora_granule_shift(packet: bytes) -> int:
+    return ((packet[40] & 0x03) << 3) | (packet[41] >> 5)
+
+
+def find_last_granule(f, size: int, serial: int) -> int:
+    start = max(size - TAIL_SIZE, 0)
+    f.seek(start)
+    tail = f.read(size - start)
+
+    offset = tail.rfind(b"OggS")
+    while offset != -1:
+        if offset + PAGE_HEADER.size <= len(tail):
+            _capture, _version, _flags, granule, page_serial, _sequence = (
+                PAGE_HEADER.unpack_from(tail, offset)
+            )
+            if page_serial == serial and granule >= 0:
+                return granule
+        offset = tail.rfind(b"OggS", 0, offset)
+
+    raise ProbeError("No final Ogg page found")
+
+
+def probe_ogg(f, size: int) -> MediaMetadata:
+    # Skip streams we cannot get a duration from, such as Ogg Skeleton
+    for serial, packet in iter_first_packets(f):
+        try:
+            granule_rate, pre_skip, metadata = parse_identification(packet)
+        except ProbeError:
+            continue
+
+        if not granule_rate:
+            raise ProbeError("Invalid Ogg granule rate")
+
+        granule = find_last_granule(f, size, serial)
+        if packet[:7] == b"\x80theora":
+            # Theora granule positions combine the last keyframe and the frames since
+            shift = theora_granule_shift(packet)
+            granule = (granule >> shift) + (granule & ((1 << shift) - 1))
+
+        metadata.duration = max(granule - pre_skip, 0) / granule_rate
+        return metadata
+
+    raise ProbeError("No supported Ogg stream found")
@@ -0,0 +1,105 @@
+"""
+The HTML of media players can be kept in the Django cache, when the RENDER_CACHE setting
+is enabled. Fragments are keyed on a version token of their media item, which is replaced
+whenever the media item or its renditions are saved or deleted, so that all the cached
+fragments of that media item are invalidated at once.
+Fragments are only cached when the file URLs they contain do not expire.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+
+from collections.abc import Callable, Iterable
+
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.utils.safestring import SafeString
+from django.utils.translation import get_language
+
+from wagtailmedia.models import get_media_model
+from wagtailmedia.settings import wagtailmedia_settings
+
+
+CACHE_KEY_PREFIX = "wagtailmedia:render"
+
+
+def get_version_key(media_id: int) -> str:
+    return f"{CACHE_KEY_PREFIX}:{media_id}:version"
+
+
+def clear_render_cache(media_id: int):
+    cache.delete(get_version_key(media_id))
+
+
+def get_versions(media_ids: Iterable[int]) -> dict[int, str]:
+    """
+    Returns the version token of each media item, creating those that are missing.
+    """
+    keys = {get_version_key(media_id): media_id for media_id in media_ids}
+    versions = {
+        keys[key]: version for key, version in cache.get_many(list(keys)).items()
+    }
+
+    missing = {
+        key: uuid.uuid4().hex
+        for key, media_id in keys.items()
+        if media_id not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+def has_lasting_urls() -> bool:
+    """
+    Returns whether the file URLs in the HTML of the players stay valid. With the
+    "direct" serve method, they are the URLs of the storage, which can expire, as
+    signed S3 URLs do. Only those of the file system storage are known not to.
+    """
+    if wagtailmedia_settings.SERVE_METHOD != "direct":
+        return True
+
+    Media = get_media_model()
+    fields = [Media._meta.get_field("file"), Media._meta.get_field("thumbnail")]
+    if Rendition := Media.get_rendition_model():
+        fields.append(Rendition._meta.get_field("file"))
+    return all(isinstance(field.storage, FileSystemStorage) for field in fields)
+
+
+def get_fragment_key(media_id: int, version: str, variant: str) -> str:
+    # The markup depends on the active language and on the URLs of the files
+    context = f"{variant}:{get_language()}:{wagtailmedia_settings.SERVE_METHOD}"
+    digest = hashlib.md5(context.encode(), usedforsecurity=False).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{media_id}:{version}:{digest}"
+
+
+def render_many(items: list, variant: str, render_func: Callable) -> list[SafeString]:
+    """
+    Returns the HTML of ``render_func(item)`` for each of the given media items, reading
+    as many as possible from the cache in one go. ``variant`` tells apart the HTML
+    produced by different render functions, or options, for the same media item.
+    """
+    if not wagtailmedia_settings.RENDER_CACHE or not has_lasting_urls():
+        return [render_func(item) for item in items]
+
+    versions = get_versions({item.pk for item in items})
+    keys = [get_fragment_key(item.pk, versions[item.pk], variant) for item in items]
+    fragments = cache.get_many(keys)
+
+    rendered = {}
+    for key, item in zip(keys, items, strict=True):
+        if key not in fragments and key not in rendered:
+            rendered[key] = render_func(item)
+    if rendered:
+        cache.set_many(rendered, wagtailmedia_settings.RENDER_CACHE_TIMEOUT)
+
+    # Like Django's {% cache %} tag, rely on the cache keeping the strings safe
+    fragments.update(rendered)
+    return [fragments[key] for key in keys]
+
+
+def render(item, variant: str, render_func: Callable) -> SafeString:
+    return render_many([item], variant, render_func)[0]
@@ -0,0 +1,31 @@
+"""
+Values kept in memory for the duration of a request, such as the media counts or the
+media items of a revision comparison, so that a request reads them once however many
+times they are used.
+"""
+
+from __future__ import annotations
+
+from asgiref.local import Local
+
+
+# Only set while a request is being handled, see start_request_memo
+_request_memo = Local()
+
+
+def start_request_memo(**kwargs):
+    _request_memo.values = {}
+
+
+def end_request_memo(**kwargs):
+    try:
+        del _request_memo.values
+    except AttributeError:
+        pass
+
+
+def get_request_memo() -> dict | None:
+    """
+    Returns the values kept for the current request, or None outside of a request.
+    """
+    return getattr(_request_memo, "values", None)
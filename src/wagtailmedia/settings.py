@@ -31,6 +31,18 @@ DEFAULTS = {
         "ogv",
         "webm",
     ],
+    "SERVE_METHOD": "direct",
+    "SERVE_CHUNK_SIZE": 64 * 1024,
+    "X_ACCEL_REDIRECT_PREFIX": "/protected-media/",
+    "PASSWORD_REQUIRED_TEMPLATE": "wagtailmedia/password_required.html",
+    "DEDUPLICATE": False,
+    "CHUNKED_UPLOAD_CHUNK_SIZE": 8 * 1024 * 1024,
+    "CHUNKED_UPLOAD_MAX_AGE": 24 * 60 * 60,
+    "MULTIPLE_UPLOAD_WORKERS": 4,
+    "CURSOR_PAGINATION": False,
+    "COUNTS_CACHE_TIMEOUT": 60 * 60,
+    "RENDER_CACHE": False,
+    "RENDER_CACHE_TIMEOUT": 24 * 60 * 60,
 }
 
 # List of settings that have been deprecated
@@ -118,5 +130,10 @@ def reload_wagtailmedia_settings(*args, **kwargs):
     if setting == "WAGTAILMEDIA":
         wagtailmedia_settings.reload()
 
+        # The media form classes are built from the settings
+        from wagtailmedia.forms import clear_media_form_cache
+
+        clear_media_form_cache()
+
 
 setting_changed.connect(reload_wagtailmedia_settings)
@@ -1,12 +1,20 @@
+from django.core.signals import request_finished, request_started
 from django.db import transaction
-from django.db.models.signals import post_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from wagtail.search import index
 
+from wagtailmedia.counts import clear_media_counts
 from wagtailmedia.models import get_media_model
+from wagtailmedia.render_cache import clear_render_cache
+from wagtailmedia.request_memo import end_request_memo, start_request_memo
+from wagtailmedia.tasks import index_on_commit
 
 
 def delete_files(instance):
-    # Pass false so FileField doesn't save the model.
-    instance.file.delete(False)
+    # Deduplicated uploads share their stored file with other media items
+    if not instance.is_file_shared():
+        # Pass false so FileField doesn't save the model.
+        instance.file.delete(False)
     if instance.thumbnail:
         instance.thumbnail.delete(False)
 
@@ -15,6 +23,56 @@ def post_delete_file_cleanup(instance, **kwargs):
     transaction.on_commit(lambda: delete_files(instance))
 
 
+def post_delete_rendition_file_cleanup(instance, **kwargs):
+    transaction.on_commit(lambda: instance.file.delete(False))
+
+
+def index_media_on_commit(instance, **kwargs):
+    index_on_commit([instance])
+
+
+def remove_media_from_index(instance, **kwargs):
+    index.remove_object(instance)
+
+
+def clear_media_counts_on_commit(**kwargs):
+    transaction.on_commit(clear_media_counts)
+
+
+def clear_render_cache_on_commit(instance, **kwargs):
+    # The primary key is cleared once a media item is deleted
+    media_id = instance.pk
+    transaction.on_commit(lambda: clear_render_cache(media_id))
+
+
+def clear_rendition_render_cache_on_commit(instance, **kwargs):
+    media_id = instance.media_id
+    transaction.on_commit(lambda: clear_render_cache(media_id))
+
+
+def clear_media_counts_on_tags_changed(instance, model, action, **kwargs):
+    if not action.startswith("post_"):
+        return
+
+    # Tags of all models share the same through model, check that media tags changed
+    Media = get_media_model()
+    if isinstance(instance, Media) or model is Media:
+        transaction.on_commit(clear_media_counts)
+
+
 def register_signal_handlers():
     Media = get_media_model()
     post_delete.connect(post_delete_file_cleanup, sender=Media)
+    post_save.connect(index_media_on_commit, sender=Media)
+    post_delete.connect(remove_media_from_index, sender=Media)
+    post_save.connect(clear_media_counts_on_commit, sender=Media)
+    post_delete.connect(clear_media_counts_on_commit, sender=Media)
+    m2m_changed.connect(clear_media_counts_on_tags_changed, sender=Media.tags.through)
+    post_save.connect(clear_render_cache_on_commit, sender=Media)
+    post_delete.connect(clear_render_cache_on_commit, sender=Media)
+    if Rendition := Media.get_rendition_model():
+        post_delete.connect(post_delete_rendition_file_cleanup, sender=Rendition)
+        post_save.connect(clear_rendition_render_cache_on_commit, sender=Rendition)
+        post_delete.connect(clear_rendition_render_cache_on_commit, sender=Rendition)
+    request_started.connect(start_request_memo)
+    request_finished.connect(end_request_memo)
@@ -93,48 +93,125 @@ MEDIA_CHOOSER_MODAL_ONLOAD_HANDLERS = {
             initWMTabs();
         }
 
-        $('form.media-upload', modal.body).on('submit', function() {
-            var formdata = new FormData(this);
-
-            // Get the title field of the submitted form, not the first in the modal.
-            const input = this.querySelector('#id_media-chooser-upload-title');
-            if (!input.value) {
-                if (!input.hasAttribute('aria-invalid')) {
-                    input.setAttribute('aria-invalid', 'true');
-                    const field = input.closest('[data-field]');
-                    field.classList.add('w-field--error');
-                    const errors = field.querySelector('[data-field-errors]');
-                    const icon = errors.querySelector('.icon');
-                    if (icon) {
-                        icon.removeAttribute('hidden');
+        function initUploadForm(context) {
+            $('form.media-upload', context).on('submit', function() {
+                var formdata = new FormData(this);
+
+                // Get the title field of the submitted form, not the first in the modal.
+                const input = this.querySelector('#id_media-chooser-upload-title');
+                if (!input.value) {
+                    if (!input.hasAttribute('aria-invalid')) {
+                        input.setAttribute('aria-invalid', 'true');
+                        const field = input.closest('[data-field]');
+                        field.classList.add('w-field--error');
+                        const errors = field.querySelector('[data-field-errors]');
+                        const icon = errors.querySelector('.icon');
+                        if (icon) {
+                            icon.removeAttribute('hidden');
+                        }
+                        const errorElement = document.createElement('p');
+                        errorElement.classList.add('error-message');
+                        // Global function provided by Wagtail.
+                        errorElement.innerHTML = gettext('This field is required.');
+                        errors.appendChild(errorElement);
                     }
-                    const errorElement = document.createElement('p');
-                    errorElement.classList.add('error-message');
-                    // Global function provided by Wagtail.
-                    errorElement.innerHTML = gettext('This field is required.');
-                    errors.appendChild(errorElement);
+                    setTimeout(cancelSpinner, 500);
+                } else {
+                    $.ajax({
+                        url: this.action,
+                        data: formdata,
+                        processData: false,
+                        contentType: false,
+                        type: 'POST',
+                        dataType: 'text',
+                        success: modal.loadResponseText,
+                        error: function(response, textStatus, errorThrown) {
+                            const message = jsonData['error_message'] + '<br />' + errorThrown + ' - ' + response.status;
+                            $('#upload').append(
+                                '<div class="help-block help-critical">' +
+                                '<strong>' + jsonData['error_label'] + ': </strong>' + message + '</div>');
+                        }
+                    });
                 }
-                setTimeout(cancelSpinner, 500);
-            } else {
-                $.ajax({
-                    url: this.action,
-                    data: formdata,
-                    processData: false,
-                    contentType: false,
-                    type: 'POST',
-                    dataType: 'text',
-                    success: modal.loadResponseText,
-                    error: function(response, textStatus, errorThrown) {
-                        const message = jsonData['error_message'] + '<br />' + errorThrown + ' - ' + response.status;
-                        $('#upload').append(
-                            '<div class="help-block help-critical">' +
-                            '<strong>' + jsonData['error_label'] + ': </strong>' + message + '</div>');
+
+                return false;
+            });
+
+            // Note: There are two inputs with `#id_title` on the page.
+            // The page title and media title. Select the input inside the modal body.
+            $('[name="media-chooser-upload-file"]', context).each(function() {
+                const fileWidget = $(this);
+                fileWidget.on('change', function () {
+                    let titleWidget = $('#id_media-chooser-upload-title', fileWidget.closest('form'));
+                    if (titleWidget.val() === '') {
+                        // The file widget value example: `C:\fakepath\media.jpg`
+                        const parts = fileWidget.val().split('\\');
+                        const filename = parts[parts.length - 1];
+                        titleWidget.val(filename.replace(/\.[^.]+$/, ''));
                     }
                 });
-            }
+            });
 
-            return false;
+            /* Add tag entry interface (with autocompletion) to the tag field of the media upload form */
+            $('[name="media-chooser-upload-tags"]', context).each(function() {
+               $(this).tagit({
+                    autocomplete: {source: jsonData['tag_autocomplete_url']}
+                });
+            });
+        }
+
+        /* The upload forms are only rendered once their tab is opened */
+        function loadUploadForm(placeholder) {
+            const url = placeholder.attr('data-chooser-upload-form-url');
+            /* Cleared while loading, so that the form is requested once */
+            placeholder.removeAttr('data-chooser-upload-form-url');
+            placeholder.html($('<p></p>').text(gettext('Loading…')));
+            $.get(url, function(html) {
+                const fragment = $('<div></div>').html($.parseHTML(html, document, false));
+                const loadedScripts = Array.from(document.scripts).map((script) => script.src);
+                const scripts = $.parseHTML(html, document, true).filter(function(node) {
+                    return node.nodeName === 'SCRIPT' && !(node.src && loadedScripts.includes(node.src));
+                });
+                const panel = placeholder.parent();
+                placeholder.replaceWith(fragment.contents());
+                panel.append(scripts);
+                initUploadForm(panel);
+            }).fail(function(response, textStatus, errorThrown) {
+                /* Loaded again when the tab is next opened, or from the retry button */
+                placeholder.attr('data-chooser-upload-form-url', url);
+                const retryButton = $('<button type="button" class="button button-small button-secondary"></button>')
+                    .text(gettext('Try again'))
+                    .on('click', function() {
+                        loadUploadForm(placeholder);
+                    });
+                placeholder.empty().append(
+                    $('<div class="help-block help-critical"></div>')
+                        .append($('<strong></strong>').text(jsonData['error_label'] + ': '))
+                        .append(document.createTextNode(
+                            jsonData['error_message'] + ' ' + errorThrown + ' - ' + response.status
+                        )),
+                    retryButton
+                );
+            });
+        }
+
+        /* Tabs may be opened by click, keyboard or URL hash, so watch for the panels being shown */
+        function loadShownUploadForms() {
+            $('[data-chooser-upload-form-url]', modal.body).each(function() {
+                const placeholder = $(this);
+                if (!placeholder.closest('[role="tabpanel"]').prop('hidden')) {
+                    loadUploadForm(placeholder);
+                }
+            });
+        }
+
+        const uploadPanelObserver = new MutationObserver(loadShownUploadForms);
+        $('[role="tabpanel"]', modal.body).each(function() {
+            uploadPanelObserver.observe(this, {attributes: true, attributeFilter: ['hidden']});
         });
+        loadShownUploadForms();
+
+        initUploadForm(modal.body);
 
         $('form.media-search', modal.body).on('submit', search);
 
@@ -156,28 +233,6 @@ MEDIA_CHOOSER_MODAL_ONLOAD_HANDLERS = {
             });
             return false;
         });
-
-        // Note: There are two inputs with `#id_title` on the page.
-        // The page title and media title. Select the input inside the modal body.
-        $('[name="media-chooser-upload-file"]', modal.body).each(function() {
-            const fileWidget = $(this);
-            fileWidget.on('change', function () {
-                let titleWidget = $('#id_media-chooser-upload-title', fileWidget.closest('form'));
-                if (titleWidget.val() === '') {
-                    // The file widget value example: `C:\fakepath\media.jpg`
-                    const parts = fileWidget.val().split('\\');
-                    const filename = parts[parts.length - 1];
-                    titleWidget.val(filename.replace(/\.[^.]+$/, ''));
-                }
-            });
-        });
-
-        /* Add tag entry interface (with autocompletion) to the tag field of the media upload form */
-        $('[name="media-chooser-upload-tags"]', modal.body).each(function() {
-           $(this).tagit({
-                autocomplete: {source: jsonData['tag_autocomplete_url']}
-            });
-        });
     },
     'media_chosen': function(modal, jsonData) {
         modal.respond('mediaChosen', jsonData['result']);
@@ -0,0 +1,40 @@
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from wagtail.search.backends import get_search_backends
+
+# The same task decorator as Wagtail's own tasks, so that they run in the same backends
+from wagtail.search.tasks import task
+
+
+@task()
+def update_search_index_task(app_label: str, model_name: str, pks: list[str]):
+    """
+    Adds media items to the search index in one call per search backend. Like
+    Wagtail's own indexing task, this runs in the backend configured in ``TASKS``.
+    """
+    model = apps.get_model(app_label, model_name)
+    objects = list(model.objects.filter(pk__in=pks))
+    for backend in get_search_backends(with_auto_update=True):
+        backend.add_bulk(model, objects)
+
+
+def index_on_commit(media_items: list):
+    """
+    Queues the media items to be added to the search index once the transaction is
+    committed, so that the index includes their tags, which are saved after them.
+    This does not depend on the tasks backend waiting for the commit by itself.
+    """
+    if not media_items:
+        return
+
+    model = type(media_items[0])
+    transaction.on_commit(
+        partial(
+            update_search_index_task.enqueue,
+            model._meta.app_label,
+            model._meta.model_name,
+            [str(media.pk) for media in media_items],
+        )
+    )
@@ -0,0 +1,126 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+from django.utils.translation import gettext as _
+
+from wagtailmedia import render_cache
+from wagtailmedia.models import MediaType, get_media_model, prefetch_renditions
+
+
+register = template.Library()
+
+
+def get_player_attrs(item, attrs: dict) -> dict:
+    """
+    Returns the attributes of the player element of a media item. Underscores in the
+    attribute names given to the tags are replaced by dashes, e.g. ``data_track=1``
+    becomes ``data-track="1"``. ``lazy=True`` stands for ``preload="none"``.
+    """
+    player_attrs = {"controls": True}
+    if item.type == MediaType.VIDEO and item.thumbnail:
+        player_attrs["poster"] = item.thumbnail_url
+    if attrs.pop("lazy", False):
+        player_attrs["preload"] = "none"
+    player_attrs.update(
+        {name.replace("_", "-"): value for name, value in attrs.items()}
+    )
+    return player_attrs
+
+
+def format_player_html(item, attrs: dict) -> str:
+    if item.type == MediaType.VIDEO:
+        tag, fallback = "video", _("Your browser does not support the video element.")
+    else:
+        tag, fallback = "audio", _("Your browser does not support the audio element.")
+
+    return format_html(
+        "<{tag}{attrs}>\n{sources}\n<p>{fallback}</p>\n</{tag}>",
+        tag=tag,
+        attrs=flatatt(get_player_attrs(item, dict(attrs))),
+        sources=format_html_join(
+            "\n", "<source{0}>", [[flatatt(s)] for s in item.sources]
+        ),
+        fallback=fallback,
+    )
+
+
+def get_variant(attrs: dict) -> str:
+    return "player:" + repr(sorted(attrs.items()))
+
+
+@register.simple_tag
+def media_player(item, **attrs):
+    """
+    Renders an ``<audio>`` or ``<video>`` player for the media item, depending on its
+    type, with any given attributes. For example::
+
+        {% media_player page.media preload="metadata" class="player" %}
+    """
+    if not item:
+        return ""
+    return render_cache.render(
+        item, get_variant(attrs), lambda item: format_player_html(item, attrs)
+    )
+
+
+@register.simple_tag(name="audio")
+def audio_player(item, **attrs):
+    if not item or item.type != MediaType.AUDIO:
+        return ""
+    return media_player(item, **attrs)
+
+
+@register.simple_tag(name="video")
+def video_player(item, **attrs):
+    if not item or item.type != MediaType.VIDEO:
+        return ""
+    return media_player(item, **attrs)
+
+
+def resolve_media_items(items) -> list:
+    """
+    Returns the media items for a list of media items or ids, or a queryset, in order.
+    Ids are looked up in one query, and missing media items are left out.
+    """
+    ids = [item for item in items if isinstance(item, int)]
+    if not ids:
+        return [item for item in items if item]
+
+    media_by_id = get_media_model().objects.in_bulk(ids)
+    resolved = []
+    for item in items:
+        if isinstance(item, int):
+            item = media_by_id.get(item)
+        if item:
+            resolved.append(item)
+    return resolved
+
+
+@register.simple_tag
+def media_players(items, **attrs):
+    """
+    Renders the players of many media items, given as instances, ids or a queryset.
+    The media items and their renditions are loaded in one query each, and with the
+    RENDER_CACHE setting enabled, the cached players are read at once::
+
+        {% media_players page.playlist lazy=True %}
+    """
+    items = resolve_media_items(items)
+    renditions_loaded = False
+
+    def render_func(item):
+        # Only load the renditions if some of the players are not cached, and once
+        nonlocal renditions_loaded
+        if not renditions_loaded:
+            prefetch_renditions(items)
+            renditions_loaded = True
+        return format_player_html(item, attrs)
+
+    return format_html_join(
+        "\n",
+        "{}",
+        [
+            [html]
+            for html in render_cache.render_many(items, get_variant(attrs), render_func)
+        ],
+    )
@@ -0,0 +1,81 @@
+"""
+Upload handlers that compute the SHA-256 of uploaded files as they are received, so
+that media forms can hash and deduplicate uploads without reading them again.
+"""
+
+import hashlib
+
+from functools import wraps
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+
+class HashingUploadHandlerMixin:
+    """
+    Sets the ``sha256`` attribute of the files created by the upload handler, from
+    the chunks it received. Chunks passed on to the next handler are not hashed,
+    as that handler creates the file.
+    """
+
+    def new_file(self, *args, **kwargs):
+        # Before the handler raises StopFutureHandlers to handle the file alone
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        data = super().receive_data_chunk(raw_data, start)
+        if data is None:
+            self.digest.update(raw_data)
+        return data
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.digest.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(
+    HashingUploadHandlerMixin, MemoryFileUploadHandler
+):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(
+    HashingUploadHandlerMixin, TemporaryFileUploadHandler
+):
+    pass
+
+
+HASHING_UPLOAD_HANDLERS = {
+    MemoryFileUploadHandler: HashingMemoryFileUploadHandler,
+    TemporaryFileUploadHandler: HashingTemporaryFileUploadHandler,
+}
+
+
+def hash_uploads(view_func):
+    """
+    Replaces Django's upload handlers with hashing ones for the decorated view.
+    Other upload handlers set in ``FILE_UPLOAD_HANDLERS`` are kept, and the files
+    they create are hashed by the media form instead.
+
+    Upload handlers cannot be changed once the CSRF middleware has read the request
+    body, so the CSRF check is made by the view instead.
+    """
+
+    @wraps(view_func)
+    @csrf_exempt
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [
+            HASHING_UPLOAD_HANDLERS[type(handler)](request)
+            if type(handler) in HASHING_UPLOAD_HANDLERS
+            else handler
+            for handler in request.upload_handlers
+        ]
+        return csrf_protect(view_func)(request, *args, **kwargs)
+
+    return wrapper
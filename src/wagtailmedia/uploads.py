@@ -0,0 +1,295 @@
+"""
+Chunked uploads let large media files be sent over several requests. Each chunk is
+stored as a numbered part, so an interrupted upload can be resumed by sending the
+missing parts only, and the parts are streamed into the final file when the upload
+is complete.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import uuid
+
+from datetime import timedelta
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from wagtailmedia.models import MediaType, get_media_model
+from wagtailmedia.settings import wagtailmedia_settings
+
+
+SIGNING_SALT = "wagtailmedia.chunked_upload"
+UPLOADS_DIRECTORY = "media_uploads"
+
+
+def get_allowed_extensions(media_type: str) -> list[str]:
+    if media_type == MediaType.AUDIO:
+        return wagtailmedia_settings.AUDIO_EXTENSIONS
+    if media_type == MediaType.VIDEO:
+        return wagtailmedia_settings.VIDEO_EXTENSIONS
+    return []
+
+
+def validate_upload_filename(filename: str, media_type: str):
+    """
+    Checks the extension of a file before any of it is uploaded, using the same rules
+    as ``AbstractMedia.clean``.
+    """
+    allowed_extensions = get_allowed_extensions(media_type)
+    extension = os.path.splitext(filename)[1][1:].lower()
+    if allowed_extensions and extension not in allowed_extensions:
+        raise ValidationError(
+            _(
+                "File extension “%(extension)s” is not allowed. "
+                "Allowed extensions are: %(allowed_extensions)s."
+            ),
+            code="invalid_extension",
+            params={
+                "extension": extension,
+                "allowed_extensions": ", ".join(allowed_extensions),
+            },
+        )
+
+
+def purge_expired_uploads() -> int:
+    """
+    Removes the parts stored longer ago than uploads can take to complete, and
+    returns the number of parts removed. As upload tokens expire at that age,
+    these parts can no longer be resumed nor completed.
+    """
+    storage = get_media_model()._meta.get_field("file").storage
+    expiry = timezone.now() - timedelta(
+        seconds=wagtailmedia_settings.CHUNKED_UPLOAD_MAX_AGE
+    )
+    try:
+        upload_ids, _files = storage.listdir(UPLOADS_DIRECTORY)
+    except FileNotFoundError:
+        return 0
+
+    removed = 0
+    for upload_id in upload_ids:
+        directory = posixpath.join(UPLOADS_DIRECTORY, upload_id)
+        _directories, files = storage.listdir(directory)
+        kept = len(files)
+        for filename in files:
+            name = posixpath.join(directory, filename)
+            if storage.get_modified_time(name) < expiry:
+                storage.delete(name)
+                removed += 1
+                kept -= 1
+        if not kept:
+            try:
+                storage.delete(directory)
+            except OSError:
+                # Directories only exist for filesystem storages
+                pass
+    return removed
+
+
+class ChunkedUpload:
+    """
+    A file uploaded in numbered parts, which are stored in the media file storage.
+    Uploads are identified by a signed token, so no database state is needed until
+    the upload is complete.
+    """
+
+    def __init__(
+        self, upload_id: str, filename: str, size: int, media_type: str, user_id: int
+    ):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.media_type = media_type
+        self.user_id = user_id
+        self.storage = get_media_model()._meta.get_field("file").storage
+        # The part sizes listed from the storage, kept for the rest of the request
+        self._parts = None
+
+    @classmethod
+    def start(cls, filename: str, size: int, media_type: str, user) -> ChunkedUpload:
+        validate_upload_filename(filename, media_type)
+        return cls(
+            uuid.uuid4().hex, os.path.basename(filename), size, media_type, user.pk
+        )
+
+    @classmethod
+    def from_token(cls, token: str) -> ChunkedUpload:
+        """
+        Raises django.core.signing.BadSignature if the token is invalid or has expired.
+        """
+        data = signing.loads(
+            token,
+            salt=SIGNING_SALT,
+            max_age=wagtailmedia_settings.CHUNKED_UPLOAD_MAX_AGE,
+        )
+        return cls(
+            data["id"], data["filename"], data["size"], data["type"], data["user"]
+        )
+
+    @property
+    def token(self) -> str:
+        return signing.dumps(
+            {
+                "id": self.upload_id,
+                "filename": self.filename,
+                "size": self.size,
+                "type": self.media_type,
+                "user": self.user_id,
+            },
+            salt=SIGNING_SALT,
+        )
+
+    @property
+    def directory(self) -> str:
+        return posixpath.join(UPLOADS_DIRECTORY, self.upload_id)
+
+    def get_part_name(self, number: int) -> str:
+        return posixpath.join(self.directory, f"{number:05d}.part")
+
+    def save_part(self, number: int, content):
+        """
+        Raises ValueError if another copy of the part was stored at the same time.
+        """
+        name = self.get_part_name(number)
+        # Parts may be sent again when a client retries, keep the latest copy
+        self.storage.delete(name)
+        saved_name = self.storage.save(name, content)
+        if saved_name != name:
+            # The storage gave this copy another name, which would not be listed
+            # as a part, so drop it and let the client send the part again
+            self.storage.delete(saved_name)
+            raise ValueError(f"Part {number} was uploaded twice at the same time")
+
+        if self._parts is not None:
+            parts = dict(self._parts)
+            parts[number] = content.size
+            self._parts = sorted(parts.items())
+
+    def get_parts(self) -> list[tuple[int, int]]:
+        """
+        Returns the ``(number, size)`` pairs of the parts received so far. They are
+        listed from the storage once, as each part size may take a request to read.
+        """
+        if self._parts is None:
+            self._parts = self.list_parts()
+        return self._parts
+
+    def list_parts(self) -> list[tuple[int, int]]:
+        try:
+            _directories, files = self.storage.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        parts = []
+        for filename in files:
+            number, extension = os.path.splitext(filename)
+            if extension == ".part" and number.isdigit():
+                size = self.storage.size(self.get_part_name(int(number)))
+                parts.append((int(number), size))
+        return sorted(parts)
+
+    def get_received_size(self) -> int:
+        return sum(size for _number, size in self.get_parts())
+
+    def open(self) -> UploadedFile:
+        """
+        Returns the complete file, read part by part from the storage.
+        Raises ValueError if parts are missing.
+        """
+        parts = self.get_parts()
+        if [number for number, _size in parts] != list(range(len(parts))):
+            raise ValueError("Upload parts are missing")
+        if sum(size for _number, size in parts) != self.size:
+            raise ValueError("Upload is incomplete")
+
+        return UploadedFile(
+            file=ChunkedUploadFile(
+                self.storage, [(self.get_part_name(n), size) for n, size in parts]
+            ),
+            name=self.filename,
+            size=self.size,
+        )
+
+    def delete(self):
+        for number, _size in self.get_parts():
+            self.storage.delete(self.get_part_name(number))
+        try:
+            self.storage.delete(self.directory)
+        except OSError:
+            # Directories only exist for filesystem storages, and may not be empty
+            pass
+        self._parts = None
+
+
+class ChunkedUploadFile:
+    """
+    A read-only, seekable file over the parts of a chunked upload. Parts are opened
+    one at a time as reads reach them, rather than being joined into a new file.
+    """
+
+    def __init__(self, storage, parts: list[tuple[str, int]]):
+        self.storage = storage
+        self.parts = parts
+        self.size = sum(size for _name, size in parts)
+        self.position = 0
+        self.current_part = None
+        self.current_index = None
+
+    @property
+    def closed(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self.position = offset
+        return self.position
+
+    def locate(self, position: int) -> tuple[int, int]:
+        """
+        Returns the index of the part holding the given position, and the offset
+        of the position within it.
+        """
+        for index, (_name, size) in enumerate(self.parts):
+            if position < size:
+                return index, position
+            position -= size
+        return len(self.parts), 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self.position
+
+        chunks = []
+        while size > 0 and self.position < self.size:
+            index, offset = self.locate(self.position)
+            if index != self.current_index:
+                self.close()
+                self.current_part = self.storage.open(self.parts[index][0], "rb")
+                self.current_index = index
+            self.current_part.seek(offset)
+            data = self.current_part.read(min(size, self.parts[index][1] - offset))
+            if not data:
+                break
+            chunks.append(data)
+            self.position += len(data)
+            size -= len(data)
+        return b"".join(chunks)
+
+    def close(self):
+        if self.current_part is not None:
+            self.current_part.close()
+        self.current_part = None
+        self.current_index = None
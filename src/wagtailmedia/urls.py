@@ -0,0 +1,27 @@
+from django.urls import path
+
+from wagtailmedia.views import serve
+
+
+urlpatterns = [
+    path(
+        "<int:media_id>/<str:media_filename>",
+        serve.serve,
+        name="wagtailmedia_serve",
+    ),
+    path(
+        "<int:media_id>/thumbnail/<str:thumbnail_filename>",
+        serve.serve_thumbnail,
+        name="wagtailmedia_serve_thumbnail",
+    ),
+    path(
+        "<int:media_id>/renditions/<int:rendition_id>/<str:rendition_filename>",
+        serve.serve_rendition,
+        name="wagtailmedia_serve_rendition",
+    ),
+    path(
+        "authenticate_with_password/<int:restriction_id>/",
+        serve.authenticate_with_password,
+        name="wagtailmedia_authenticate_with_password",
+    ),
+]
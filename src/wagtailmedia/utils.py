@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import json
+
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db.models import Q
 from django.forms.utils import flatatt
 from django.utils.html import format_html, format_html_join
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.translation import gettext_lazy as _
 
+from .settings import wagtailmedia_settings
+
 
 try:
     from wagtail.admin.paginator import WagtailPaginator as Paginator
@@ -20,6 +30,8 @@ if TYPE_CHECKING:
     from .models import AbstractMedia
 
 DEFAULT_PAGE_KEY: str = "p"
+DEFAULT_CURSOR_KEY: str = "cursor"
+HASH_CHUNK_SIZE: int = 64 * 1024
 
 
 def paginate(
@@ -30,6 +42,195 @@ def paginate(
     return paginator, page
 
 
+class CursorPage(Sequence):
+    """
+    A page of items fetched by ``paginate_by_cursor``. Unlike a paginator page, it
+    has no number nor total count, only the cursors of its neighbouring pages.
+    """
+
+    def __init__(
+        self,
+        object_list: list,
+        next_cursor: str | None = None,
+        previous_cursor: str | None = None,
+    ):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(item, ordering: str, before: bool = False) -> str:
+    field = item._meta.get_field(ordering.lstrip("-"))
+    data = {
+        "o": ordering,
+        "v": field.value_to_string(item),
+        "pk": item.pk,
+        "before": before,
+    }
+    return urlsafe_base64_encode(json.dumps(data).encode())
+
+
+def decode_cursor(cursor: str, ordering: str, field) -> tuple:
+    """
+    Returns the ``(value, pk, before)`` tuple held by a cursor.
+    Raises ValueError if the cursor is invalid, or was issued for another ordering.
+    """
+    try:
+        data = json.loads(urlsafe_base64_decode(cursor))
+        if data["o"] != ordering:
+            raise ValueError("Cursor issued for another ordering")
+        value = field.to_python(data["v"])
+        pk = int(data["pk"])
+        before = bool(data["before"])
+    except (KeyError, TypeError, ValidationError) as err:
+        raise ValueError("Invalid cursor") from err
+
+    # The ordering fields are not nullable, so a null value cannot be looked up
+    if value is None:
+        raise ValueError("Invalid cursor")
+    return value, pk, before
+
+
+def paginate_by_cursor(
+    request: HttpRequest,
+    items,
+    ordering: str,
+    cursor_key: str = DEFAULT_CURSOR_KEY,
+    per_page: int = 20,
+) -> CursorPage:
+    """
+    Paginates a queryset ordered by a single field, such as ``-created_at``, with the
+    primary key to break ties. Pages are fetched from the position held in the
+    cursor rather than with an offset, and the total count is never queried, so deep
+    pages of large tables load as fast as the first one.
+    """
+    field_name = ordering.lstrip("-")
+    descending = ordering.startswith("-")
+
+    try:
+        value, pk, before = decode_cursor(
+            request.GET.get(cursor_key, ""),
+            ordering,
+            items.model._meta.get_field(field_name),
+        )
+        has_cursor = True
+    except ValueError:
+        value, pk, before = None, None, False
+        has_cursor = False
+
+    # Walk backwards from the cursor to fetch the previous page
+    reverse = descending != before
+    prefix = "-" if reverse else ""
+    items = items.order_by(f"{prefix}{field_name}", f"{prefix}pk")
+    if has_cursor:
+        lookup = "lt" if reverse else "gt"
+        # The redundant range on the ordering field lets databases use its index
+        items = items.filter(
+            Q(**{f"{field_name}__{lookup}e": value}),
+            Q(**{f"{field_name}__{lookup}": value}) | Q(**{f"pk__{lookup}": pk}),
+        )
+
+    # Fetch one more item to find out whether there is another page
+    object_list = list(items[: per_page + 1])
+    has_more = len(object_list) > per_page
+    object_list = object_list[:per_page]
+    if before:
+        object_list.reverse()
+
+    has_next = has_cursor if before else has_more
+    has_previous = has_more if before else has_cursor
+    if not object_list:
+        return CursorPage(object_list)
+
+    return CursorPage(
+        object_list,
+        next_cursor=encode_cursor(object_list[-1], ordering) if has_next else None,
+        previous_cursor=(
+            encode_cursor(object_list[0], ordering, before=True)
+            if has_previous
+            else None
+        ),
+    )
+
+
+def paginate_media(
+    request: HttpRequest, items, ordering: str, is_searching: bool = False
+) -> tuple[Paginator | None, PaginatorPage | CursorPage]:
+    """
+    Paginates a media listing by cursor when ``CURSOR_PAGINATION`` is enabled, and
+    by page number otherwise. Search results are ranked by relevance, so they are
+    always paginated by page number. There is no paginator for cursor pages.
+    """
+    if wagtailmedia_settings.CURSOR_PAGINATION and not is_searching:
+        return None, paginate_by_cursor(request, items, ordering)
+    return paginate(request, items)
+
+
+def hash_filelike(file) -> str:
+    """
+    Returns the SHA-256 hex digest of a Django File or binary file-like object,
+    reading it in chunks from the start. The file is left at its start, as some
+    storage backends expect it to be when saving it.
+    """
+    digest = hashlib.sha256()
+    if hasattr(file, "chunks"):
+        for chunk in file.chunks(HASH_CHUNK_SIZE):
+            # Text files are stored encoded
+            digest.update(chunk.encode() if isinstance(chunk, str) else chunk)
+    else:
+        file.seek(0)
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class HashingFile(File):
+    """
+    Wraps a file to compute the SHA-256 of its content as it is read, for example
+    while the storage writes it. Each byte is hashed the first time a read reaches
+    it in order, so reading the start of the file again does not affect the hash.
+    """
+
+    def __init__(self, file):
+        super().__init__(file, name=file.name)
+        self.digest = hashlib.sha256()
+        self.hashed_size = 0
+
+    def read(self, size=-1):
+        start = self.file.tell()
+        data = self.file.read(size)
+        end = start + len(data)
+        if start <= self.hashed_size < end:
+            self.digest.update(data[self.hashed_size - start :])
+            self.hashed_size = end
+        return data
+
+    @property
+    def sha256(self) -> str | None:
+        """
+        Returns the hex digest once the whole file has been read, or None.
+        """
+        if self.hashed_size < self.size:
+            return None
+        return self.digest.hexdigest()
+
+
 def format_audio_html(item: AbstractMedia) -> str:
     return format_html(
         "<audio controls>\n{sources}\n<p>{fallback}</p>\n</audio>",
@@ -5,14 +5,15 @@ from wagtail import hooks
 from wagtail.admin.auth import PermissionPolicyChecker, permission_denied
 from wagtail.admin.forms.search import SearchForm
 from wagtail.admin.modal_workflow import render_modal_workflow
-from wagtail.admin.models import popular_tags_for_model
 from wagtail.models import Collection
-from wagtail.search.backends import get_search_backends
 
+from wagtailmedia.counts import get_popular_tags
 from wagtailmedia.forms import get_media_form
 from wagtailmedia.models import get_media_model
 from wagtailmedia.permissions import permission_policy
-from wagtailmedia.utils import paginate
+from wagtailmedia.upload_handlers import hash_uploads
+from wagtailmedia.utils import DEFAULT_CURSOR_KEY, paginate_media
+from wagtailmedia.views.media import save_media_form
 
 
 permission_checker = PermissionPolicyChecker(permission_policy)
@@ -39,9 +40,31 @@ def get_ordering(request):
     return "-created_at"
 
 
-def chooser(request, media_type=None):
+def paginate_media_files(request, media_files, ordering, is_searching=False):
+    """
+    helper function: return the requested page of media files, and the page
+    range to link to when pages are numbered rather than fetched by cursor
+    """
+    paginator, media_files = paginate_media(
+        request, media_files, ordering, is_searching
+    )
+    if paginator is None:
+        return media_files, None
+    return media_files, paginator.get_elided_page_range(request.GET.get("p", 1))
+
+
+def get_upload_form(request, media_type, *args):
     Media = get_media_model()
+    MediaForm = get_media_form(Media)
+    return MediaForm(
+        *args,
+        instance=Media(uploaded_by_user=request.user, type=media_type),
+        user=request.user,
+        prefix="media-chooser-upload",
+    )
+
 
+def chooser(request, media_type=None):
     ordering = get_ordering(request)
     media_files = permission_policy.instances_user_has_any_permission_for(
         request.user, ["change", "delete"]
@@ -50,23 +73,11 @@ def chooser(request, media_type=None):
     # allow hooks to modify the queryset
     for hook in hooks.get_hooks("construct_media_chooser_queryset"):
         media_files = hook(media_files, request)
+    media_files = media_files.for_listing()
 
     if permission_policy.user_has_permission(request.user, "add"):
-        MediaForm = get_media_form(Media)
-        media_audio = Media(uploaded_by_user=request.user, type="audio")
-        media_video = Media(uploaded_by_user=request.user, type="video")
-
-        uploadforms = {
-            "audio": MediaForm(
-                user=request.user, prefix="media-chooser-upload", instance=media_audio
-            ),
-            "video": MediaForm(
-                user=request.user, prefix="media-chooser-upload", instance=media_video
-            ),
-        }
-
-        if media_type:
-            uploadforms = {media_type: uploadforms[media_type]}
+        # The upload forms are fetched from chooser_upload when their tab is opened
+        uploadforms = dict.fromkeys([media_type] if media_type else ["audio", "video"])
     else:
         uploadforms = {}
 
@@ -79,6 +90,7 @@ def chooser(request, media_type=None):
     if (
         "q" in request.GET
         or "p" in request.GET
+        or DEFAULT_CURSOR_KEY in request.GET
         or "tag" in request.GET
         or "collection_id" in request.GET
     ):
@@ -102,7 +114,9 @@ def chooser(request, media_type=None):
                 media_files = media_files.filter(tags__name=tag_name)
 
         # Pagination
-        paginator, media_files = paginate(request, media_files)
+        media_files, elided_page_range = paginate_media_files(
+            request, media_files, ordering, is_searching
+        )
 
         return render(
             request,
@@ -114,9 +128,8 @@ def chooser(request, media_type=None):
                 "media_type": media_type,
                 "ordering": ordering,
                 "chooser_url": chooser_url,
-                "elided_page_range": paginator.get_elided_page_range(
-                    request.GET.get("p", 1)
-                ),
+                "elided_page_range": elided_page_range,
+                "cursor_pagination": elided_page_range is None,
             },
         )
     else:
@@ -127,7 +140,9 @@ def chooser(request, media_type=None):
             collections = None
 
         media_files = media_files.order_by(ordering)
-        paginator, media_files = paginate(request, media_files)
+        media_files, elided_page_range = paginate_media_files(
+            request, media_files, ordering
+        )
 
     if media_type == "audio":
         title = _("Choose audio")
@@ -146,15 +161,14 @@ def chooser(request, media_type=None):
             "collections": collections,
             "uploadforms": uploadforms,
             "is_searching": False,
-            "popular_tags": popular_tags_for_model(Media),
+            "popular_tags": get_popular_tags(),
             "media_type": media_type,
             "ordering": ordering,
             "title": title,
             "icon": f"wagtailmedia-{media_type}" if media_type is not None else "media",
             "chooser_url": chooser_url,
-            "elided_page_range": paginator.get_elided_page_range(
-                request.GET.get("p", 1)
-            ),
+            "elided_page_range": elided_page_range,
+            "cursor_pagination": elided_page_range is None,
         },
         json_data={
             "step": "chooser",
@@ -189,51 +203,33 @@ def media_chosen(request, media_id):
 
 
 @permission_checker.require("add")
+@hash_uploads
 def chooser_upload(request, media_type):
-    upload_forms = {}
+    if request.method != "POST":
+        # Render the upload form alone, for the chooser to show in its upload tab
+        return render(
+            request,
+            "wagtailmedia/chooser/upload_form.html",
+            {
+                "form_type": media_type,
+                "uploadform": get_upload_form(request, media_type),
+            },
+        )
 
-    if (
-        permission_policy.user_has_permission(request.user, "add")
-        and request.method == "POST"
-    ):
-        Media = get_media_model()
-        MediaForm = get_media_form(Media)
-
-        media = Media(uploaded_by_user=request.user, type=media_type)
-        uploading_form = MediaForm(
-            request.POST,
-            request.FILES,
-            instance=media,
-            user=request.user,
-            prefix="media-chooser-upload",
+    uploading_form = get_upload_form(request, media_type, request.POST, request.FILES)
+    if uploading_form.is_valid():
+        media = save_media_form(uploading_form)
+
+        return render_modal_workflow(
+            request,
+            None,
+            None,
+            None,
+            json_data={"step": "media_chosen", "result": get_media_json(media)},
         )
-        if uploading_form.is_valid():
-            uploading_form.save()
-
-            # Reindex the media entry to make sure all tags are indexed
-            for backend in get_search_backends():
-                backend.add(media)
-
-            return render_modal_workflow(
-                request,
-                None,
-                None,
-                None,
-                json_data={"step": "media_chosen", "result": get_media_json(media)},
-            )
-
-        if media_type == "audio":
-            video = Media(uploaded_by_user=request.user, type="video")
-            video_form = MediaForm(
-                instance=video, user=request.user, prefix="media-chooser-upload"
-            )
-            upload_forms = {"audio": uploading_form, "video": video_form}
-        else:
-            audio = Media(uploaded_by_user=request.user, type="audio")
-            audio_form = MediaForm(
-                instance=audio, user=request.user, prefix="media-chooser-upload"
-            )
-            upload_forms = {"audio": audio_form, "video": uploading_form}
+
+    # The form of the other media type is fetched when its tab is opened
+    upload_forms = {"audio": None, "video": None, media_type: uploading_form}
 
     ordering = get_ordering(request)
 
@@ -244,6 +240,7 @@ def chooser_upload(request, media_type):
     # allow hooks to modify the queryset
     for hook in hooks.get_hooks("construct_media_chooser_queryset"):
         media_files = hook(media_files, request)
+    media_files = media_files.for_listing()
 
     searchform = SearchForm()
 
@@ -252,7 +249,9 @@ def chooser_upload(request, media_type):
         collections = None
 
     media_files = media_files.order_by(ordering)
-    _paginator, media_files = paginate(request, media_files)
+    media_files, elided_page_range = paginate_media_files(
+        request, media_files, ordering
+    )
 
     context = {
         "media_files": media_files,
@@ -262,6 +261,10 @@ def chooser_upload(request, media_type):
         "is_searching": False,
         "media_type": media_type,
         "ordering": ordering,
+        # Media files of both types are listed, as both upload forms are shown
+        "chooser_url": reverse("wagtailmedia:chooser"),
+        "elided_page_range": elided_page_range,
+        "cursor_pagination": elided_page_range is None,
     }
     return render_modal_workflow(
         request,
@@ -1,21 +1,29 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
 from django.core.paginator import Paginator
+from django.db import connections, transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils.text import capfirst
 from django.utils.translation import gettext as _
+from django.utils.translation import ngettext
 from django.views.decorators.vary import vary_on_headers
 from wagtail.admin import messages
 from wagtail.admin.admin_url_finder import AdminURLFinder
 from wagtail.admin.auth import PermissionPolicyChecker, permission_denied
 from wagtail.admin.forms.search import SearchForm
-from wagtail.admin.models import popular_tags_for_model
 from wagtail.models import Collection, Page
-from wagtail.search.backends import get_search_backends
 
+from wagtailmedia.counts import clear_media_counts, get_popular_tags
 from wagtailmedia.forms import get_media_form
 from wagtailmedia.models import get_media_model
 from wagtailmedia.permissions import permission_policy
-from wagtailmedia.utils import paginate
+from wagtailmedia.settings import wagtailmedia_settings
+from wagtailmedia.tasks import index_on_commit
+from wagtailmedia.upload_handlers import hash_uploads
+from wagtailmedia.utils import paginate_media
 
 
 permission_checker = PermissionPolicyChecker(permission_policy)
@@ -24,12 +32,10 @@ permission_checker = PermissionPolicyChecker(permission_policy)
 @permission_checker.require_any("add", "change", "delete")
 @vary_on_headers("X-Requested-With")
 def index(request):
-    Media = get_media_model()
-
     # Get media files (filtered by user permission)
     media = permission_policy.instances_user_has_any_permission_for(
         request.user, ["change", "delete"]
-    )
+    ).for_listing()
 
     # Ordering
     if request.GET.get("ordering") in ["title", "-title", "-created_at", "created_at"]:
@@ -66,7 +72,8 @@ def index(request):
             current_tag = None
 
     # Pagination
-    _paginator, media = paginate(request, media)
+    paginator, media = paginate_media(request, media, ordering, bool(query_string))
+    cursor_pagination = paginator is None
 
     collections = permission_policy.collections_user_has_any_permission_for(
         request.user, ["add", "change"]
@@ -85,6 +92,7 @@ def index(request):
                 "query_string": query_string,
                 "is_searching": bool(query_string),
                 "collections": collections,
+                "cursor_pagination": cursor_pagination,
             },
         )
     else:
@@ -97,18 +105,29 @@ def index(request):
                 "query_string": query_string,
                 "is_searching": bool(query_string),
                 "search_form": form,
-                "popular_tags": popular_tags_for_model(Media),
+                "popular_tags": get_popular_tags(),
                 "current_tag": current_tag,
                 "user_can_add": permission_policy.user_has_permission(
                     request.user, "add"
                 ),
                 "collections": collections,
                 "current_collection": current_collection,
+                "cursor_pagination": cursor_pagination,
             },
         )
 
 
+def save_media_form(form):
+    """
+    Saves a media form in a transaction. Media items are indexed once it is committed,
+    so that the index includes the tags, which are saved after the media item.
+    """
+    with transaction.atomic():
+        return form.save()
+
+
 @permission_checker.require("add")
+@hash_uploads
 def add(request, media_type):
     Media = get_media_model()
     MediaForm = get_media_form(Media)
@@ -117,11 +136,7 @@ def add(request, media_type):
         media = Media(uploaded_by_user=request.user, type=media_type)
         form = MediaForm(request.POST, request.FILES, instance=media, user=request.user)
         if form.is_valid():
-            form.save()
-
-            # Reindex the media entry to make sure all tags are indexed
-            for backend in get_search_backends():
-                backend.add(media)
+            save_media_form(form)
 
             messages.success(
                 request,
@@ -151,7 +166,138 @@ def add(request, media_type):
     )
 
 
+def deduplicate_uploads(media_items):
+    """
+    Point media items uploaded together with the same content at the file of the
+    first of them. The media forms only deduplicate against stored media items.
+    """
+    first_by_hash = {}
+    for media in media_items:
+        first = first_by_hash.setdefault(media.file_hash, media)
+        if first is media or media.file.name == first.file.name:
+            continue
+
+        if not first.file._committed:
+            # Store the file as the file field would when the media item is saved
+            first.file.save(first.file.name, first.file.file, save=False)
+        if media.file._committed:
+            media.file.storage.delete(media.file.name)
+        media.file = first.file.name
+
+
+def create_multiple(forms):
+    """
+    Creates media items from valid media forms. The uploads are probed
+    concurrently, then saved together and added to the search index in one call.
+    """
+    Media = get_media_model()
+
+    with ThreadPoolExecutor(
+        max_workers=wagtailmedia_settings.MULTIPLE_UPLOAD_WORKERS
+    ) as executor:
+        # Only the file reads run in threads, the database is used from this thread
+        list(executor.map(lambda form: form.read_file(), forms))
+
+    media_items = [form.save(commit=False) for form in forms]
+    if wagtailmedia_settings.DEDUPLICATE:
+        deduplicate_uploads(media_items)
+
+    with transaction.atomic():
+        if not connections[Media.objects.db].features.can_return_rows_from_bulk_insert:
+            # Each media item is indexed on commit, as with single uploads
+            for form in forms:
+                form.instance.save()
+                form.save_m2m()
+            return media_items
+
+        # bulk_create sends no post_save signals, so the media items are not
+        # indexed one by one, but in bulk once the transaction is committed
+        Media.objects.bulk_create(media_items)
+        for form in forms:
+            form.save_m2m()
+
+        index_on_commit(media_items)
+        transaction.on_commit(clear_media_counts)
+
+    return media_items
+
+
+@permission_checker.require("add")
+@hash_uploads
+def add_multiple(request, media_type):
+    Media = get_media_model()
+    MediaForm = get_media_form(Media)
+
+    # The collection and tags fields apply to all the uploaded files
+    form = MediaForm(
+        request.POST or None,
+        user=request.user,
+        instance=Media(uploaded_by_user=request.user, type=media_type),
+    )
+
+    if request.method == "POST":
+        files = request.FILES.getlist("files")
+        upload_forms = [
+            MediaForm(
+                {
+                    "title": os.path.splitext(file.name)[0],
+                    "collection": request.POST.get("collection"),
+                    "tags": request.POST.get("tags", ""),
+                },
+                {"file": file},
+                instance=Media(uploaded_by_user=request.user, type=media_type),
+                user=request.user,
+            )
+            for file in files
+        ]
+        valid_forms = [
+            upload_form for upload_form in upload_forms if upload_form.is_valid()
+        ]
+
+        if valid_forms:
+            media_items = create_multiple(valid_forms)
+            messages.success(
+                request,
+                ngettext(
+                    "%(count)d media file added.",
+                    "%(count)d media files added.",
+                    len(media_items),
+                )
+                % {"count": len(media_items)},
+            )
+
+        for upload_form in upload_forms:
+            if upload_form not in valid_forms:
+                messages.error(
+                    request,
+                    _("'{0}' could not be uploaded: {1}").format(
+                        upload_form.files["file"].name,
+                        " ".join(
+                            error
+                            for errors in upload_form.errors.values()
+                            for error in errors
+                        ),
+                    ),
+                )
+
+        if not files:
+            messages.error(request, _("Please choose files to upload."))
+        elif len(valid_forms) == len(upload_forms):
+            return redirect("wagtailmedia:index")
+
+    return render(
+        request,
+        "wagtailmedia/media/add_multiple.html",
+        {
+            "form": form,
+            "media_type": media_type,
+            "file_accept_value": form.get_file_accept_value(media_type),
+        },
+    )
+
+
 @permission_checker.require("change")
+@hash_uploads
 def edit(request, media_id):
     Media = get_media_model()
     MediaForm = get_media_form(Media)
@@ -167,16 +313,15 @@ def edit(request, media_id):
         original_file = media.file
         form = MediaForm(request.POST, request.FILES, instance=media, user=request.user)
         if form.is_valid():
-            if "file" in form.changed_data:
-                # if providing a new media file, delete the old one.
+            if "file" in form.changed_data and not media.is_file_shared(
+                original_file.name
+            ):
+                # if providing a new media file, delete the old one, unless
+                # deduplicated uploads of it are still used by other media items.
                 # NB Doing this via original_file.delete() clears the file field,
                 # which definitely isn't what we want...
                 original_file.storage.delete(original_file.name)
-            media = form.save()
-
-            # Reindex the media entry to make sure all tags are indexed
-            for backend in get_search_backends():
-                backend.add(media)
+            media = save_media_form(form)
 
             messages.success(
                 request,
@@ -193,15 +338,8 @@ def edit(request, media_id):
     else:
         form = MediaForm(instance=media, user=request.user)
 
-    filesize = None
-
-    # Get file size when there is a file associated with the Media object
-    if media.file:
-        try:
-            filesize = media.file.size
-        except OSError:
-            # File doesn't exist
-            pass
+    # The file size is recorded on upload, only older media items read it from storage
+    filesize = media.get_file_size() if media.file else None
 
     if not filesize:
         messages.error(
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os.path
+import re
+
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    content_disposition_header,
+    http_date,
+    parse_http_date_safe,
+    quote_etag,
+    url_has_allowed_host_and_scheme,
+)
+from wagtail import hooks
+from wagtail.forms import PasswordViewRestrictionForm
+from wagtail.models import CollectionViewRestriction
+
+from wagtailmedia.models import get_media_model, media_served
+from wagtailmedia.settings import wagtailmedia_settings
+
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.db.models.fields.files import FieldFile
+    from django.http import HttpRequest
+
+    from wagtailmedia.models import AbstractMedia
+
+
+RANGE_RE = re.compile(r"^\s*bytes=(\d*)-(\d*)\s*$")
+
+
+class MediaFileResponse(FileResponse):
+    """
+    A FileResponse that streams in blocks of WAGTAILMEDIA["SERVE_CHUNK_SIZE"] bytes.
+    """
+
+    def __init__(self, *args, block_size: int | None = None, **kwargs):
+        if block_size:
+            self.block_size = block_size
+        super().__init__(*args, **kwargs)
+
+
+class FileRange:
+    """
+    A read-only file-like window over ``length`` bytes of ``file``, starting at ``start``.
+    """
+
+    def __init__(self, file, start: int, length: int):
+        self.file = file
+        self.remaining = length
+        self.file.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range_header(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parses a single-part HTTP Range header into an inclusive ``(start, end)`` byte pair.
+
+    Returns None when the header is absent, malformed or asks for multiple ranges,
+    in which case the whole file should be served. Raises ValueError when the range
+    cannot be satisfied for a file of the given size.
+    """
+    if not header:
+        return None
+
+    match = RANGE_RE.match(header)
+    if match is None:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # suffix range, e.g. "bytes=-500" for the last 500 bytes
+        suffix_length = int(end)
+        if suffix_length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - suffix_length, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+
+    return start, min(end, size - 1)
+
+
+def is_new_playback(header: str | None) -> bool:
+    """
+    Players issue many Range requests while buffering and seeking, but a playback
+    session always opens by requesting the file from its first byte.
+    """
+    match = RANGE_RE.match(header) if header else None
+    return match is None or (match.group(1).isdigit() and int(match.group(1)) == 0)
+
+
+def get_content_type(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def get_file_validators(
+    file: FieldFile, size: int, fallback_last_modified: datetime, file_hash: str = ""
+) -> tuple[str, datetime]:
+    """
+    Returns a strong ETag and the last modification time of a stored file.
+
+    The ETag is the content hash of the file when it is known. Otherwise, as files
+    replaced in the admin may be stored under the name of the file they replace,
+    it covers the size and modification time as well as the name.
+    """
+    try:
+        last_modified = file.storage.get_modified_time(file.name)
+    except NotImplementedError:
+        last_modified = fallback_last_modified
+
+    digest = (
+        file_hash
+        or hashlib.sha256(
+            f"{file.name}:{size}:{last_modified.timestamp()}".encode()
+        ).hexdigest()
+    )
+    return quote_etag(digest), last_modified
+
+
+def set_validator_headers(response: HttpResponse, etag: str, last_modified: datetime):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+
+
+def get_conditional_file_response(
+    request: HttpRequest, etag: str, last_modified: datetime
+) -> HttpResponse | None:
+    """
+    Returns a 304 (Not Modified) or 412 (Precondition Failed) response when the
+    request's conditional headers allow us to skip sending the file.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+    if response is not None:
+        set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def run_before_serve_hooks(media: AbstractMedia, request: HttpRequest):
+    for fn in hooks.get_hooks("before_serve_media"):
+        result = fn(media, request)
+        if isinstance(result, HttpResponse):
+            return result
+    return None
+
+
+def serve(request: HttpRequest, media_id: int, media_filename: str) -> HttpResponse:
+    Media = get_media_model()
+    media = get_object_or_404(Media, id=media_id)
+
+    # Make sure the filename in the URL matches the one on record for media_id,
+    # so that stale or guessed URLs do not resolve to a different file.
+    if media.filename != media_filename:
+        raise Http404("This media item does not match the given filename.")
+
+    if response := run_before_serve_hooks(media, request):
+        return response
+
+    try:
+        size = media.file.size
+        etag, last_modified = get_file_validators(
+            media.file, size, media.created_at, media.file_hash
+        )
+    except OSError as err:
+        raise Http404("The media file could not be found.") from err
+
+    # Revalidations of an unchanged file are answered without transferring it
+    if response := get_conditional_file_response(request, etag, last_modified):
+        return response
+
+    if is_new_playback(request.headers.get("range")):
+        media_served.send(sender=Media, instance=media, request=request)
+
+    return file_response(request, media.file, size, etag, last_modified)
+
+
+def file_response(
+    request: HttpRequest,
+    file: FieldFile,
+    size: int,
+    etag: str,
+    last_modified: datetime,
+) -> HttpResponse:
+    # The permission checks have passed. Unless configured otherwise, hand the byte
+    # transfer over to the web server so that the worker is released straight away.
+    serve_method = wagtailmedia_settings.SERVE_METHOD
+    response = None
+    if serve_method == "x_accel_redirect":
+        location = wagtailmedia_settings.X_ACCEL_REDIRECT_PREFIX + quote(file.name)
+        response = offload_response(file, "X-Accel-Redirect", location)
+
+    elif serve_method == "x_sendfile":
+        try:
+            local_path = file.path
+        except NotImplementedError:
+            # The storage backend does not expose filesystem paths, stream instead.
+            local_path = None
+        if local_path:
+            response = offload_response(file, "X-Sendfile", local_path)
+
+    if response is None:
+        response = stream_response(request, file, size, etag, last_modified)
+
+    set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def offload_response(file: FieldFile, header: str, location: str) -> HttpResponse:
+    """
+    Returns an empty response instructing nginx (X-Accel-Redirect) or Apache
+    (X-Sendfile) to send the file, including any Range handling, on our behalf.
+    """
+    filename = os.path.basename(file.name)
+    response = HttpResponse(content_type=get_content_type(filename))
+    response[header] = location
+    response["Content-Disposition"] = content_disposition_header(False, filename)
+    response["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+def if_range_matches(request: HttpRequest, etag: str, last_modified: datetime) -> bool:
+    """
+    A Range request carrying an If-Range validator for an older version of the
+    file must be answered with the whole current file.
+    """
+    if_range = request.headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified.timestamp())
+
+
+def stream_response(
+    request: HttpRequest,
+    file: FieldFile,
+    size: int,
+    etag: str,
+    last_modified: datetime,
+) -> HttpResponse:
+    filename = os.path.basename(file.name)
+    content_type = get_content_type(filename)
+
+    byte_range = None
+    if if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range_header(request.headers.get("range"), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            response["Accept-Ranges"] = "bytes"
+            return response
+
+    file.open("rb")
+    if byte_range is None:
+        response = MediaFileResponse(
+            file,
+            content_type=content_type,
+            filename=filename,
+            block_size=wagtailmedia_settings.SERVE_CHUNK_SIZE,
+        )
+        response["Content-Length"] = size
+    else:
+        start, end = byte_range
+        response = MediaFileResponse(
+            FileRange(file, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+            filename=filename,
+            block_size=wagtailmedia_settings.SERVE_CHUNK_SIZE,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    # Prevent browsers from auto-detecting the content-type of the file
+    response["X-Content-Type-Options"] = "nosniff"
+
+    return response
+
+
+def serve_thumbnail(
+    request: HttpRequest, media_id: int, thumbnail_filename: str
+) -> HttpResponse:
+    media = get_object_or_404(get_media_model(), id=media_id)
+
+    if not media.thumbnail or media.thumbnail_filename != thumbnail_filename:
+        raise Http404("This media item does not have the given thumbnail.")
+
+    if response := run_before_serve_hooks(media, request):
+        return response
+
+    try:
+        size = media.thumbnail.size
+        etag, last_modified = get_file_validators(
+            media.thumbnail, size, media.created_at
+        )
+    except OSError as err:
+        raise Http404("The thumbnail file could not be found.") from err
+
+    if response := get_conditional_file_response(request, etag, last_modified):
+        return response
+
+    media.thumbnail.open("rb")
+    response = FileResponse(
+        media.thumbnail,
+        content_type=get_content_type(media.thumbnail_filename),
+        filename=media.thumbnail_filename,
+    )
+    response["Content-Length"] = size
+    response["X-Content-Type-Options"] = "nosniff"
+    set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def serve_rendition(
+    request: HttpRequest, media_id: int, rendition_id: int, rendition_filename: str
+) -> HttpResponse:
+    Media = get_media_model()
+    media = get_object_or_404(Media, id=media_id)
+
+    Rendition = media.get_rendition_model()
+    if Rendition is None:
+        raise Http404("This media model does not have renditions.")
+    rendition = get_object_or_404(Rendition, id=rendition_id, media=media)
+    if rendition.filename != rendition_filename:
+        raise Http404("This rendition does not match the given filename.")
+
+    # Renditions are subject to the same checks as the media item itself
+    if response := run_before_serve_hooks(media, request):
+        return response
+
+    try:
+        size = rendition.file.size
+        etag, last_modified = get_file_validators(
+            rendition.file, size, rendition.created_at
+        )
+    except OSError as err:
+        raise Http404("The rendition file could not be found.") from err
+
+    if response := get_conditional_file_response(request, etag, last_modified):
+        return response
+
+    if is_new_playback(request.headers.get("range")):
+        media_served.send(sender=Media, instance=media, request=request)
+
+    return file_response(request, rendition.file, size, etag, last_modified)
+
+
+def authenticate_with_password(request: HttpRequest, restriction_id: int):
+    """
+    Handle a submission of PasswordViewRestrictionForm to grant view access over a
+    collection that is protected by a CollectionViewRestriction
+    """
+    restriction = get_object_or_404(CollectionViewRestriction, id=restriction_id)
+
+    if request.method == "POST":
+        form = PasswordViewRestrictionForm(request.POST, instance=restriction)
+        if form.is_valid():
+            return_url = form.cleaned_data["return_url"]
+
+            if not url_has_allowed_host_and_scheme(
+                return_url, request.get_host(), request.is_secure()
+            ):
+                return_url = settings.LOGIN_REDIRECT_URL
+
+            restriction.mark_as_passed(request)
+            return redirect(return_url)
+    else:
+        form = PasswordViewRestrictionForm(instance=restriction)
+
+    action_url = reverse(
+        "wagtailmedia_authenticate_with_password", args=[restriction.id]
+    )
+
+    context = {"form": form, "action_url": action_url}
+    return TemplateResponse(
+        request, wagtailmedia_settings.PASSWORD_REQUIRED_TEMPLATE, context
+    )
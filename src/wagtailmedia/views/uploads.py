@@ -0,0 +1,155 @@
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.signing import BadSignature
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods, require_POST
+from wagtail.admin.auth import PermissionPolicyChecker
+
+from wagtailmedia.forms import get_media_form
+from wagtailmedia.models import get_media_model
+from wagtailmedia.permissions import permission_policy
+from wagtailmedia.settings import wagtailmedia_settings
+from wagtailmedia.uploads import ChunkedUpload
+from wagtailmedia.views.media import save_media_form
+
+
+permission_checker = PermissionPolicyChecker(permission_policy)
+
+
+def get_upload_or_404(request, upload_id):
+    try:
+        upload = ChunkedUpload.from_token(upload_id)
+    except BadSignature as err:
+        raise Http404("Unknown or expired upload") from err
+
+    if upload.user_id != request.user.pk:
+        raise Http404("Unknown or expired upload")
+    return upload
+
+
+def get_upload_json(upload):
+    parts = upload.get_parts()
+    return {
+        "upload_id": upload.token,
+        "filename": upload.filename,
+        "size": upload.size,
+        "received": sum(size for _number, size in parts),
+        "parts": [{"number": number, "size": size} for number, size in parts],
+        "chunk_size": wagtailmedia_settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        "url": reverse("wagtailmedia:chunked_upload", args=(upload.token,)),
+    }
+
+
+@permission_checker.require("add")
+@require_POST
+def start(request, media_type):
+    """
+    Starts a chunked upload. Expects the ``filename`` and total ``size`` of the file,
+    and checks the file extension before any of the file is sent.
+    """
+    filename = request.POST.get("filename", "")
+    try:
+        size = int(request.POST.get("size", ""))
+    except ValueError:
+        size = 0
+    if not filename or size <= 0:
+        return JsonResponse(
+            {"error": "A filename and a positive size are required"}, status=400
+        )
+
+    try:
+        upload = ChunkedUpload.start(filename, size, media_type, request.user)
+    except ValidationError as err:
+        return JsonResponse({"error": " ".join(err.messages)}, status=400)
+
+    return JsonResponse(get_upload_json(upload), status=201)
+
+
+@permission_checker.require("add")
+@require_http_methods(["GET", "DELETE"])
+def upload_status(request, upload_id):
+    """
+    Lists the parts received so far, so that an interrupted upload can be resumed,
+    or abandons the upload on DELETE.
+    """
+    upload = get_upload_or_404(request, upload_id)
+    if request.method == "DELETE":
+        upload.delete()
+        return HttpResponse(status=204)
+
+    return JsonResponse(get_upload_json(upload))
+
+
+@permission_checker.require("add")
+@require_http_methods(["PUT", "POST"])
+def upload_part(request, upload_id, part):
+    """
+    Stores the raw request body as part number ``part``, counting from 0. Parts are
+    streamed to the storage rather than parsed as form data.
+    """
+    upload = get_upload_or_404(request, upload_id)
+
+    try:
+        length = int(request.headers.get("content-length", ""))
+    except ValueError:
+        return JsonResponse({"error": "A Content-Length is required"}, status=411)
+
+    if length > wagtailmedia_settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        return JsonResponse({"error": "The part is too large"}, status=413)
+
+    other_parts_size = sum(
+        size for number, size in upload.get_parts() if number != part
+    )
+    if length <= 0 or other_parts_size + length > upload.size:
+        return JsonResponse(
+            {"error": "The part does not fit in the declared file size"}, status=400
+        )
+
+    content = File(request, name=upload.get_part_name(part))
+    content.size = length
+    try:
+        upload.save_part(part, content)
+    except ValueError as err:
+        return JsonResponse({"error": str(err)}, status=409)
+
+    return JsonResponse(get_upload_json(upload))
+
+
+@permission_checker.require("add")
+@require_POST
+def complete(request, upload_id):
+    """
+    Creates the media item from the uploaded parts and the media form fields sent
+    with the request, then removes the parts.
+    """
+    upload = get_upload_or_404(request, upload_id)
+    try:
+        uploaded_file = upload.open()
+    except ValueError as err:
+        return JsonResponse({"error": str(err)}, status=400)
+
+    Media = get_media_model()
+    MediaForm = get_media_form(Media)
+
+    media = Media(uploaded_by_user=request.user, type=upload.media_type)
+    form = MediaForm(
+        request.POST, {"file": uploaded_file}, instance=media, user=request.user
+    )
+    with uploaded_file:
+        if not form.is_valid():
+            return JsonResponse(
+                {"success": False, "errors": form.errors.get_json_data()}, status=400
+            )
+        save_media_form(form)
+
+    upload.delete()
+
+    return JsonResponse(
+        {
+            "success": True,
+            "media_id": media.id,
+            "edit_url": reverse("wagtailmedia:edit", args=(media.id,)),
+        },
+        status=201,
+    )
@@ -1,4 +1,6 @@
+from django.template.response import TemplateResponse
 from django.urls import include, path, reverse
+from django.utils.cache import add_never_cache_headers
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext
@@ -12,11 +14,15 @@ from wagtail.admin.navigation import get_site_for_user
 from wagtail.admin.search import SearchArea
 from wagtail.admin.site_summary import SummaryItem
 from wagtail.admin.staticfiles import versioned_static
+from wagtail.models import BaseViewRestriction
+from wagtail.wagtail_hooks import require_wagtail_login
 
 from wagtailmedia import admin_urls
+from wagtailmedia.counts import count_collection_media, count_media_for_user
 from wagtailmedia.forms import GroupMediaPermissionFormSet
 from wagtailmedia.models import get_media_model
 from wagtailmedia.permissions import permission_policy
+from wagtailmedia.settings import wagtailmedia_settings
 
 
 @hooks.register("register_admin_urls")
@@ -51,9 +57,9 @@ class MediaSummaryItem(SummaryItem):
     def get_context_data(self, parent_context):
         site_name = get_site_for_user(self.request.user)["site_name"]
         return {
-            "total_media": permission_policy.instances_user_has_any_permission_for(
+            "total_media": count_media_for_user(
                 self.request.user, {"add", "change", "delete", "choose"}
-            ).count(),
+            ),
             "site_name": site_name,
         }
 
@@ -93,7 +99,8 @@ def register_media_permissions_panel():
 
 @hooks.register("describe_collection_contents")
 def describe_collection_media(collection):
-    if media_count := get_media_model().objects.filter(collection=collection).count():
+    # Not read from the cache, as collections are only deleted when this returns None
+    if media_count := count_collection_media(collection.id):
         url = reverse("wagtailmedia:index") + f"?collection_id={collection.id}"
         return {
             "count": media_count,
@@ -106,6 +113,42 @@ def describe_collection_media(collection):
     return None
 
 
+@hooks.register("before_serve_media")
+def check_view_restrictions(media, request):
+    """
+    Check whether there are any view restrictions on the collection of this media item
+    which are not fulfilled by the given request object. If there are, return an
+    HttpResponse that will notify the user of that restriction (and possibly
+    include a password / login form that will allow them to proceed). If
+    there are no such restrictions, return None
+    """
+    for restriction in media.collection.get_view_restrictions():
+        if not restriction.accept_request(request):
+            if restriction.restriction_type == BaseViewRestriction.PASSWORD:
+                from wagtail.forms import PasswordViewRestrictionForm
+
+                form = PasswordViewRestrictionForm(
+                    instance=restriction,
+                    initial={"return_url": request.get_full_path()},
+                )
+                action_url = reverse(
+                    "wagtailmedia_authenticate_with_password", args=[restriction.id]
+                )
+
+                context = {"form": form, "action_url": action_url}
+                response = TemplateResponse(
+                    request, wagtailmedia_settings.PASSWORD_REQUIRED_TEMPLATE, context
+                )
+                add_never_cache_headers(response)
+                return response
+
+            elif restriction.restriction_type in [
+                BaseViewRestriction.LOGIN,
+                BaseViewRestriction.GROUPS,
+            ]:
+                return require_wagtail_login(next=request.get_full_path())
+
+
 class MediaAdminURLFinder(ModelAdminURLFinder):
     permission_policy = permission_policy
     edit_url_name = "wagtailmedia:edit"
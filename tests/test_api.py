@@ -155,7 +155,17 @@ class TestApiMediaListing(ApiTestBase):
         for item in content["items"]:
             self.assertEqual(
                 set(item.keys()),
-                {"id", "meta", "title", "width", "height", "media_type", "collection"},
+                {
+                    "id",
+                    "meta",
+                    "title",
+                    "width",
+                    "height",
+                    "media_type",
+                    "collection",
+                    "file_size",
+                    "mime_type",
+                },
             )
             self.assertEqual(
                 set(item["meta"].keys()),
@@ -169,7 +179,10 @@ class TestApiMediaListing(ApiTestBase):
         content = json.loads(response.content.decode("UTF-8"))
 
         for item in content["items"]:
-            self.assertEqual(set(item.keys()), {"id", "meta", "width", "height"})
+            self.assertEqual(
+                set(item.keys()),
+                {"id", "meta", "width", "height", "file_size", "mime_type"},
+            )
             self.assertEqual(set(item["meta"].keys()), {"type", "detail_url", "tags"})
 
     def test_fields_tags(self):
@@ -482,6 +495,10 @@ class TestApiMediaDetail(ApiTestBase):
         self.assertIn("tags", content["meta"])
         self.assertEqual(content["meta"]["tags"], [])
 
+        # Check the file fields recorded on upload
+        self.assertEqual(content["file_size"], self.a_space_odyssey.file_size)
+        self.assertEqual(content["mime_type"], "video/mp4")
+
     def test_tags(self):
         item = Media.objects.first()
         item.tags.add("hello")
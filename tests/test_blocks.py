@@ -1,6 +1,7 @@
 from django.core.files.base import ContentFile
 from django.test import TestCase
 from django.urls import reverse
+from wagtail.blocks import StreamBlock
 
 from wagtailmedia.blocks import (
     AbstractMediaChooserBlock,
@@ -121,3 +122,46 @@ class BlockTests(TestCase):
         self.assertIs(
             VideoChooserBlock().get_comparison_class(), MediaChooserBlockComparison
         )
+
+    def test_to_python_filters_media_type(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(AudioChooserBlock().to_python(self.audio.pk), self.audio)
+        self.assertIsNone(AudioChooserBlock().to_python(self.video.pk))
+        self.assertIsNone(VideoChooserBlock().to_python(None))
+        self.assertEqual(
+            AbstractMediaChooserBlock().to_python(self.video.pk), self.video
+        )
+
+    def test_bulk_to_python(self):
+        self.audio.renditions.create(file=ContentFile("Test", name="test.ogg"))
+        stream_block = StreamBlock(
+            [("audio", AudioChooserBlock()), ("video", VideoChooserBlock())]
+        )
+        raw_data = []
+        for i in range(50):
+            # videos chosen in audio blocks and missing media items load as None
+            raw_data.append({"type": "audio", "value": self.audio.pk, "id": f"a{i}"})
+            raw_data.append(
+                {
+                    "type": "video",
+                    "value": self.video.pk if i % 2 else 0,
+                    "id": f"v{i}",
+                }
+            )
+        raw_data[0]["value"] = self.video.pk
+
+        # each block type loads its media items, then their renditions
+        with self.assertNumQueries(4):
+            stream = stream_block.to_python(raw_data)
+            html = stream_block.render(stream)
+
+        values = [child.value for child in stream]
+        self.assertEqual(len(values), 100)
+        self.assertIsNone(values[0])
+        self.assertEqual(values[2], self.audio)
+        self.assertIsNot(values[2], values[4])
+        self.assertIsNone(values[1])
+        self.assertEqual(values[3], self.video)
+        self.assertEqual(html.count("<audio controls>"), 49)
+        self.assertEqual(html.count("<video controls>"), 25)
+        self.assertEqual(html.count('type="audio/ogg"'), 49)
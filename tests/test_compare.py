@@ -1,6 +1,12 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils.safestring import SafeString
-from testapp.models import BlogStreamPage
+from testapp.models import BlogStreamPage, EventPage, EventPageRelatedMedia
+from wagtail.test.utils import WagtailTestUtils
 
 from wagtailmedia.blocks import (
     AudioChooserBlock,
@@ -128,6 +134,71 @@ class MediaFieldComparisonTest(MediaBlockComparisonTestCase):
         )
 
 
+class MediaFieldComparisonBatchTest(MediaBlockComparisonTestCase, WagtailTestUtils):
+    fixtures = ["test.json"]
+
+    def test_objects_loaded_in_one_query(self):
+        comparison = MediaFieldComparison(
+            BlogStreamPage._meta.get_field("featured_media"),
+            BlogStreamPage(featured_media=self.audio_a),
+            BlogStreamPage(featured_media=self.audio_b),
+        )
+        # the media items and their renditions
+        with self.assertNumQueries(2):
+            self.assertEqual(comparison.get_objects(), (self.audio_a, self.audio_b))
+
+    def test_each_value_rendered_once(self):
+        comparison = MediaFieldComparison(
+            BlogStreamPage._meta.get_field("featured_media"),
+            BlogStreamPage(featured_media=self.audio_a),
+            BlogStreamPage(featured_media=self.audio_a),
+        )
+        with mock.patch.object(
+            MediaFieldComparison,
+            "render_media_item",
+            wraps=MediaFieldComparison.render_media_item,
+        ) as render_media_item:
+            comparison.htmldiff()
+        render_media_item.assert_called_once()
+
+    def test_compare_view_loads_media_items_once(self):
+        self.login()
+        page = EventPage.objects.get(id=3)
+        page.related_media = [
+            EventPageRelatedMedia(title="Audio", link_media=self.audio_a),
+            EventPageRelatedMedia(title="Video", link_media=self.video_a),
+        ]
+        revision_a = page.save_revision()
+        page.related_media = [
+            EventPageRelatedMedia(title="Audio", link_media=self.audio_b),
+            EventPageRelatedMedia(title="Video", link_media=self.video_b),
+            EventPageRelatedMedia(title="Other", link_media_id=1),
+        ]
+        revision_b = page.save_revision()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse(
+                    "wagtailadmin_pages:revisions_compare",
+                    args=(page.id, revision_a.id, revision_b.id),
+                )
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, format_audio_html(self.audio_b), html=True)
+        self.assertContains(response, format_video_html(self.video_a), html=True)
+
+        # Loading the revisions checks that each media item exists, after which the
+        # media items of all the comparisons are looked up together
+        media_table = f'FROM "{Media._meta.db_table}"'
+        lookups = [
+            query["sql"]
+            for query in queries
+            if media_table in query["sql"] and "IN (" in query["sql"]
+        ]
+        self.assertEqual(len(lookups), 1)
+        self.assertIn("IN (1, 2, 3, 4, 5)", lookups[0])
+
+
 class MediaBlockComparisonTest(MediaBlockComparisonTestCase):
     comparison_class = MediaChooserBlockComparison
 
@@ -173,3 +244,24 @@ class MediaBlockComparisonTest(MediaBlockComparisonTestCase):
             f'<div class="comparison--media deletion">{format_video_html(self.video_a)}</div>'
             f'<div class="comparison--media addition">{format_video_html(self.video_b)}</div>',
         )
+
+    def test_each_value_rendered_once(self):
+        block = AudioChooserBlock()
+        with mock.patch.object(
+            block, "render_basic", wraps=block.render_basic
+        ) as render_basic:
+            comparison = self.comparison_class(
+                block, True, True, self.audio_a, self.audio_a
+            )
+            comparison.htmlvalue(self.audio_a)
+            self.assertEqual(render_basic.call_count, 1)
+
+            render_basic.reset_mock()
+            comparison.htmldiff()
+            self.assertEqual(render_basic.call_count, 1)
+
+            render_basic.reset_mock()
+            self.comparison_class(
+                block, True, True, self.audio_a, self.audio_b
+            ).htmldiff()
+            self.assertEqual(render_basic.call_count, 2)
@@ -0,0 +1,199 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from wagtail.documents import get_document_model
+from wagtail.models import Collection, GroupCollectionPermission
+from wagtail.test.utils import WagtailTestUtils
+
+from wagtailmedia import models
+from wagtailmedia.counts import (
+    clear_media_counts,
+    count_media,
+    count_media_for_user,
+    get_media_counts,
+    get_popular_tags,
+)
+from wagtailmedia.wagtail_hooks import describe_collection_media
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TestMediaCounts(TestCase, WagtailTestUtils):
+    @classmethod
+    def setUpTestData(cls):
+        cls.root_collection = Collection.get_first_root_node()
+        cls.collection = cls.root_collection.add_child(name="Collection")
+        cls.owner = get_user_model().objects.create_user(
+            username="owner", password="password"
+        )
+        models.Media.objects.create(title="Audio", duration=100, type="audio")
+        models.Media.objects.create(
+            title="Video", duration=100, type="video", uploaded_by_user=cls.owner
+        )
+        models.Media.objects.create(
+            title="Audio in collection",
+            duration=100,
+            type="audio",
+            collection=cls.collection,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_media_counts(),
+                {
+                    self.root_collection.id: {"audio": 1, "video": 1},
+                    self.collection.id: {"audio": 1},
+                },
+            )
+
+        # the counts are cached
+        with self.assertNumQueries(0):
+            self.assertEqual(count_media(), 3)
+            self.assertEqual(count_media(media_type="audio"), 2)
+            self.assertEqual(count_media(collection_id=self.collection.id), 1)
+            self.assertEqual(
+                count_media(collection_id=self.collection.id, media_type="video"), 0
+            )
+
+    def test_counts_cleared_on_save_and_delete(self):
+        self.assertEqual(count_media(), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            media = models.Media.objects.create(title="New", duration=100, type="video")
+        self.assertEqual(count_media(media_type="video"), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            media.collection = self.collection
+            media.save()
+        self.assertEqual(count_media(collection_id=self.collection.id), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            media.delete()
+        self.assertEqual(count_media(), 3)
+
+    def test_count_for_user(self):
+        superuser = get_user_model().objects.create_superuser(
+            username="admin", password="password"
+        )
+        self.assertEqual(count_media_for_user(superuser, {"change"}), 3)
+
+        # the owner can change their own media items only
+        group = Group.objects.create(name="Media adders")
+        GroupCollectionPermission.objects.create(
+            group=group,
+            collection=self.root_collection,
+            permission=Permission.objects.get(codename="add_media"),
+        )
+        self.owner.groups.add(group)
+        self.assertEqual(count_media_for_user(self.owner, {"change"}), 1)
+
+        # and the count is cached for them
+        with self.assertNumQueries(0):
+            self.assertEqual(count_media_for_user(self.owner, {"change"}), 1)
+
+    def test_describe_collection_media(self):
+        description = describe_collection_media(self.collection)
+        self.assertEqual(description["count"], 1)
+        self.assertEqual(description["count_text"], "1 media file")
+
+        empty_collection = self.root_collection.add_child(name="Empty")
+        self.assertIsNone(describe_collection_media(empty_collection))
+
+    def test_describe_collection_media_not_cached(self):
+        target = self.root_collection.add_child(name="Target")
+        get_media_counts()
+        # bulk updates do not clear the cached counts
+        models.Media.objects.filter(title="Audio").update(collection=target)
+
+        self.assertEqual(describe_collection_media(target)["count"], 1)
+
+        # so the collection cannot be deleted along with its media items
+        self.login()
+        response = self.client.post(
+            reverse("wagtailadmin_collections:delete", args=(target.id,))
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(models.Media.objects.filter(collection=target).exists())
+
+    def test_site_summary(self):
+        self.login()
+        response = self.client.get(reverse("wagtailadmin_home"))
+        self.assertContains(response, "<span>3</span> Media files")
+
+    def test_popular_tags(self):
+        media = models.Media.objects.get(title="Audio")
+        with self.captureOnCommitCallbacks(execute=True):
+            media.tags.add("music", "loud")
+        video = models.Media.objects.get(title="Video")
+        with self.captureOnCommitCallbacks(execute=True):
+            video.tags.add("music")
+
+        tags = get_popular_tags()
+        self.assertEqual(
+            [(tag.name, tag.item_count) for tag in tags], [("music", 2), ("loud", 1)]
+        )
+
+        # the tags are cached
+        with self.assertNumQueries(0):
+            self.assertEqual(get_popular_tags(), tags)
+
+        # and cleared when media tags change
+        with self.captureOnCommitCallbacks(execute=True):
+            media.tags.remove("loud")
+        self.assertEqual([tag.name for tag in get_popular_tags()], ["music"])
+
+        # but not when the tags of other models do
+        document = get_document_model().objects.create(
+            title="Document", file="documents/document.pdf"
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            document.tags.add("event")
+        self.assertNotIn(clear_media_counts, callbacks)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+)
+class TestMediaCountsRequestMemo(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root_collection = Collection.get_first_root_node()
+        cls.collections = [
+            root_collection.add_child(name=f"Collection {i}") for i in range(3)
+        ]
+        for collection in cls.collections:
+            models.Media.objects.create(
+                title="Audio", duration=100, type="audio", collection=collection
+            )
+
+    def test_counts_read_once_per_request(self):
+        request_started.send(sender=self.__class__)
+        try:
+            with self.assertNumQueries(1):
+                for collection in self.collections:
+                    self.assertEqual(describe_collection_media(collection)["count"], 1)
+
+            # saving a media item clears the counts read so far
+            with self.captureOnCommitCallbacks(execute=True):
+                models.Media.objects.create(
+                    title="Video",
+                    duration=100,
+                    type="video",
+                    collection=self.collections[0],
+                )
+            self.assertEqual(count_media(collection_id=self.collections[0].id), 2)
+        finally:
+            request_finished.send(sender=self.__class__)
+
+    def test_counts_not_kept_outside_requests(self):
+        with self.assertNumQueries(2):
+            count_media()
+            count_media()
@@ -4,7 +4,12 @@ from testapp.forms import AlternateMediaForm, OverridenWidget
 from wagtail.admin import widgets
 
 from wagtailmedia import models
-from wagtailmedia.forms import BaseMediaForm, get_media_base_form, get_media_form
+from wagtailmedia.forms import (
+    BaseMediaForm,
+    clear_media_form_cache,
+    get_media_base_form,
+    get_media_form,
+)
 
 
 class TestFormOverride(TestCase):
@@ -16,6 +21,20 @@ class TestFormOverride(TestCase):
         self.assertIn(BaseMediaForm, bases)
         self.assertNotIn(AlternateMediaForm, bases)
 
+    def test_get_media_form_cached(self):
+        Form = get_media_form(models.Media)
+        self.assertIs(get_media_form(models.Media), Form)
+
+        # and rebuilt when the settings change
+        with override_settings(
+            WAGTAILMEDIA={"MEDIA_FORM_BASE": "wagtailmedia.forms.BaseMediaForm"}
+        ):
+            self.assertIsNot(get_media_form(models.Media), Form)
+        self.assertIsNot(get_media_form(models.Media), Form)
+
+        clear_media_form_cache()
+        self.assertIsNot(get_media_form(models.Media), Form)
+
     def test_get_media_form_widgets(self):
         Form = get_media_form(models.Media)
         form = Form()
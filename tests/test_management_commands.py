@@ -0,0 +1,152 @@
+import os
+import time
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+
+from wagtailmedia.models import MediaType, get_media_model
+from wagtailmedia.settings import wagtailmedia_settings
+from wagtailmedia.uploads import ChunkedUpload
+
+from .test_probe import build_mp4, build_wav
+from .utils import TempDirMediaRootMixin
+
+
+Media = get_media_model()
+
+
+class TestBackfillMetadata(TempDirMediaRootMixin, TestCase):
+    def setUp(self):
+        self.video = Media.objects.create(
+            title="Video",
+            type=MediaType.VIDEO,
+            duration=0,
+            file=ContentFile(build_mp4(duration=90), name="video.mp4"),
+        )
+        self.audio = Media.objects.create(
+            title="Audio",
+            type=MediaType.AUDIO,
+            duration=0,
+            file=ContentFile(build_wav(seconds=2), name="audio.wav"),
+        )
+        self.probed = Media.objects.create(
+            title="Already probed",
+            type=MediaType.AUDIO,
+            duration=5,
+            file=ContentFile(build_wav(seconds=2), name="probed.wav"),
+        )
+        self.unsupported = Media.objects.create(
+            title="Unsupported",
+            type=MediaType.AUDIO,
+            duration=0,
+            file=ContentFile(b"not audio", name="unsupported.mp3"),
+        )
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        call_command("wagtailmedia_backfill_metadata", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_backfill(self):
+        with self.assertNumQueries(3):
+            # fetch the batch, update it, then fetch the (empty) next batch
+            output = self.call_command("--batch-size=10")
+
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.duration, 90)
+        self.assertEqual(self.video.width, 1280)
+        self.assertEqual(self.video.height, 720)
+
+        self.audio.refresh_from_db()
+        self.assertEqual(self.audio.duration, 2)
+
+        self.probed.refresh_from_db()
+        self.assertEqual(self.probed.duration, 5)
+
+        self.unsupported.refresh_from_db()
+        self.assertEqual(self.unsupported.duration, 0)
+
+        self.assertIn("Updated 2 of 3 media items", output)
+        self.assertIn("files/s", output)
+        self.assertIn("bytes read", output)
+
+    def test_all(self):
+        self.call_command("--all")
+
+        self.probed.refresh_from_db()
+        self.assertEqual(self.probed.duration, 2)
+
+    def test_batches_and_resume(self):
+        output = self.call_command("--batch-size=1", "--workers=1")
+        self.assertIn(f"resume with --start-after={self.video.pk}", output)
+        self.assertIn(f"resume with --start-after={self.unsupported.pk}", output)
+
+        Media.objects.update(duration=0)
+        self.call_command(f"--start-after={self.video.pk}")
+
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.duration, 0)
+        self.audio.refresh_from_db()
+        self.assertEqual(self.audio.duration, 2)
+
+    def test_file_info(self):
+        Media.objects.update(file_size=None, mime_type="")
+
+        output = self.call_command()
+
+        self.probed.refresh_from_db()
+        self.assertEqual(self.probed.file_size, self.probed.file.size)
+        self.assertEqual(self.probed.mime_type, self.probed.guess_mime_type())
+        # the duration entered for it is kept
+        self.assertEqual(self.probed.duration, 5)
+        self.unsupported.refresh_from_db()
+        self.assertEqual(self.unsupported.file_size, len(b"not audio"))
+        self.assertEqual(self.unsupported.mime_type, "audio/mpeg")
+        self.assertIn("Updated 4 of 4 media items", output)
+
+    def test_missing_file(self):
+        self.video.file.storage.delete(self.video.file.name)
+
+        output = self.call_command()
+
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.duration, 0)
+        self.assertIn("Updated 1 of 3 media items", output)
+
+
+class TestPurgeUploads(TempDirMediaRootMixin, TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="user")
+        self.expired = ChunkedUpload.start("expired.mp3", 20, "audio", user)
+        self.expired.save_part(0, ContentFile(b"0" * 10))
+        self.expired.save_part(1, ContentFile(b"1" * 10))
+        self.active = ChunkedUpload.start("active.mp3", 20, "audio", user)
+        self.active.save_part(0, ContentFile(b"0" * 10))
+
+        # the expired upload was sent longer ago than uploads can take
+        expired_time = time.time() - wagtailmedia_settings.CHUNKED_UPLOAD_MAX_AGE - 60
+        for number in range(2):
+            os.utime(
+                self.expired.storage.path(self.expired.get_part_name(number)),
+                (expired_time, expired_time),
+            )
+
+    def test_purge(self):
+        stdout = StringIO()
+        call_command("wagtailmedia_purge_uploads", stdout=stdout)
+        self.assertIn("Removed 2 expired upload parts", stdout.getvalue())
+
+        self.assertEqual(self.expired.list_parts(), [])
+        self.assertFalse(self.expired.storage.exists(self.expired.directory))
+        self.assertEqual(self.active.list_parts(), [(0, 10)])
+
+    def test_nothing_to_purge(self):
+        self.active.delete()
+        self.expired.delete()
+        stdout = StringIO()
+        call_command("wagtailmedia_purge_uploads", stdout=stdout)
+        self.assertIn("Removed 0 expired upload parts", stdout.getvalue())
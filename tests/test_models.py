@@ -1,12 +1,17 @@
+import hashlib
+
 from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.core.files.base import ContentFile
 from django.db import transaction
 from django.template import Context, Template
 from django.test import TestCase, override_settings
+from testapp.models import CustomMedia
 
 from wagtailmedia.forms import get_media_form
-from wagtailmedia.models import get_media_model
+from wagtailmedia.models import MediaRendition, get_media_model, prefetch_renditions
+
+from .utils import TempDirMediaRootMixin
 
 
 Media = get_media_model()
@@ -195,6 +200,13 @@ class TestAbstractMediaInterfaceModel(TestCase):
             ],
         )
 
+    def test_sources_use_recorded_mime_type(self):
+        media = Media(
+            file=File(ContentFile("A boring example movie", name="movie.mp4")),
+            mime_type="video/webm",
+        )
+        self.assertEqual(media.sources[0]["type"], "video/webm")
+
     def test_thumbnail_filename(self):
         media = Media(
             file=File(ContentFile("A boring example movie", name="movie.mp4")),
@@ -205,6 +217,114 @@ class TestAbstractMediaInterfaceModel(TestCase):
         self.assertEqual(media.thumbnail_filename, "thumbnail.jpg")
 
 
+class TestMediaRenditions(TempDirMediaRootMixin, TestCase):
+    def setUp(self):
+        self.media_items = [
+            Media.objects.create(
+                title=f"Test video {i}",
+                type="video",
+                file=ContentFile("A boring example movie", name="movie.mov"),
+            )
+            for i in range(3)
+        ]
+
+    def test_sources(self):
+        media = self.media_items[0]
+        rendition = media.renditions.create(
+            file=ContentFile("A boring example movie", name="movie.webm"), bitrate=800
+        )
+        media.renditions.create(
+            file=ContentFile("A boring example movie", name="movie.mp4"),
+            mime_type='video/mp4; codecs="avc1.42E01E"',
+        )
+        self.assertEqual(rendition.mime_type, "video/webm")
+
+        self.assertEqual(
+            [source["type"] for source in media.sources],
+            ["video/quicktime", "video/webm", 'video/mp4; codecs="avc1.42E01E"'],
+        )
+        self.assertEqual(media.sources[1]["src"], rendition.file.url)
+
+    def test_prefetch_renditions(self):
+        for media in self.media_items:
+            media.renditions.create(
+                file=ContentFile("A boring example movie", name="movie.webm")
+            )
+
+        with self.assertNumQueries(2):
+            media_items = list(Media.objects.prefetch_renditions())
+            for media in media_items:
+                self.assertEqual(len(media.sources), 2)
+
+        media_items = [Media.objects.get(pk=media.pk) for media in self.media_items]
+        with self.assertNumQueries(1):
+            prefetch_renditions([*media_items, None])
+        with self.assertNumQueries(0):
+            for media in media_items:
+                self.assertEqual(len(media.sources), 2)
+
+    def test_renditions_deleted_with_media(self):
+        media = self.media_items[0]
+        rendition = media.renditions.create(
+            file=ContentFile("A boring example movie", name="movie.webm")
+        )
+        storage, name = rendition.file.storage, rendition.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            media.delete()
+        self.assertFalse(MediaRendition.objects.filter(pk=rendition.pk).exists())
+        self.assertFalse(storage.exists(name))
+
+    def test_media_model_without_renditions(self):
+        media = CustomMedia.objects.create(
+            title="Test video",
+            type="video",
+            file=ContentFile("A boring example movie", name="movie.mp4"),
+        )
+        self.assertIsNone(CustomMedia.get_rendition_model())
+        self.assertEqual(len(media.sources), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(CustomMedia.objects.prefetch_renditions()), 1)
+
+
+class TestMediaFileInfo(TempDirMediaRootMixin, TestCase):
+    def test_recorded_on_upload(self):
+        media = Media.objects.create(
+            title="Test media",
+            type="audio",
+            file=ContentFile(b"A boring example song", name="song.mp3"),
+        )
+        self.assertEqual(media.file_size, 21)
+        self.assertEqual(media.mime_type, "audio/mpeg")
+
+        media.refresh_from_db()
+        with self.assertNumQueries(0):
+            self.assertEqual(media.get_file_size(), 21)
+
+    def test_get_file_size_of_older_media(self):
+        media = Media.objects.create(
+            title="Test media",
+            type="audio",
+            file=ContentFile(b"A boring example song", name="song.mp3"),
+        )
+        Media.objects.filter(pk=media.pk).update(file_size=None)
+        media.refresh_from_db()
+
+        # the size is recorded without saving the media item
+        with (
+            self.assertNumQueries(1),
+            self.captureOnCommitCallbacks() as callbacks,
+        ):
+            self.assertEqual(media.get_file_size(), 21)
+        self.assertEqual(callbacks, [])
+        media.refresh_from_db()
+        self.assertEqual(media.file_size, 21)
+
+        media.file.storage.delete(media.file.name)
+        media.file_size = None
+        self.assertIsNone(media.get_file_size())
+
+
 class TestMediaFilenameProperties(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -254,6 +374,53 @@ class TestMediaFilesDeletion(TestCase):
         self.assertFalse(media.file.storage.exists(filename))
 
 
+class TestMediaFileHash(TestCase):
+    def test_get_file_hash(self):
+        media = Media.objects.create(
+            title="Test media",
+            file=ContentFile("A boring example movie", name="movie.mp4"),
+            duration=1,
+        )
+        expected = hashlib.sha256(b"A boring example movie").hexdigest()
+        self.assertEqual(media.file_hash, expected)
+
+        # media items saved before file hashes were recorded
+        Media.objects.filter(pk=media.pk).update(file_hash="")
+        media.refresh_from_db()
+        with (
+            self.assertNumQueries(1),
+            self.captureOnCommitCallbacks() as callbacks,
+        ):
+            self.assertEqual(media.get_file_hash(), expected)
+        self.assertEqual(callbacks, [])
+
+        media.refresh_from_db()
+        self.assertEqual(media.file_hash, expected)
+
+    def test_file_hash_replaced_with_file(self):
+        media = Media.objects.create(
+            title="Test media",
+            file=ContentFile(b"content A", name="movie.mp4"),
+            duration=1,
+        )
+        media.file = ContentFile(b"content B", name="movie.mp4")
+        media.save()
+
+        media.refresh_from_db()
+        self.assertEqual(media.file_hash, hashlib.sha256(b"content B").hexdigest())
+
+    def test_is_file_shared(self):
+        media = Media.objects.create(
+            title="Test media",
+            file=ContentFile("A boring example movie", name="movie.mp4"),
+            duration=1,
+        )
+        self.assertFalse(media.is_file_shared())
+
+        Media.objects.create(title="Copy", file=media.file.name, duration=1)
+        self.assertTrue(media.is_file_shared())
+
+
 @override_settings(WAGTAILMEDIA={"MEDIA_MODEL": "wagtailmedia_tests.CustomMedia"})
 class TestMediaModel(TestCase):
     def test_media_model(self):
@@ -7,6 +7,7 @@ from wagtail.models import Collection, GroupCollectionPermission
 from wagtail.test.utils import WagtailTestUtils
 
 from wagtailmedia import models
+from wagtailmedia.permissions import permission_policy
 
 
 class TestMediaPermissions(TestCase):
@@ -56,6 +57,31 @@ class TestMediaPermissions(TestCase):
     def test_user_cant_edit(self):
         self.assertFalse(self.media.is_editable_by_user(self.user))
 
+    def test_collections_cached_on_user(self):
+        collections = permission_policy.collections_user_has_permission_for(
+            self.owner, "add"
+        )
+        self.assertEqual(list(collections), [Collection.get_first_root_node()])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                len(
+                    permission_policy.collections_user_has_permission_for(
+                        self.owner, "add"
+                    )
+                ),
+                1,
+            )
+
+        # the cache lives on the user object, which is loaded again for each request
+        owner = get_user_model().objects.get(pk=self.owner.pk)
+        self.assertFalse(hasattr(owner, permission_policy.collections_cache_name))
+        self.assertFalse(
+            permission_policy.collections_user_has_any_permission_for(
+                self.user, ["change"]
+            ).exists()
+        )
+
 
 class TestEditOnlyPermissions(TestCase, WagtailTestUtils):
     @classmethod
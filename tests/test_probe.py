@@ -0,0 +1,330 @@
+import io
+import struct
+import wave
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from wagtail.test.utils import WagtailTestUtils
+
+from wagtailmedia.models import get_media_model
+from wagtailmedia.probe import MediaMetadata, probe
+
+from .utils import TempDirMediaRootMixin
+
+
+Media = get_media_model()
+
+
+class CountingBytesIO(io.BytesIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def build_mp4(duration=90, timescale=1000, width=1280, height=720, mdat_size=0):
+    mvhd = box(
+        b"mvhd",
+        struct.pack(">B3xIIII", 0, 0, 0, timescale, duration * timescale) + bytes(80),
+    )
+
+    def trak(width, height):
+        tkhd = box(
+            b"tkhd",
+            struct.pack(">B3xIIIII", 0, 0, 0, 1, 0, 0)
+            + bytes(52)
+            + struct.pack(">II", width << 16, height << 16),
+        )
+        return box(b"trak", tkhd)
+
+    moov = box(b"moov", mvhd + trak(0, 0) + trak(width, height))
+    ftyp = box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2mp41")
+    mdat = box(b"mdat", bytes(mdat_size))
+    # most files written without "faststart" have their moov box after the media data
+    return ftyp + mdat + moov
+
+
+def ebml_element(element_id: int, payload: bytes, unknown_size=False) -> bytes:
+    element_id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    if unknown_size:
+        size = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+    else:
+        size = (len(payload) | (1 << 56)).to_bytes(8, "big")
+    return element_id_bytes + size + payload
+
+
+def ebml_uint(element_id: int, value: int) -> bytes:
+    return ebml_element(element_id, value.to_bytes(4, "big"))
+
+
+def build_matroska(
+    duration_ms=12500.0, width=640, height=360, info_after_cluster=False
+):
+    info = ebml_element(
+        0x1549A966,
+        ebml_uint(0x2AD7B1, 1_000_000)
+        + ebml_element(0x4489, struct.pack(">d", duration_ms)),
+    )
+    audio_track = ebml_element(0xAE, ebml_uint(0x83, 2))
+    video_track = ebml_element(
+        0xAE,
+        ebml_uint(0x83, 1)
+        + ebml_element(0xE0, ebml_uint(0xB0, width) + ebml_uint(0xBA, height)),
+    )
+    tracks = ebml_element(0x1654AE6B, audio_track + video_track)
+    cluster = ebml_element(0x1F43B675, bytes(1000))
+
+    header = ebml_element(0x1A45DFA3, ebml_element(0x4282, b"webm"))
+    if not info_after_cluster:
+        return header + ebml_element(0x18538067, info + tracks + cluster)
+
+    def seek(element_id, position):
+        return ebml_element(
+            0x4DBB,
+            ebml_element(0x53AB, element_id.to_bytes(4, "big"))
+            + ebml_uint(0x53AC, position),
+        )
+
+    # the seek head size does not depend on the positions, as uints are 4 bytes long
+    seek_head_size = len(ebml_element(0x114D9B74, seek(0, 0) + seek(0, 0)))
+    info_position = seek_head_size + len(cluster)
+    tracks_position = info_position + len(info)
+    seek_head = ebml_element(
+        0x114D9B74,
+        seek(0x1549A966, info_position) + seek(0x1654AE6B, tracks_position),
+    )
+    return header + ebml_element(0x18538067, seek_head + cluster + info + tracks)
+
+
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"  # MPEG-1 layer III, 128 kbps, 44.1 kHz, stereo
+MP3_FRAME_LENGTH = 417
+
+
+def build_id3v2(size=100) -> bytes:
+    syncsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x04\x00\x00" + syncsafe + bytes(size)
+
+
+def build_cbr_mp3(frames=100) -> bytes:
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_LENGTH - 4)
+    return build_id3v2() + frame * frames
+
+
+def build_xing_mp3(frames=1000) -> bytes:
+    xing = b"Xing" + struct.pack(">II", 0x01, frames)
+    first_frame = MP3_FRAME_HEADER + bytes(32) + xing
+    first_frame += bytes(MP3_FRAME_LENGTH - len(first_frame))
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_LENGTH - 4)
+    return first_frame + frame * 10
+
+
+def build_wav(seconds=2, sample_rate=8000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(2 * sample_rate * seconds))
+    return buffer.getvalue()
+
+
+def extended_float(value: int) -> bytes:
+    exponent = value.bit_length() - 1
+    return struct.pack(">HQ", 16383 + exponent, value << (63 - exponent))
+
+
+def build_aiff(frames=22050, sample_rate=44100) -> bytes:
+    comm = struct.pack(">HIH", 2, frames, 16) + extended_float(sample_rate)
+    chunk = b"COMM" + struct.pack(">I", len(comm)) + comm
+    return b"FORM" + struct.pack(">I", 4 + len(chunk)) + b"AIFF" + chunk
+
+
+def build_flac(total_samples=441000, sample_rate=44100) -> bytes:
+    packed = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = bytes(10) + packed.to_bytes(8, "big") + bytes(16)
+    return b"fLaC" + b"\x80" + len(streaminfo).to_bytes(3, "big") + streaminfo
+
+
+def ogg_page(packet: bytes, granule: int, serial=1, bos=False) -> bytes:
+    header = struct.pack("<4sBBqII", b"OggS", 0, 0x02 if bos else 0, granule, serial, 0)
+    return header + bytes(4) + bytes([1, len(packet)]) + packet
+
+
+def build_ogg_vorbis(samples=96000, sample_rate=48000) -> bytes:
+    identification = b"\x01vorbis" + struct.pack("<IBI", 0, 2, sample_rate) + bytes(13)
+    return ogg_page(identification, 0, bos=True) + ogg_page(bytes(200), samples)
+
+
+def build_avi(frames=250, microseconds_per_frame=40000, width=320, height=240):
+    avih = struct.pack(
+        "<10I", microseconds_per_frame, 0, 0, 0, frames, 0, 1, 0, width, height
+    ) + bytes(16)
+    avih_chunk = b"avih" + struct.pack("<I", len(avih)) + avih
+    hdrl = b"LIST" + struct.pack("<I", 4 + len(avih_chunk)) + b"hdrl" + avih_chunk
+    return b"RIFF" + struct.pack("<I", 4 + len(hdrl)) + b"AVI " + hdrl
+
+
+class TestProbe(TestCase):
+    def test_mp4(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_mp4(duration=90, width=1280, height=720))),
+            MediaMetadata(duration=90, width=1280, height=720),
+        )
+
+    def test_mp4_reads_headers_only(self):
+        f = CountingBytesIO(build_mp4(mdat_size=8 * 1024 * 1024))
+
+        self.assertEqual(probe(f).duration, 90)
+        self.assertLess(f.bytes_read, 1024)
+
+    def test_matroska(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_matroska(duration_ms=12500.0))),
+            MediaMetadata(duration=12.5, width=640, height=360),
+        )
+
+    def test_matroska_with_info_after_clusters(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_matroska(info_after_cluster=True))),
+            MediaMetadata(duration=12.5, width=640, height=360),
+        )
+
+    def test_cbr_mp3(self):
+        metadata = probe(io.BytesIO(build_cbr_mp3(frames=100)))
+        self.assertAlmostEqual(metadata.duration, 100 * MP3_FRAME_LENGTH * 8 / 128000)
+        self.assertIsNone(metadata.width)
+
+    def test_xing_mp3(self):
+        metadata = probe(io.BytesIO(build_xing_mp3(frames=1000)))
+        self.assertAlmostEqual(metadata.duration, 1000 * 1152 / 44100)
+
+    def test_wav(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_wav(seconds=2))), MediaMetadata(duration=2)
+        )
+
+    def test_aiff(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_aiff(frames=22050, sample_rate=44100))),
+            MediaMetadata(duration=0.5),
+        )
+
+    def test_flac(self):
+        self.assertEqual(probe(io.BytesIO(build_flac())), MediaMetadata(duration=10))
+
+    def test_flac_with_id3v2(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_id3v2() + build_flac())), MediaMetadata(duration=10)
+        )
+
+    def test_ogg_vorbis(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_ogg_vorbis(samples=96000, sample_rate=48000))),
+            MediaMetadata(duration=2),
+        )
+
+    def test_avi(self):
+        self.assertEqual(
+            probe(io.BytesIO(build_avi())),
+            MediaMetadata(duration=10, width=320, height=240),
+        )
+
+    def test_aiff_with_invalid_sample_rate(self):
+        content = build_aiff()
+        # the sample rate is the last 10 bytes, starting with its exponent
+        content = content[:-10] + struct.pack(">H", 0x7FFF) + content[-8:]
+        self.assertIsNone(probe(io.BytesIO(content)))
+
+    def test_matroska_with_invalid_uint_size(self):
+        info = ebml_element(0x1549A966, ebml_element(0x2AD7B1, bytes(1024 * 1024)))
+        header = ebml_element(0x1A45DFA3, ebml_element(0x4282, b"webm"))
+        f = CountingBytesIO(header + ebml_element(0x18538067, info))
+
+        self.assertIsNone(probe(f))
+        self.assertLess(f.bytes_read, 1024)
+
+    def test_unsupported_or_invalid_files(self):
+        for content in (b"", b"A boring example movie", build_mp4()[:40], b"fLaC"):
+            with self.subTest(content=content):
+                self.assertIsNone(probe(io.BytesIO(content)))
+
+    def test_file_position_is_preserved(self):
+        f = io.BytesIO(build_mp4())
+        f.seek(10)
+        probe(f)
+        self.assertEqual(f.tell(), 10)
+
+
+class TestMediaFormProbing(TempDirMediaRootMixin, TestCase, WagtailTestUtils):
+    def setUp(self):
+        self.login()
+
+    def test_add_fills_metadata(self):
+        response = self.client.post(
+            reverse("wagtailmedia:add", args=("video",)),
+            {
+                "title": "Test video",
+                "file": SimpleUploadedFile("movie.mp4", build_mp4(duration=90)),
+            },
+        )
+        self.assertRedirects(response, reverse("wagtailmedia:index"))
+
+        media = Media.objects.get(title="Test video")
+        self.assertEqual(media.duration, 90)
+        self.assertEqual(media.width, 1280)
+        self.assertEqual(media.height, 720)
+
+    def test_add_keeps_entered_metadata(self):
+        response = self.client.post(
+            reverse("wagtailmedia:add", args=("video",)),
+            {
+                "title": "Test video",
+                "file": SimpleUploadedFile("movie.mp4", build_mp4(duration=90)),
+                "duration": 42,
+            },
+        )
+        self.assertRedirects(response, reverse("wagtailmedia:index"))
+
+        media = Media.objects.get(title="Test video")
+        self.assertEqual(media.duration, 42)
+        self.assertEqual(media.width, 1280)
+
+    def test_edit_with_new_file_updates_metadata(self):
+        media = Media.objects.create(
+            title="Test audio",
+            type="audio",
+            duration=1,
+            file=ContentFile(build_wav(seconds=1), name="audio.wav"),
+        )
+
+        response = self.client.post(
+            reverse("wagtailmedia:edit", args=(media.id,)),
+            {
+                "title": "Test audio",
+                "file": SimpleUploadedFile("audio.wav", build_wav(seconds=3)),
+                "duration": 1,
+            },
+        )
+        self.assertRedirects(response, reverse("wagtailmedia:index"))
+
+        media.refresh_from_db()
+        self.assertEqual(media.duration, 3)
+
+    def test_stored_file_is_complete(self):
+        content = build_wav(seconds=1)
+        self.client.post(
+            reverse("wagtailmedia:add", args=("audio",)),
+            {"title": "Test audio", "file": SimpleUploadedFile("audio.wav", content)},
+        )
+
+        media = Media.objects.get(title="Test audio")
+        with media.file.open("rb") as f:
+            self.assertEqual(f.read(), content)
@@ -0,0 +1,115 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import translation
+
+from wagtailmedia import render_cache
+from wagtailmedia.blocks import AudioChooserBlock
+from wagtailmedia.models import get_media_model
+from wagtailmedia.utils import format_audio_html
+
+from .utils import TempDirMediaRootMixin
+
+
+Media = get_media_model()
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    WAGTAILMEDIA={"RENDER_CACHE": True},
+)
+class TestRenderCache(TempDirMediaRootMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.audio = Media.objects.create(
+            title="Test audio",
+            type="audio",
+            file=ContentFile("Test", name="test.mp3"),
+        )
+        self.block = AudioChooserBlock()
+
+    def render_counting(self, item):
+        with mock.patch(
+            "wagtailmedia.blocks.format_audio_html", wraps=format_audio_html
+        ) as render_func:
+            html = self.block.render(item)
+        return html, render_func.call_count
+
+    def test_cached(self):
+        html, calls = self.render_counting(self.audio)
+        self.assertEqual(calls, 1)
+        self.assertIn("<audio controls>", html)
+
+        with self.assertNumQueries(0):
+            cached_html, calls = self.render_counting(self.audio)
+        self.assertEqual(calls, 0)
+        self.assertEqual(cached_html, html)
+        self.assertTrue(hasattr(cached_html, "__html__"))
+
+    def test_cleared_on_save(self):
+        self.render_counting(self.audio)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.audio.title = "Changed"
+            self.audio.save()
+        self.assertEqual(self.render_counting(self.audio)[1], 1)
+
+        # adding a rendition changes the sources
+        with self.captureOnCommitCallbacks(execute=True):
+            self.audio.renditions.create(file=ContentFile("Test", name="test.ogg"))
+        html, calls = self.render_counting(self.audio)
+        self.assertEqual(calls, 1)
+        self.assertIn('type="audio/ogg"', html)
+
+    def test_other_media_not_cleared(self):
+        other = Media.objects.create(
+            title="Other audio", type="audio", file=ContentFile("Test", name="a.mp3")
+        )
+        self.render_counting(self.audio)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        self.assertEqual(self.render_counting(self.audio)[1], 0)
+
+    def test_keyed_on_language(self):
+        self.render_counting(self.audio)
+        with translation.override("fr"):
+            self.assertEqual(self.render_counting(self.audio)[1], 1)
+
+    def test_render_many(self):
+        other = Media.objects.create(
+            title="Other audio", type="audio", file=ContentFile("Test", name="a.mp3")
+        )
+        render_cache.render(self.audio, "audio", format_audio_html)
+
+        render_func = mock.Mock(wraps=format_audio_html)
+        html = render_cache.render_many(
+            [self.audio, other, other], "audio", render_func
+        )
+        self.assertEqual(render_func.call_count, 1)
+        self.assertEqual(html[1], html[2])
+        self.assertNotEqual(html[0], html[1])
+
+    @override_settings(
+        STORAGES={
+            "default": {
+                "BACKEND": "wagtail.test.dummy_external_storage.DummyExternalStorage",
+            },
+        }
+    )
+    def test_disabled_with_storage_urls(self):
+        self.render_counting(self.audio)
+        self.assertEqual(self.render_counting(self.audio)[1], 1)
+
+        # the serve view URLs do not expire
+        with override_settings(
+            WAGTAILMEDIA={"RENDER_CACHE": True, "SERVE_METHOD": "serve_view"}
+        ):
+            self.render_counting(self.audio)
+            self.assertEqual(self.render_counting(self.audio)[1], 0)
+
+    @override_settings(WAGTAILMEDIA={"RENDER_CACHE": False})
+    def test_disabled(self):
+        self.render_counting(self.audio)
+        self.assertEqual(self.render_counting(self.audio)[1], 1)
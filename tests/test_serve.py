@@ -0,0 +1,447 @@
+import os
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from wagtail.models import Collection, CollectionViewRestriction
+
+from wagtailmedia.models import get_media_model, media_served
+from wagtailmedia.views.serve import parse_range_header
+
+from .utils import TempDirMediaRootMixin
+
+
+Media = get_media_model()
+
+CONTENT = b"0123456789" * 10
+
+
+class ServeTestCase(TempDirMediaRootMixin, TestCase):
+    def get(self, url, headers=None):
+        response = self.client.get(url, headers=headers)
+        # streamed responses keep the file open until closed
+        self.addCleanup(response.close)
+        return response
+
+
+class TestParseRangeHeader(TestCase):
+    def test_no_header(self):
+        self.assertIsNone(parse_range_header(None, 100))
+        self.assertIsNone(parse_range_header("", 100))
+
+    def test_ignored_headers(self):
+        for header in ("bytes=", "bytes=-", "items=0-10", "bytes=0-10,20-30"):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range_header(header, 100))
+
+    def test_ranges(self):
+        for header, expected in (
+            ("bytes=0-9", (0, 9)),
+            ("bytes=10-", (10, 99)),
+            ("bytes=90-200", (90, 99)),
+            ("bytes=-10", (90, 99)),
+            ("bytes=-500", (0, 99)),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(parse_range_header(header, 100), expected)
+
+    def test_unsatisfiable_ranges(self):
+        for header in ("bytes=100-", "bytes=20-10", "bytes=-0"):
+            with self.subTest(header=header), self.assertRaises(ValueError):
+                parse_range_header(header, 100)
+
+
+class TestServeView(ServeTestCase):
+    def setUp(self):
+        self.media = Media.objects.create(
+            title="Test video",
+            type="video",
+            file=ContentFile(CONTENT, name="video.mp4"),
+        )
+        self.url = reverse(
+            "wagtailmedia_serve", args=(self.media.id, self.media.filename)
+        )
+
+        self.served = []
+        media_served.connect(self.on_media_served)
+
+    def tearDown(self):
+        media_served.disconnect(self.on_media_served)
+
+    def on_media_served(self, sender, instance, request, **kwargs):
+        self.served.append(instance)
+
+    def test_serve(self):
+        response = self.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(
+            response["Content-Disposition"], f'inline; filename="{self.media.filename}"'
+        )
+        self.assertEqual(self.served, [self.media])
+
+    def test_serve_range(self):
+        response = self.get(self.url, headers={"range": "bytes=10-19"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+
+    def test_serve_open_ended_range(self):
+        response = self.get(self.url, headers={"range": "bytes=95-"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[95:])
+        self.assertEqual(response["Content-Range"], f"bytes 95-99/{len(CONTENT)}")
+
+    def test_serve_unsatisfiable_range(self):
+        response = self.get(self.url, headers={"range": "bytes=1000-"})
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+        self.assertEqual(self.served, [])
+
+    def test_media_served_sent_once_per_playback(self):
+        for header in ("bytes=0-", "bytes=50-59", "bytes=60-"):
+            response = self.get(self.url, headers={"range": header})
+            self.assertEqual(response.status_code, 206)
+
+        self.assertEqual(self.served, [self.media])
+
+    @override_settings(WAGTAILMEDIA={"SERVE_CHUNK_SIZE": 16})
+    def test_serve_chunk_size(self):
+        response = self.get(self.url)
+
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks[0]), 16)
+        self.assertEqual(b"".join(chunks), CONTENT)
+
+    def test_filename_mismatch(self):
+        response = self.get(
+            reverse("wagtailmedia_serve", args=(self.media.id, "other.mp4"))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_media(self):
+        response = self.get(
+            reverse("wagtailmedia_serve", args=(self.media.id + 1, "video.mp4"))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_file(self):
+        self.media.file.storage.delete(self.media.file.name)
+
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+
+class TestServeMethods(ServeTestCase):
+    def setUp(self):
+        self.media = Media.objects.create(
+            title="Test audio",
+            type="audio",
+            file=ContentFile(CONTENT, name="audio.mp3"),
+        )
+        self.url = reverse(
+            "wagtailmedia_serve", args=(self.media.id, self.media.filename)
+        )
+
+    def test_url_with_direct_serve_method(self):
+        self.assertEqual(self.media.url, self.media.file.url)
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "serve_view"})
+    def test_url_with_serve_view_serve_method(self):
+        self.assertEqual(self.media.url, self.url)
+        self.assertEqual(self.media.sources, [{"src": self.url, "type": "audio/mpeg"}])
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "x_accel_redirect"})
+    def test_x_accel_redirect(self):
+        response = self.get(self.url, headers={"range": "bytes=10-"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{self.media.file.name}"
+        )
+        self.assertEqual(response["Content-Type"], "audio/mpeg")
+        self.assertNotIn("X-Sendfile", response)
+
+    @override_settings(
+        WAGTAILMEDIA={
+            "SERVE_METHOD": "x_accel_redirect",
+            "X_ACCEL_REDIRECT_PREFIX": "/internal/",
+        }
+    )
+    def test_x_accel_redirect_prefix(self):
+        response = self.get(self.url)
+
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/internal/{self.media.file.name}"
+        )
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "x_sendfile"})
+    def test_x_sendfile(self):
+        response = self.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["X-Sendfile"], self.media.file.path)
+        self.assertTrue(os.path.isabs(response["X-Sendfile"]))
+
+
+class TestServeViewRestrictions(ServeTestCase):
+    def setUp(self):
+        root_collection = Collection.get_first_root_node()
+        self.collection = root_collection.add_child(name="Restricted")
+        self.media = Media.objects.create(
+            title="Test video",
+            type="video",
+            collection=self.collection,
+            file=ContentFile(CONTENT, name="video.mp4"),
+        )
+        self.url = reverse(
+            "wagtailmedia_serve", args=(self.media.id, self.media.filename)
+        )
+
+    def test_login_restriction(self):
+        CollectionViewRestriction.objects.create(
+            collection=self.collection,
+            restriction_type=CollectionViewRestriction.LOGIN,
+        )
+
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("wagtailcore_login"), response.url)
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "x_accel_redirect"})
+    def test_login_restriction_is_checked_before_offloading(self):
+        CollectionViewRestriction.objects.create(
+            collection=self.collection,
+            restriction_type=CollectionViewRestriction.LOGIN,
+        )
+
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn("X-Accel-Redirect", response)
+
+    def test_password_restriction(self):
+        restriction = CollectionViewRestriction.objects.create(
+            collection=self.collection,
+            restriction_type=CollectionViewRestriction.PASSWORD,
+            password="swordfish",
+        )
+
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "wagtailmedia/password_required.html")
+
+        response = self.client.post(
+            reverse("wagtailmedia_authenticate_with_password", args=(restriction.id,)),
+            {"password": "swordfish", "return_url": self.url},
+        )
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+
+
+class TestServeConditionalRequests(ServeTestCase):
+    def setUp(self):
+        self.media = Media.objects.create(
+            title="Test video",
+            type="video",
+            file=ContentFile(CONTENT, name="video.mp4"),
+            thumbnail=ContentFile(b"thumbnail", name="thumbnail.jpg"),
+        )
+        self.url = reverse(
+            "wagtailmedia_serve", args=(self.media.id, self.media.filename)
+        )
+        self.thumbnail_url = reverse(
+            "wagtailmedia_serve_thumbnail",
+            args=(self.media.id, self.media.thumbnail_filename),
+        )
+
+    def test_validator_headers(self):
+        for url in (self.url, self.thumbnail_url):
+            with self.subTest(url=url):
+                response = self.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response["ETag"].startswith('"'))
+                self.assertIn("Last-Modified", response)
+
+    def test_etag_uses_file_hash(self):
+        self.media.get_file_hash()
+
+        response = self.get(self.url)
+        self.assertEqual(response["ETag"], f'"{self.media.file_hash}"')
+
+    def test_if_none_match(self):
+        for url in (self.url, self.thumbnail_url):
+            with self.subTest(url=url):
+                response = self.get(url)
+                etag = response["ETag"]
+
+                response = self.get(url, headers={"if-none-match": etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+
+                response = self.get(url, headers={"if-none-match": '"other"'})
+                self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        response = self.get(self.url)
+        last_modified = response["Last-Modified"]
+
+        response = self.get(self.url, headers={"if-modified-since": last_modified})
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "x_accel_redirect"})
+    def test_if_none_match_with_offloading(self):
+        etag = self.get(self.url)["ETag"]
+
+        response = self.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn("X-Accel-Redirect", response)
+
+    def test_not_modified_does_not_send_media_served(self):
+        served = []
+
+        def on_media_served(sender, instance, **kwargs):
+            served.append(instance)
+
+        etag = self.get(self.url)["ETag"]
+        media_served.connect(on_media_served)
+        try:
+            self.get(self.url, headers={"if-none-match": etag})
+        finally:
+            media_served.disconnect(on_media_served)
+
+        self.assertEqual(served, [])
+
+    def test_etag_changes_with_file(self):
+        etag = self.get(self.url)["ETag"]
+
+        self.media.file = ContentFile(b"new content", name="video.mp4")
+        self.media.save()
+
+        url = reverse("wagtailmedia_serve", args=(self.media.id, self.media.filename))
+        self.assertNotEqual(self.get(url)["ETag"], etag)
+
+    def test_etag_changes_with_file_without_hash(self):
+        # media items saved before file hashes were recorded
+        Media.objects.filter(pk=self.media.pk).update(file_hash="")
+        etag = self.get(self.url)["ETag"]
+
+        name = self.media.file.name
+        self.media.file.storage.delete(name)
+        self.media.file.storage.save(name, ContentFile(b"new content"))
+
+        self.assertNotEqual(self.get(self.url)["ETag"], etag)
+
+    def test_if_range(self):
+        response = self.get(self.url)
+        etag = response["ETag"]
+
+        response = self.get(
+            self.url, headers={"range": "bytes=10-19", "if-range": etag}
+        )
+        self.assertEqual(response.status_code, 206)
+
+        # a stale validator gets the whole, current file
+        response = self.get(
+            self.url, headers={"range": "bytes=10-19", "if-range": '"stale"'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+
+    def test_thumbnail(self):
+        response = self.get(self.thumbnail_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"thumbnail")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+
+    def test_thumbnail_filename_mismatch(self):
+        response = self.get(
+            reverse("wagtailmedia_serve_thumbnail", args=(self.media.id, "other.jpg"))
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TestServeRendition(ServeTestCase):
+    def setUp(self):
+        root_collection = Collection.get_first_root_node()
+        self.collection = root_collection.add_child(name="Restricted")
+        self.media = Media.objects.create(
+            title="Test video",
+            type="video",
+            collection=self.collection,
+            file=ContentFile(CONTENT, name="video.mov"),
+        )
+        self.rendition = self.media.renditions.create(
+            file=ContentFile(CONTENT[:50], name="video.webm")
+        )
+        self.url = reverse(
+            "wagtailmedia_serve_rendition",
+            args=(self.media.id, self.rendition.id, self.rendition.filename),
+        )
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "serve_view"})
+    def test_url_with_serve_view_serve_method(self):
+        self.assertEqual(self.rendition.url, self.url)
+        self.assertEqual(self.media.sources[1], {"src": self.url, "type": "video/webm"})
+
+    def test_serve_range(self):
+        response = self.get(self.url, headers={"range": "bytes=10-19"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(response["Content-Type"], "video/webm")
+        self.assertEqual(response["Content-Range"], "bytes 10-19/50")
+        self.assertIn("ETag", response)
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "x_accel_redirect"})
+    def test_x_accel_redirect(self):
+        response = self.get(self.url)
+
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{self.rendition.file.name}"
+        )
+        self.assertEqual(response["Content-Type"], "video/webm")
+
+    def test_filename_mismatch(self):
+        response = self.get(
+            reverse(
+                "wagtailmedia_serve_rendition",
+                args=(self.media.id, self.rendition.id, "other.webm"),
+            )
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_rendition_of_other_media(self):
+        other = Media.objects.create(
+            title="Other video", type="video", file=ContentFile(CONTENT, name="a.mp4")
+        )
+        response = self.get(
+            reverse(
+                "wagtailmedia_serve_rendition",
+                args=(other.id, self.rendition.id, self.rendition.filename),
+            )
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_login_restriction(self):
+        CollectionViewRestriction.objects.create(
+            collection=self.collection,
+            restriction_type=CollectionViewRestriction.LOGIN,
+        )
+
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("wagtailcore_login"), response.url)
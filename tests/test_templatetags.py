@@ -0,0 +1,150 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from wagtailmedia.models import get_media_model, prefetch_renditions
+
+from .utils import TempDirMediaRootMixin
+
+
+Media = get_media_model()
+
+
+class TestMediaPlayerTags(TempDirMediaRootMixin, TestCase):
+    def setUp(self):
+        self.audio = Media.objects.create(
+            title="Test audio",
+            type="audio",
+            file=ContentFile("Test", name="test.mp3"),
+        )
+        self.video = Media.objects.create(
+            title="Test video",
+            type="video",
+            file=ContentFile("Test", name="test.mp4"),
+            thumbnail=ContentFile("Thumbnail", name="thumbnail.jpg"),
+        )
+
+    def render(self, template, **context):
+        return Template("{% load wagtailmedia_tags %}" + template).render(
+            Context(context)
+        )
+
+    def test_media_player(self):
+        html = self.render("{% media_player item %}", item=self.audio)
+        self.assertEqual(
+            html,
+            f'<audio controls>\n<source src="{self.audio.url}" type="audio/mpeg">\n'
+            f"<p>Your browser does not support the audio element.</p>\n</audio>",
+        )
+
+        html = self.render("{% media_player item %}", item=self.video)
+        self.assertTrue(
+            html.startswith(
+                f'<video poster="{self.video.thumbnail.url}" controls>\n'
+                f'<source src="{self.video.url}" type="video/mp4">'
+            )
+        )
+
+        self.assertEqual(self.render("{% media_player item %}", item=None), "")
+
+    def test_attributes(self):
+        html = self.render(
+            '{% media_player item preload="metadata" class="player" data_id=item.pk '
+            "controls=False %}",
+            item=self.audio,
+        )
+        opening_tag = html.split("\n")[0]
+        self.assertIn('preload="metadata"', opening_tag)
+        self.assertIn('class="player"', opening_tag)
+        self.assertIn(f'data-id="{self.audio.pk}"', opening_tag)
+        self.assertNotIn("controls", opening_tag)
+
+        html = self.render("{% video item lazy=True poster=False %}", item=self.video)
+        self.assertTrue(html.startswith('<video preload="none" controls>'))
+
+    @override_settings(WAGTAILMEDIA={"SERVE_METHOD": "serve_view"})
+    def test_poster_with_serve_view(self):
+        html = self.render("{% video item %}", item=self.video)
+        self.assertIn(f'poster="{self.video.thumbnail_url}"', html)
+        self.assertIn("/thumbnail/", self.video.thumbnail_url)
+
+    def test_typed_tags(self):
+        self.assertIn("<audio", self.render("{% audio item %}", item=self.audio))
+        self.assertEqual(self.render("{% audio item %}", item=self.video), "")
+        self.assertIn("<video", self.render("{% video item %}", item=self.video))
+        self.assertEqual(self.render("{% video item %}", item=self.audio), "")
+
+    def test_media_players(self):
+        self.audio.renditions.create(file=ContentFile("Test", name="test.ogg"))
+        items = [self.video.pk, self.audio.pk, 0, self.audio.pk]
+
+        # the media items, then their renditions
+        with self.assertNumQueries(2):
+            html = self.render("{% media_players items %}", items=items)
+        self.assertEqual(html.count("<video "), 1)
+        self.assertEqual(html.count("<audio controls>"), 2)
+        self.assertEqual(html.count('type="audio/ogg"'), 2)
+        self.assertLess(html.index("<video"), html.index("<audio"))
+
+        with self.assertNumQueries(2):
+            html = self.render(
+                "{% media_players items %}", items=Media.objects.order_by("pk")
+            )
+        self.assertEqual(html.count("<audio controls>"), 1)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        WAGTAILMEDIA={"RENDER_CACHE": True},
+    )
+    def test_media_players_cached(self):
+        cache.clear()
+        items = [self.video.pk, self.audio.pk]
+        html = self.render("{% media_players items lazy=True %}", items=items)
+
+        # the cached players are rendered without loading the renditions
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.render("{% media_players items lazy=True %}", items=items), html
+            )
+
+        # but not with other attributes
+        with self.assertNumQueries(2):
+            self.assertNotEqual(
+                self.render("{% media_players items %}", items=items), html
+            )
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        WAGTAILMEDIA={"RENDER_CACHE": True},
+    )
+    def test_media_players_renditions_loaded_once(self):
+        cache.clear()
+        items = [self.video, self.audio] + [
+            Media.objects.create(
+                title=f"Test audio {i}",
+                type="audio",
+                file=ContentFile("Test", name=f"test{i}.mp3"),
+            )
+            for i in range(3)
+        ]
+        self.render("{% media_players items %}", items=items[:1])
+
+        # the renditions of all the uncached players are loaded in one query
+        items = Media.objects.filter(pk__in=[item.pk for item in items])
+        with (
+            self.assertNumQueries(2),
+            mock.patch(
+                "wagtailmedia.templatetags.wagtailmedia_tags.prefetch_renditions",
+                wraps=prefetch_renditions,
+            ) as prefetch,
+        ):
+            html = self.render("{% media_players items %}", items=items)
+        prefetch.assert_called_once()
+        self.assertEqual(html.count("<audio controls>"), 4)
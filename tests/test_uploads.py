@@ -0,0 +1,230 @@
+import hashlib
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from wagtail.test.utils import WagtailTestUtils
+
+from wagtailmedia.models import get_media_model
+from wagtailmedia.uploads import ChunkedUpload
+
+from .test_probe import build_wav
+from .utils import TempDirMediaRootMixin
+
+
+Media = get_media_model()
+
+
+class TestChunkedUpload(TempDirMediaRootMixin, TestCase, WagtailTestUtils):
+    def setUp(self):
+        self.user = self.login()
+        self.content = build_wav(seconds=2)
+
+    def start(self, filename="song.wav", size=None, media_type="audio"):
+        return self.client.post(
+            reverse("wagtailmedia:chunked_upload_start", args=(media_type,)),
+            {"filename": filename, "size": len(self.content) if size is None else size},
+        )
+
+    def put_part(self, upload_id, number, content):
+        return self.client.put(
+            reverse("wagtailmedia:chunked_upload_part", args=(upload_id, number)),
+            content,
+            content_type="application/octet-stream",
+        )
+
+    def upload(self, chunk_size=1000):
+        upload_id = self.start().json()["upload_id"]
+        for number, offset in enumerate(range(0, len(self.content), chunk_size)):
+            response = self.put_part(
+                upload_id, number, self.content[offset : offset + chunk_size]
+            )
+            self.assertEqual(response.status_code, 200)
+        return upload_id
+
+    def complete(self, upload_id, data=None):
+        return self.client.post(
+            reverse("wagtailmedia:chunked_upload_complete", args=(upload_id,)),
+            data or {"title": "Test audio"},
+        )
+
+    def test_upload(self):
+        upload_id = self.upload()
+
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 201)
+
+        media = Media.objects.get(title="Test audio")
+        self.assertEqual(response.json()["media_id"], media.id)
+        self.assertEqual(media.type, "audio")
+        self.assertEqual(media.uploaded_by_user, self.user)
+        # the upload goes through the media form, so the file is probed and hashed
+        self.assertEqual(media.duration, 2)
+        self.assertNotEqual(media.file_hash, "")
+        with media.file.open("rb") as f:
+            self.assertEqual(f.read(), self.content)
+
+        # the parts are removed once the media item is created
+        self.assertEqual(ChunkedUpload.from_token(upload_id).get_parts(), [])
+
+    def test_upload_hashed_as_it_is_stored(self):
+        upload_id = self.upload()
+
+        with mock.patch("wagtailmedia.forms.hash_filelike") as hash_filelike:
+            self.assertEqual(self.complete(upload_id).status_code, 201)
+        hash_filelike.assert_not_called()
+
+        media = Media.objects.get(title="Test audio")
+        self.assertEqual(media.file_hash, hashlib.sha256(self.content).hexdigest())
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_duplicate_upload(self):
+        self.complete(self.upload())
+        first = Media.objects.get(title="Test audio")
+        _directories, stored_files = first.file.storage.listdir("media")
+
+        self.complete(self.upload(), {"title": "Copy"})
+        copy = Media.objects.get(title="Copy")
+        self.assertEqual(copy.file.name, first.file.name)
+        # the copy stored as the upload was hashed is removed
+        _directories, files = first.file.storage.listdir("media")
+        self.assertEqual(sorted(files), sorted(stored_files))
+
+    def test_start_validates_extension(self):
+        response = self.start(filename="song.pdf")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("not allowed", response.json()["error"])
+
+        response = self.start(filename="movie.mp4", media_type="video")
+        self.assertEqual(response.status_code, 201)
+
+    @override_settings(WAGTAILMEDIA={"AUDIO_EXTENSIONS": []})
+    def test_start_allows_any_extension(self):
+        response = self.start(filename="song.unknown")
+        self.assertEqual(response.status_code, 201)
+
+    def test_start_requires_size(self):
+        response = self.start(size=0)
+        self.assertEqual(response.status_code, 400)
+
+    def test_resume(self):
+        upload_id = self.start().json()["upload_id"]
+        self.put_part(upload_id, 0, self.content[:1000])
+        self.put_part(upload_id, 2, self.content[2000:3000])
+
+        response = self.client.get(
+            reverse("wagtailmedia:chunked_upload", args=(upload_id,))
+        )
+        self.assertEqual(response.json()["received"], 2000)
+        self.assertEqual(
+            response.json()["parts"],
+            [{"number": 0, "size": 1000}, {"number": 2, "size": 1000}],
+        )
+
+        # a retried part replaces the earlier copy
+        self.put_part(upload_id, 0, self.content[:1000])
+        self.assertEqual(self.complete(upload_id).status_code, 400)
+
+        self.put_part(upload_id, 1, self.content[1000:2000])
+        self.put_part(upload_id, 3, self.content[3000:])
+        self.assertEqual(self.complete(upload_id).status_code, 201)
+
+        media = Media.objects.get(title="Test audio")
+        with media.file.open("rb") as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_part_sizes_read_once_per_request(self):
+        upload_id = self.start().json()["upload_id"]
+        for number in range(3):
+            self.put_part(
+                upload_id, number, self.content[number * 1000 : (number + 1) * 1000]
+            )
+
+        with mock.patch.object(
+            FileSystemStorage, "size", autospec=True, side_effect=FileSystemStorage.size
+        ) as size:
+            response = self.put_part(upload_id, 3, self.content[3000:])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["received"], len(self.content))
+        self.assertEqual(len(response.json()["parts"]), 4)
+        # each of the parts received before, and none of them twice
+        self.assertEqual(size.call_count, 3)
+
+    def test_concurrent_copies_of_a_part(self):
+        upload_id = self.start().json()["upload_id"]
+        upload = ChunkedUpload.from_token(upload_id)
+
+        # another copy of the part is stored between the delete and the save
+        original_delete = FileSystemStorage.delete
+
+        def delete(storage, name):
+            original_delete(storage, name)
+            if name == upload.get_part_name(0):
+                storage.save(name, ContentFile(self.content[:1000]))
+
+        with mock.patch.object(FileSystemStorage, "delete", autospec=True) as patched:
+            patched.side_effect = delete
+            response = self.put_part(upload_id, 0, self.content[:1000])
+        self.assertEqual(response.status_code, 409)
+
+        # the copy stored by this request is not left behind
+        _directories, files = upload.storage.listdir(upload.directory)
+        self.assertEqual(files, ["00000.part"])
+        self.assertEqual(upload.get_parts(), [(0, 1000)])
+
+    def test_part_larger_than_declared_size(self):
+        upload_id = self.start(size=10).json()["upload_id"]
+        response = self.put_part(upload_id, 0, b"x" * 11)
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(WAGTAILMEDIA={"CHUNKED_UPLOAD_CHUNK_SIZE": 100})
+    def test_part_larger_than_chunk_size(self):
+        upload_id = self.start().json()["upload_id"]
+        response = self.put_part(upload_id, 0, self.content[:101])
+        self.assertEqual(response.status_code, 413)
+
+    def test_complete_with_form_errors(self):
+        upload_id = self.upload()
+
+        response = self.complete(upload_id, {"title": ""})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("title", response.json()["errors"])
+
+        # the parts are kept so that the form can be sent again
+        self.assertEqual(self.complete(upload_id).status_code, 201)
+
+    def test_abandon(self):
+        upload_id = self.upload()
+
+        response = self.client.delete(
+            reverse("wagtailmedia:chunked_upload", args=(upload_id,))
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(ChunkedUpload.from_token(upload_id).get_parts(), [])
+
+    def test_invalid_upload_id(self):
+        response = self.client.get(
+            reverse("wagtailmedia:chunked_upload", args=("invalid",))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_upload_of_another_user(self):
+        upload_id = self.upload()
+
+        other_user = get_user_model().objects.create_superuser(
+            username="other", email="other@example.com", password="password"
+        )
+        self.client.force_login(other_user)
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 404)
+
+    def test_requires_add_permission(self):
+        self.user.is_superuser = False
+        self.user.save()
+
+        response = self.start()
+        self.assertEqual(response.status_code, 302)
@@ -1,8 +1,22 @@
-from django.core.files.base import ContentFile
-from django.test import TestCase
+import hashlib
+import io
+import json
+
+from django.core.files.base import ContentFile, File
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils.http import urlsafe_base64_encode
 
 from wagtailmedia.models import get_media_model
-from wagtailmedia.utils import format_audio_html, format_video_html
+from wagtailmedia.utils import (
+    CursorPage,
+    HashingFile,
+    format_audio_html,
+    format_video_html,
+    paginate_by_cursor,
+    paginate_media,
+)
 
 
 Media = get_media_model()
@@ -36,3 +50,121 @@ class MediaUtilsTest(TestCase):
             f'<video controls>\n<source src="{video.url}" type="video/mp4">\n'
             f"<p>Your browser does not support the video element.</p>\n</video>",
         )
+
+
+class HashingFileTest(TestCase):
+    def test_hash_while_read(self):
+        content = bytes(range(256)) * 1000
+        file = HashingFile(File(io.BytesIO(content), name="song.mp3"))
+
+        # reading the headers, then the whole file, reads the start twice
+        file.read(100)
+        file.seek(50)
+        file.read(100)
+        self.assertIsNone(file.sha256)
+
+        self.assertEqual(b"".join(file.chunks(1000)), content)
+        self.assertEqual(file.sha256, hashlib.sha256(content).hexdigest())
+
+    def test_skipped_bytes_not_hashed(self):
+        file = HashingFile(File(io.BytesIO(b"0123456789"), name="song.mp3"))
+        file.seek(5)
+        file.read()
+        self.assertIsNone(file.sha256)
+
+
+class PaginateByCursorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Titles repeat, so that the primary key has to break ties
+        for i in range(25):
+            Media.objects.create(title=f"Test {i % 4}", duration=100, type="audio")
+
+    def get_page(self, ordering, cursor=None, per_page=10):
+        request = RequestFactory().get("/", {"cursor": cursor} if cursor else {})
+        return paginate_by_cursor(
+            request, Media.objects.all(), ordering, per_page=per_page
+        )
+
+    def test_pages(self):
+        for ordering in ["title", "-title", "created_at", "-created_at"]:
+            with self.subTest(ordering=ordering):
+                pk_ordering = "-pk" if ordering.startswith("-") else "pk"
+                expected = list(Media.objects.order_by(ordering, pk_ordering))
+
+                page = self.get_page(ordering)
+                self.assertFalse(page.has_previous())
+                pages = [list(page)]
+                while page.has_next():
+                    page = self.get_page(ordering, page.next_cursor)
+                    pages.append(list(page))
+
+                self.assertEqual([len(items) for items in pages], [10, 10, 5])
+                self.assertEqual([item for items in pages for item in items], expected)
+
+                # and back again
+                page = self.get_page(ordering, page.previous_cursor)
+                self.assertEqual(list(page), pages[1])
+                page = self.get_page(ordering, page.previous_cursor)
+                self.assertEqual(list(page), pages[0])
+                self.assertFalse(page.has_previous())
+                self.assertTrue(page.has_next())
+
+    def test_invalid_cursor(self):
+        for cursor in ["invalid", "e30", "WzFd"]:
+            page = self.get_page("title", cursor)
+            self.assertEqual(list(page), list(self.get_page("title")))
+
+    def test_null_cursor_value(self):
+        for ordering in ["title", "-created_at"]:
+            with self.subTest(ordering=ordering):
+                cursor = urlsafe_base64_encode(
+                    json.dumps(
+                        {"o": ordering, "v": None, "pk": 1, "before": False}
+                    ).encode()
+                )
+                page = self.get_page(ordering, cursor)
+                self.assertEqual(list(page), list(self.get_page(ordering)))
+                self.assertFalse(page.has_previous())
+
+    def test_cursor_of_other_ordering(self):
+        cursor = self.get_page("title").next_cursor
+        for ordering in ["-title", "created_at"]:
+            with self.subTest(ordering=ordering):
+                page = self.get_page(ordering, cursor)
+                self.assertEqual(list(page), list(self.get_page(ordering)))
+                self.assertFalse(page.has_previous())
+
+    def test_no_count_or_offset(self):
+        page = self.get_page("-created_at")
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page("-created_at", page.next_cursor)
+
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]["sql"].upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+
+class PaginateMediaTest(TestCase):
+    def paginate(self, is_searching=False):
+        return paginate_media(
+            RequestFactory().get("/"), Media.objects.all(), "-created_at", is_searching
+        )
+
+    def test_by_page_number(self):
+        paginator, page = self.paginate()
+        self.assertIsNotNone(paginator)
+        self.assertEqual(page.number, 1)
+
+    @override_settings(WAGTAILMEDIA={"CURSOR_PAGINATION": True})
+    def test_by_cursor(self):
+        paginator, page = self.paginate()
+        self.assertIsNone(paginator)
+        self.assertIsInstance(page, CursorPage)
+
+    @override_settings(WAGTAILMEDIA={"CURSOR_PAGINATION": True})
+    def test_search_results_by_page_number(self):
+        paginator, page = self.paginate(is_searching=True)
+        self.assertIsNotNone(paginator)
+        self.assertEqual(page.number, 1)
@@ -1,21 +1,30 @@
+import hashlib
 import json
 import os
 
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
 from django.core.files.base import ContentFile
-from django.forms.utils import ErrorDict
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
 from django.test import TestCase, modify_settings
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import NoReverseMatch, reverse
-from testapp.models import EventPage, EventPageRelatedMedia
+from django.utils.http import urlsafe_base64_encode
+from testapp.models import CustomMedia, EventPage, EventPageRelatedMedia
 from wagtail.models import Collection, GroupCollectionPermission
+from wagtail.search.backends import get_search_backend
 from wagtail.test.utils import WagtailTestUtils
 
 from wagtailmedia import models
 
+from .test_probe import build_wav
+from .utils import TempDirMediaRootMixin
+
 
 class TestMediaIndexView(TestCase, WagtailTestUtils):
     def setUp(self):
@@ -99,6 +108,94 @@ class TestMediaIndexView(TestCase, WagtailTestUtils):
             )
             self.assertEqual(response.status_code, 200)
 
+    @override_settings(WAGTAILMEDIA={"CURSOR_PAGINATION": True})
+    def test_cursor_pagination(self):
+        self.make_media()
+
+        response = self.client.get(reverse("wagtailmedia:index"), {"ordering": "title"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["cursor_pagination"])
+        first_page = list(response.context["media_files"])
+        self.assertEqual(len(first_page), 20)
+        next_cursor = response.context["media_files"].next_cursor
+        self.assertContains(response, f"cursor={next_cursor}")
+        # there are no page numbers to link to
+        self.assertNotContains(response, "?p=")
+
+        response = self.client.get(
+            reverse("wagtailmedia:index"), {"ordering": "title", "cursor": next_cursor}
+        )
+        self.assertEqual(response.status_code, 200)
+        second_page = list(response.context["media_files"])
+        self.assertEqual(len(second_page), 20)
+        self.assertTrue(set(first_page).isdisjoint(second_page))
+        self.assertGreater(second_page[0].title, first_page[-1].title)
+
+    @override_settings(WAGTAILMEDIA={"CURSOR_PAGINATION": True})
+    def test_cursor_pagination_null_cursor(self):
+        self.make_media()
+        cursor = urlsafe_base64_encode(b'{"o":"title","v":null,"pk":1,"before":false}')
+
+        response = self.client.get(
+            reverse("wagtailmedia:index"), {"ordering": "title", "cursor": cursor}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["media_files"].has_previous())
+
+    @override_settings(WAGTAILMEDIA={"CURSOR_PAGINATION": True})
+    def test_cursor_pagination_not_used_for_search(self):
+        response = self.client.get(reverse("wagtailmedia:index"), {"q": "Hello"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["cursor_pagination"])
+
+    @staticmethod
+    def make_media_in_collections(count):
+        root_collection = Collection.get_first_root_node()
+        for i in range(count):
+            collection = root_collection.add_child(name=f"Collection {i}")
+            models.Media.objects.create(
+                title=f"Test {i}",
+                duration=100,
+                file=ContentFile("A boring example song", name="song.mp3"),
+                type="audio",
+                collection=collection,
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_number_of_queries(self):
+        self.make_media_in_collections(2)
+        # fill the cached popular tags
+        self.client.get(reverse("wagtailmedia:index"))
+        self.client.get(reverse("wagtailmedia:chooser"))
+        num_queries = self.count_queries(reverse("wagtailmedia:index"))
+        num_chooser_queries = self.count_queries(reverse("wagtailmedia:chooser"))
+
+        # the number of queries must not grow with the number of media items listed
+        self.make_media_in_collections(10)
+        self.assertEqual(self.count_queries(reverse("wagtailmedia:index")), num_queries)
+        self.assertEqual(
+            self.count_queries(reverse("wagtailmedia:chooser")), num_chooser_queries
+        )
+
+    def test_listing_fields(self):
+        CustomMedia.objects.create(title="Test", duration=100, type="audio")
+
+        # fields added by custom media models are not loaded for the listings
+        media = CustomMedia.objects.for_listing().get()
+        self.assertEqual(
+            media.get_deferred_fields(),
+            {
+                field.attname
+                for field in CustomMedia._meta.concrete_fields
+                if field.name not in {"id", *CustomMedia.listing_fields}
+            },
+        )
+
 
 class TestMediaAddView(TestCase, WagtailTestUtils):
     def setUp(self):
@@ -527,7 +624,9 @@ class TestMediaEditView(TestCase, WagtailTestUtils):
         media = models.Media.objects.create(
             title="Test missing source media", file=fake_file, duration=100
         )
-        media.file.delete(False)
+        media.file.storage.delete(media.file.name)
+        # the size of media items uploaded before it was recorded is read from storage
+        models.Media.objects.filter(id=media.id).update(file_size=None)
 
         response = self.client.get(reverse("wagtailmedia:edit", args=(media.id,)), {})
         self.assertEqual(response.status_code, 200)
@@ -535,6 +634,16 @@ class TestMediaEditView(TestCase, WagtailTestUtils):
 
         self.assertContains(response, "File not found")
 
+    def test_file_size_not_read_from_storage(self):
+        self.assertEqual(self.media.file_size, len("A boring example song"))
+
+        with mock.patch.object(FileSystemStorage, "size", side_effect=AssertionError):
+            response = self.client.get(
+                reverse("wagtailmedia:edit", args=(self.media.id,))
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["filesize"], len("A boring example song"))
+
     @override_settings(WAGTAILMEDIA={"MEDIA_MODEL": "wagtailmedia_tests.CustomMedia"})
     def test_get_with_custom_model(self):
         # Build a fake file
@@ -703,6 +812,28 @@ class TestMediaChooserView(TestCase, WagtailTestUtils):
             response.context["media_files"].paginator.num_pages,
         )
 
+    @override_settings(WAGTAILMEDIA={"CURSOR_PAGINATION": True})
+    def test_cursor_pagination(self):
+        self.make_media()
+
+        response = self.client.get(self.chooser_url)
+        self.assertEqual(response.status_code, 200)
+        next_cursor = response.context["media_files"].next_cursor
+        self.assertIn(f"cursor={next_cursor}", response.json()["html"])
+
+        response = self.client.get(self.chooser_url, {"cursor": next_cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "wagtailmedia/chooser/results.html")
+        self.assertEqual(len(response.context["media_files"]), 20)
+        self.assertTrue(response.context["media_files"].has_previous())
+
+        cursor = urlsafe_base64_encode(
+            b'{"o":"-created_at","v":null,"pk":1,"before":false}'
+        )
+        response = self.client.get(self.chooser_url, {"cursor": cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["media_files"].has_previous())
+
     def test_construct_queryset_hook_browse(self):
         media = models.Media.objects.create(
             title="Test media shown",
@@ -742,6 +873,21 @@ class TestMediaChooserView(TestCase, WagtailTestUtils):
         self.assertEqual(len(response.context["media_files"]), 1)
         self.assertEqual(response.context["media_files"][0], media)
 
+    def test_upload_forms_not_built(self):
+        response = self.client.get(self.chooser_url)
+        self.assertEqual(response.status_code, 200)
+
+        # the upload forms are fetched when their tab is opened
+        self.assertEqual(
+            response.context["uploadforms"], {"audio": None, "video": None}
+        )
+        html = response.json()["html"]
+        self.assertNotIn('<form class="media-upload"', html)
+        upload_url = reverse("wagtailmedia:chooser_upload", args=("audio",))
+        self.assertIn(f'data-chooser-upload-form-url="{upload_url}"', html)
+        upload_url = reverse("wagtailmedia:chooser_upload", args=("video",))
+        self.assertIn(f'data-chooser-upload-form-url="{upload_url}"', html)
+
     @override_settings(WAGTAILMEDIA={"MEDIA_MODEL": "wagtailmedia_tests.CustomMedia"})
     def test_with_custom_model(self):
         response = self.client.get(self.chooser_url)
@@ -749,11 +895,16 @@ class TestMediaChooserView(TestCase, WagtailTestUtils):
         json_data = json.loads(response.content.decode())
         self.assertEqual(json_data["step"], "chooser")
 
+        response = self.client.get(
+            reverse("wagtailmedia:chooser_upload", args=("video",))
+        )
+        self.assertEqual(response.status_code, 200)
+
         # custom form fields should be present
-        self.assertIn('name="media-chooser-upload-fancy_caption"', json_data["html"])
+        self.assertContains(response, 'name="media-chooser-upload-fancy_caption"')
 
         # form media imports should appear on the page
-        self.assertIn("wagtailadmin/js/draftail.js", json_data["html"])
+        self.assertContains(response, "wagtailadmin/js/draftail.js")
 
 
 class TestMediaChosenViewPermissions(TestCase, WagtailTestUtils):
@@ -1081,6 +1232,18 @@ class TestMediaChooserUploadView(TestCase, WagtailTestUtils):
         self.assertEqual(media.width, 640)
         self.assertEqual(media.height, 480)
 
+    def test_upload_form(self):
+        response = self.client.get(
+            reverse("wagtailmedia:chooser_upload", args=("audio",))
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "wagtailmedia/chooser/upload_form.html")
+        self.assertEqual(response.context["form_type"], "audio")
+        self.assertEqual(response.context["uploadform"].instance.type, "audio")
+        upload_url = reverse("wagtailmedia:chooser_upload", args=("audio",))
+        self.assertContains(response, f'action="{upload_url}"')
+        self.assertContains(response, 'name="media-chooser-upload-title"')
+
     def test_upload_no_file_selected(self):
         response = self.client.post(
             reverse("wagtailmedia:chooser_upload", args=("video",)),
@@ -1099,12 +1262,9 @@ class TestMediaChooserUploadView(TestCase, WagtailTestUtils):
         self.assertEqual(video_form.instance.title, "Test video")
         self.assertEqual(video_form.instance.type, "video")
 
-        # the audio form should not have an error
+        # the audio form is left to be fetched when its tab is opened
         self.assertIn("audio", response.context["uploadforms"])
-        audio_form = response.context["uploadforms"]["audio"]
-        self.assertEqual(audio_form.errors, ErrorDict())
-        self.assertEqual(audio_form.instance.title, "")
-        self.assertEqual(audio_form.instance.type, "audio")
+        self.assertIsNone(response.context["uploadforms"]["audio"])
 
         # try the audio form
         response = self.client.post(
@@ -1115,10 +1275,30 @@ class TestMediaChooserUploadView(TestCase, WagtailTestUtils):
         self.assertIn("This field is required.", audio_form.errors["file"])
         self.assertEqual(audio_form.instance.title, "Test audio")
         self.assertEqual(audio_form.instance.type, "audio")
-        video_form = response.context["uploadforms"]["video"]
-        self.assertEqual(video_form.errors, ErrorDict())
-        self.assertEqual(video_form.instance.title, "")
-        self.assertEqual(video_form.instance.type, "video")
+        self.assertIsNone(response.context["uploadforms"]["video"])
+
+    @override_settings(WAGTAILMEDIA={"CURSOR_PAGINATION": True})
+    def test_upload_with_errors_cursor_pagination(self):
+        for i in range(25):
+            models.Media.objects.create(title=f"Media {i}", duration=100, type="audio")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("wagtailmedia:chooser_upload", args=("audio",)),
+                {"media-chooser-upload-title": "Test audio"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["cursor_pagination"])
+        self.assertIsNone(response.context["elided_page_range"])
+        self.assertEqual(
+            response.context["chooser_url"], reverse("wagtailmedia:chooser")
+        )
+        media_files = response.context["media_files"]
+        self.assertEqual(len(media_files), 20)
+        self.assertIn(f"cursor={media_files.next_cursor}", response.json()["html"])
+        for query in queries:
+            self.assertNotIn("OFFSET", query["sql"].upper())
 
     @override_settings(
         STORAGES={
@@ -1207,3 +1387,326 @@ class TestUsageCount(TestCase, WagtailTestUtils):
     def test_usage_count_zero_appears(self):
         response = self.client.get(reverse("wagtailmedia:edit", args=(1,)))
         self.assertContains(response, "Used 0 times")
+
+
+class TestMediaDeduplication(TempDirMediaRootMixin, TestCase, WagtailTestUtils):
+    def setUp(self):
+        self.user = self.login()
+
+    def post_upload(self, title, content=b"A boring example song", name="song.mp3"):
+        response = self.client.post(
+            reverse("wagtailmedia:add", args=("audio",)),
+            {"title": title, "file": ContentFile(content, name=name), "duration": 100},
+        )
+        self.assertRedirects(response, reverse("wagtailmedia:index"))
+        return models.Media.objects.get(title=title)
+
+    def test_upload_sets_file_hash(self):
+        media = self.post_upload("Test media")
+        self.assertEqual(
+            media.file_hash, hashlib.sha256(b"A boring example song").hexdigest()
+        )
+
+    def test_duplicates_stored_by_default(self):
+        first = self.post_upload("First")
+        second = self.post_upload("Second")
+
+        self.assertEqual(first.file_hash, second.file_hash)
+        self.assertNotEqual(first.file.name, second.file.name)
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_duplicate_reuses_stored_file(self):
+        first = self.post_upload("First")
+        second = self.post_upload("Second", name="copy.mp3")
+        other = self.post_upload("Other", content=b"Another song")
+
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertNotEqual(other.file.name, first.file.name)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "media", "copy.mp3")))
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_duplicate_hashed_before_it_is_stored(self):
+        first = self.post_upload("First")
+
+        # the upload is hashed as it is received, so it is neither read again
+        # nor written to the storage
+        with (
+            mock.patch("wagtailmedia.forms.hash_filelike") as hash_filelike,
+            mock.patch.object(FileSystemStorage, "save") as save,
+        ):
+            second = self.post_upload("Second", name="copy.mp3")
+        hash_filelike.assert_not_called()
+        save.assert_not_called()
+        self.assertEqual(second.file.name, first.file.name)
+
+    def test_upload_checks_csrf_token(self):
+        self.client = self.client_class(enforce_csrf_checks=True)
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("wagtailmedia:add", args=("audio",)),
+            {
+                "title": "Test media",
+                "file": ContentFile(b"A boring example song", name="song.mp3"),
+                "duration": 100,
+            },
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(models.Media.objects.exists())
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_duplicate_of_missing_file_is_stored(self):
+        first = self.post_upload("First")
+        first.file.storage.delete(first.file.name)
+
+        second = self.post_upload("Second")
+        self.assertTrue(second.file.storage.exists(second.file.name))
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_delete_keeps_shared_file(self):
+        first = self.post_upload("First")
+        second = self.post_upload("Second")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("wagtailmedia:delete", args=(first.id,)))
+        self.assertTrue(second.file.storage.exists(second.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("wagtailmedia:delete", args=(second.id,)))
+        self.assertFalse(second.file.storage.exists(second.file.name))
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_replacing_file_keeps_shared_file(self):
+        first = self.post_upload("First")
+        second = self.post_upload("Second")
+
+        response = self.client.post(
+            reverse("wagtailmedia:edit", args=(first.id,)),
+            {
+                "title": "First",
+                "file": ContentFile(b"Another song", name="other.mp3"),
+                "duration": 100,
+            },
+        )
+        self.assertRedirects(response, reverse("wagtailmedia:index"))
+
+        first.refresh_from_db()
+        self.assertEqual(first.file_hash, hashlib.sha256(b"Another song").hexdigest())
+        self.assertTrue(second.file.storage.exists(second.file.name))
+
+
+class TestMediaAddMultipleView(TempDirMediaRootMixin, TestCase, WagtailTestUtils):
+    def setUp(self):
+        self.login()
+        self.url = reverse("wagtailmedia:add_multiple", args=("audio",))
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "wagtailmedia/media/add_multiple.html")
+        self.assertContains(response, 'name="files" id="id_files" multiple')
+        self.assertContains(response, 'name="tags"')
+
+    def test_add_view_links_to_multiple_upload(self):
+        response = self.client.get(reverse("wagtailmedia:add", args=("audio",)))
+        self.assertContains(response, self.url)
+
+    def test_post(self):
+        files = [
+            ContentFile(build_wav(seconds=1), name="first.wav"),
+            ContentFile(build_wav(seconds=2), name="second.wav"),
+        ]
+        backend_class = type(get_search_backend())
+        with (
+            mock.patch.object(
+                backend_class,
+                "add_bulk",
+                autospec=True,
+                side_effect=backend_class.add_bulk,
+            ) as add_bulk,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.client.post(self.url, {"files": files, "tags": "bulk"})
+
+        self.assertRedirects(response, reverse("wagtailmedia:index"))
+        # the search index is updated in a single call for all the uploads
+        add_bulk.assert_called_once()
+        self.assertEqual(len(add_bulk.call_args.args[2]), 2)
+
+        first = models.Media.objects.get(title="first")
+        self.assertEqual(first.type, "audio")
+        self.assertEqual(first.duration, 1)
+        self.assertNotEqual(first.file_hash, "")
+        self.assertEqual(list(first.tags.names()), ["bulk"])
+
+        second = models.Media.objects.get(title="second")
+        self.assertEqual(second.duration, 2)
+        self.assertEqual(list(second.tags.names()), ["bulk"])
+
+        self.assertEqual(list(models.Media.objects.search("second")), [second])
+
+    def test_post_with_collection(self):
+        root_collection = Collection.get_first_root_node()
+        collection = root_collection.add_child(name="Evil plans")
+
+        self.client.post(
+            self.url,
+            {
+                "files": [ContentFile(build_wav(), name="plan.wav")],
+                "collection": collection.id,
+            },
+        )
+
+        self.assertEqual(models.Media.objects.get(title="plan").collection, collection)
+
+    def test_post_with_invalid_file(self):
+        files = [
+            ContentFile(build_wav(), name="valid.wav"),
+            ContentFile(b"Not media", name="invalid.pdf"),
+        ]
+        response = self.client.post(self.url, {"files": files})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "wagtailmedia/media/add_multiple.html")
+        self.assertContains(response, "1 media file added.")
+        self.assertContains(response, "invalid.pdf")
+        self.assertTrue(models.Media.objects.filter(title="valid").exists())
+        self.assertFalse(models.Media.objects.filter(title="invalid").exists())
+
+    def test_post_without_files(self):
+        response = self.client.post(self.url, {})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Please choose files to upload.")
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_post_duplicates(self):
+        content = build_wav()
+        self.client.post(
+            self.url,
+            {"files": [ContentFile(content, name="first.wav")]},
+        )
+        self.client.post(
+            self.url,
+            {"files": [ContentFile(content, name="second.wav")]},
+        )
+
+        first = models.Media.objects.get(title="first")
+        second = models.Media.objects.get(title="second")
+        self.assertEqual(first.file.name, second.file.name)
+
+    @override_settings(WAGTAILMEDIA={"DEDUPLICATE": True})
+    def test_post_duplicates_together(self):
+        content = build_wav()
+        storage = models.Media._meta.get_field("file").storage
+        files_before = (
+            set(storage.listdir("media")[1]) if storage.exists("media") else set()
+        )
+
+        self.client.post(
+            self.url,
+            {
+                "files": [
+                    ContentFile(content, name="first.wav"),
+                    ContentFile(content, name="second.wav"),
+                    ContentFile(build_wav(seconds=1), name="third.wav"),
+                ]
+            },
+        )
+
+        first = models.Media.objects.get(title="first")
+        second = models.Media.objects.get(title="second")
+        third = models.Media.objects.get(title="third")
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertNotEqual(first.file.name, third.file.name)
+        # only one copy of the duplicated file is stored
+        self.assertEqual(len(set(storage.listdir("media")[1]) - files_before), 2)
+
+    @override_settings(WAGTAILMEDIA={"MULTIPLE_UPLOAD_WORKERS": 2})
+    def test_post_with_upload_workers(self):
+        with mock.patch(
+            "wagtailmedia.views.media.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+        ) as executor:
+            self.client.post(
+                self.url, {"files": [ContentFile(build_wav(), name="song.wav")]}
+            )
+
+        executor.assert_called_once_with(max_workers=2)
+
+
+class TestMediaSearchIndexing(TempDirMediaRootMixin, TestCase, WagtailTestUtils):
+    def setUp(self):
+        self.login()
+
+    def assertIndexedOnceWithTags(self, post):
+        backend_class = type(get_search_backend())
+        with (
+            mock.patch.object(backend_class, "add", autospec=True) as add,
+            mock.patch.object(
+                backend_class,
+                "add_bulk",
+                autospec=True,
+                side_effect=backend_class.add_bulk,
+            ) as add_bulk,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            post()
+
+        add.assert_not_called()
+        self.assertEqual(add_bulk.call_count, 1)
+        # the media is indexed once its tags are saved
+        self.assertEqual(
+            [media.title for media in models.Media.objects.search("sweet")],
+            ["Test media"],
+        )
+
+    def test_add(self):
+        self.assertIndexedOnceWithTags(
+            lambda: self.client.post(
+                reverse("wagtailmedia:add", args=("audio",)),
+                {
+                    "title": "Test media",
+                    "file": ContentFile(b"A boring example song", name="song.mp3"),
+                    "duration": 100,
+                    "tags": "sweet",
+                },
+            )
+        )
+
+    @override_settings(
+        TASKS={
+            "default": {
+                "BACKEND": "django_tasks.backends.immediate.ImmediateBackend",
+                "ENQUEUE_ON_COMMIT": False,
+            }
+        }
+    )
+    def test_add_with_tasks_enqueued_immediately(self):
+        self.test_add()
+
+    def test_edit(self):
+        media = models.Media.objects.create(
+            title="Test media",
+            type="audio",
+            duration=100,
+            file=ContentFile(b"A boring example song", name="song.mp3"),
+        )
+        self.assertIndexedOnceWithTags(
+            lambda: self.client.post(
+                reverse("wagtailmedia:edit", args=(media.id,)),
+                {"title": "Test media", "duration": 100, "tags": "sweet"},
+            )
+        )
+
+    def test_chooser_upload(self):
+        self.assertIndexedOnceWithTags(
+            lambda: self.client.post(
+                reverse("wagtailmedia:chooser_upload", args=("audio",)),
+                {
+                    "media-chooser-upload-title": "Test media",
+                    "media-chooser-upload-file": ContentFile(
+                        b"A boring example song", name="song.mp3"
+                    ),
+                    "media-chooser-upload-duration": 100,
+                    "media-chooser-upload-tags": "sweet",
+                },
+            )
+        )
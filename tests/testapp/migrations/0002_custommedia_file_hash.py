@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtailmedia_tests", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="custommedia",
+            name="file_hash",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=64
+            ),
+        ),
+    ]
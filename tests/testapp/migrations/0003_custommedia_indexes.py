@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtailmedia_tests", "0002_custommedia_file_hash"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="custommedia",
+            index=models.Index(
+                fields=["-created_at"], name="wagtailmedi_created_ee8853_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="custommedia",
+            index=models.Index(
+                fields=["type", "-created_at"], name="wagtailmedi_type_79e43a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="custommedia",
+            index=models.Index(
+                fields=["collection", "-created_at"],
+                name="wagtailmedi_collect_d70469_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="custommedia",
+            index=models.Index(fields=["title"], name="wagtailmedi_title_f9cc25_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="custommedia",
+            index=models.Index(
+                fields=["uploaded_by_user", "-created_at"],
+                name="wagtailmedi_uploade_563232_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtailmedia_tests", "0003_custommedia_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="custommedia",
+            name="file_size",
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="custommedia",
+            name="mime_type",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+    ]
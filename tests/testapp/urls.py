@@ -6,6 +6,7 @@ from wagtail.admin import urls as wagtailadmin_urls
 from wagtail.api.v2.router import WagtailAPIRouter
 from wagtail.documents import urls as wagtaildocs_urls
 
+from wagtailmedia import urls as wagtailmedia_urls
 from wagtailmedia.api.views import MediaAPIViewSet
 
 
@@ -15,6 +16,7 @@ api_router.register_endpoint("media", MediaAPIViewSet)
 urlpatterns = [
     path("admin/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
+    path("media-files/", include(wagtailmedia_urls)),
     path("api/", api_router.urls),
     path("", include(wagtail_urls)),
 ] + [